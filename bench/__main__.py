@@ -0,0 +1,265 @@
+"""
+Load test & benchmark suite for API routes.
+
+Builds the app with `create_app`, replaces Keycloak with an in-memory stub and runs scenarios against
+a local Redis server (started by the user, e.g. via `python -m src.container_cli`) in a separate database:
+- register & login storms;
+- follow bursts for authors with different follower counts;
+- posting by authors with different follower counts (feed fan-out);
+- reads of users, posts & followers;
+- deep feed paging.
+
+Requests are sent via `httpx.ASGITransport` or to a uvicorn server, which runs in a separate thread (`--uvicorn`).
+Latency & faults between the app and Redis can be injected with a proxy (`--redis-*` arguments).
+Throughput & p50/p95/p99 latency of each route in each scenario are printed & saved to a JSON file,
+so that results can be compared across commits.
+
+Usage:
+    python -m bench [--users 1000] [--fanouts 10 100 1000] [--posts 20] [--feed-pages 10] [--concurrency 50]
+        [--keycloak-latency 0] [--uvicorn] [--output bench_results.json]
+        [--redis-latency 0.001 --redis-jitter 0.002 --redis-latency-distribution pareto] [--redis-reset-probability 0.001]
+"""
+if __name__ == "__main__":
+    import os, sys
+    sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../" * 2)))
+
+import argparse
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import json
+import subprocess
+import threading
+from time import perf_counter
+from typing import AsyncIterator, Awaitable, Callable, Iterable
+
+from asgi_lifespan import LifespanManager
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient, Response
+import uvicorn
+
+from bench.util import StubKeycloakClient, add_redis_fault_arguments, flush_bench_database, get_bench_config, \
+    get_percentile, get_redis_faults, proxy_redis
+from config import Config
+from src.app.dependencies import get_keycloak_client
+from src.app.main import create_app
+
+
+@dataclass
+class RouteResult:
+    """ Latencies of requests to a route in a scenario. """
+    scenario: str
+    route: str
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    duration: float = 0.0
+
+    def to_dict(self) -> dict:
+        latencies = sorted(self.latencies)
+        return {
+            "scenario": self.scenario,
+            "route": self.route,
+            "requests": len(latencies),
+            "errors": self.errors,
+            "throughput": round(len(latencies) / self.duration, 1) if self.duration > 0 else 0,
+            **{
+                f"p{int(percentile * 100)}_ms": round(get_percentile(latencies, percentile) * 1000, 3) if latencies else None
+                for percentile in (0.5, 0.95, 0.99)
+            }
+        }
+
+
+class Suite:
+    def __init__(self, client: AsyncClient, concurrency: int):
+        self.client = client
+        self.concurrency = concurrency
+        self.results: list[RouteResult] = []
+        self.tokens: dict[str, str] = {}
+        """ Mapping between usernames & their access tokens. """
+
+    async def run(
+        self,
+        scenario: str,
+        route: str,
+        requests: Iterable[Callable[[AsyncClient], Awaitable[Response]]],
+        expected_status: tuple[int, ...] = (200,)
+    ) -> None:
+        """ Sends `requests` to a `route` with `concurrency` workers & records their latency. """
+        result = RouteResult(scenario, route)
+        iterator = iter(requests)
+
+        async def worker():
+            for request in iterator:
+                start = perf_counter()
+                resp = await request(self.client)
+                result.latencies.append(perf_counter() - start)
+                if resp.status_code not in expected_status:
+                    result.errors += 1
+
+        start = perf_counter()
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        result.duration = perf_counter() - start
+
+        self.results.append(result)
+        p99 = result.to_dict()["p99_ms"]
+        print(f"    {scenario:<32}{route:<44}{len(result.latencies):>8}{result.errors:>8}{p99 if p99 is not None else '-':>10}")
+
+    def get_headers(self, username: str) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.tokens[username]}"}
+
+
+def get_username(i: int) -> str:
+    return f"user{i:06d}"
+
+
+def get_author(fanout: int) -> str:
+    return f"author{fanout:06d}"
+
+
+async def run_scenarios(suite: Suite, users: int, fanouts: list[int], posts: int, feed_pages: int) -> None:
+    usernames = [get_username(i) for i in range(users)]
+    authors = [get_author(fanout) for fanout in fanouts]
+
+    # Register & login storms
+    def register(username: str):
+        body = {
+            "username": username, "email": f"{username}@example.com", "first_name": "First", "last_name": "Last",
+            "password": "password", "password_repeat": "password"
+        }
+        return lambda client: client.post("/auth/register", json=body)
+
+    def login(username: str):
+        async def request(client: AsyncClient) -> Response:
+            resp = await client.post("/auth/login", json={"username": username, "password": "password"})
+            if resp.status_code == 200:
+                suite.tokens[username] = resp.json()["access_token"]
+            return resp
+        return request
+
+    await suite.run("register storm", "POST /auth/register", map(register, usernames + authors), (201,))
+    await suite.run("login storm", "POST /auth/login", map(login, usernames + authors))
+
+    # Follow bursts (followers follow authors concurrently)
+    for fanout, author in zip(fanouts, authors):
+        def follow(follower: str, author: str = author):
+            headers = suite.get_headers(follower)
+            return lambda client: client.put(f"/users/{author}/followers/{follower}", headers=headers)
+        await suite.run(f"follow burst (followers={fanout})", "PUT /users/{username}/followers/{follower}",
+                        map(follow, usernames[:fanout]))
+
+    # Posting with feed fan-out
+    for fanout, author in zip(fanouts, authors):
+        headers = suite.get_headers(author)
+        def add_post(i: int, author: str = author, headers: dict = headers):
+            return lambda client: client.post(f"/users/{author}/posts", json={"content": f"post {i}"}, headers=headers)
+        await suite.run(f"posting (followers={fanout})", "POST /users/{username}/posts", map(add_post, range(posts)), (201,))
+
+    # Reads
+    readers = usernames[:max(fanouts)]
+    await suite.run("reads", "GET /users/{username}", (
+        lambda client, username=username: client.get(f"/users/{username}") for username in readers
+    ))
+    await suite.run("reads", "GET /posts/{post_id}", (
+        lambda client, post_id=post_id: client.get(f"/posts/{post_id}")
+        for post_id in range(1, posts * len(fanouts) + 1)
+    ))
+    await suite.run("reads", "GET /users/{username}/posts", (
+        lambda client, author=author: client.get(f"/users/{author}/posts") for author in authors for _ in range(posts)
+    ))
+    await suite.run("reads", "GET /users/{username}/followers", (
+        lambda client, author=author: client.get(f"/users/{author}/followers") for author in authors for _ in range(posts)
+    ))
+
+    # Deep feed paging (followers of all authors page through their feeds)
+    feed_readers = usernames[:min(fanouts)]
+    for page in range(feed_pages):
+        params = {"last_viewed": page * 5 - 1} if page > 0 else {}
+        await suite.run(f"feed paging (page={page + 1})", "GET /users/{username}/feed", (
+            lambda client, username=username: client.get(f"/users/{username}/feed", params=params)
+            for username in feed_readers
+        ), (200, 404))
+
+
+@asynccontextmanager
+async def get_client(app: FastAPI, use_uvicorn: bool, port: int) -> AsyncIterator[AsyncClient]:
+    """ Yields a client, which sends requests to the `app` via ASGI transport or a uvicorn server. """
+    if not use_uvicorn:
+        async with LifespanManager(app) as manager:
+            async with AsyncClient(transport=ASGITransport(app=manager.app), base_url="http://bench") as client:
+                yield client
+        return
+
+    # Run server in a separate thread with its own event loop
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("Failed to start uvicorn server.")
+        await asyncio.sleep(0.05)
+
+    try:
+        async with AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+            yield client
+    finally:
+        server.should_exit = True
+        await asyncio.to_thread(thread.join)
+
+
+def get_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main(args: argparse.Namespace):
+    config: Config = get_bench_config(args.database)
+    flush_bench_database(config)
+
+    keycloak_client = StubKeycloakClient(config.keycloak.app_client_id, latency=args.keycloak_latency)
+
+    print(f"{'':4}{'scenario':<32}{'route':<44}{'requests':>8}{'errors':>8}{'p99, ms':>10}")
+    try:
+        async with proxy_redis(config, get_redis_faults(args)) as app_config:
+            app = create_app(app_config)
+            app.dependency_overrides[get_keycloak_client] = lambda: keycloak_client
+
+            async with get_client(app, args.uvicorn, args.port) as client:
+                suite = Suite(client, args.concurrency)
+                await run_scenarios(suite, args.users, sorted(args.fanouts), args.posts, args.feed_pages)
+    finally:
+        flush_bench_database(config)
+
+    with open(args.output, "w") as f:
+        json.dump({
+            "commit": get_commit(),
+            "timestamp": datetime.now(tz=timezone.utc).isoformat(),
+            "transport": "uvicorn" if args.uvicorn else "asgi",
+            "parameters": {
+                key: value for key, value in vars(args).items() if key not in ("output", "port", "database")
+            },
+            "results": [result.to_dict() for result in suite.results]
+        }, f, indent=2)
+    print(f"Results are saved to {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="API routes load test & benchmark suite.")
+    parser.add_argument("--users", type=int, default=1000, help="Number of registered users (followers)")
+    parser.add_argument("--fanouts", type=int, nargs="+", default=[10, 100, 1000], help="Follower counts of authors")
+    parser.add_argument("--posts", type=int, default=20, help="Number of posts added by each author")
+    parser.add_argument("--feed-pages", type=int, default=10, help="Number of read feed pages")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--keycloak-latency", type=float, default=0, help="Latency of stub Keycloak calls in seconds")
+    parser.add_argument("--uvicorn", action="store_true", help="Send requests to a uvicorn server instead of ASGI transport")
+    parser.add_argument("--port", type=int, default=8765, help="Port of uvicorn server")
+    parser.add_argument("--database", type=int, default=None, help="Redis database (the last one by default)")
+    parser.add_argument("--output", default="bench_results.json")
+    add_redis_fault_arguments(parser)
+    args = parser.parse_args()
+
+    if max(args.fanouts) > args.users:
+        parser.error("Follower counts can't exceed the number of users")
+    asyncio.run(main(args))
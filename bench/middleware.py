@@ -0,0 +1,124 @@
+"""
+Error handling middleware throughput benchmark for `GET /posts/{post_id}`.
+
+Compares the app with the legacy `BaseHTTPMiddleware`-based error middleware
+and the current exception handlers + pure ASGI error middleware.
+Redis client dependency is replaced with an in-memory stub, so that only app overhead is measured.
+
+Usage:
+    python -m bench.middleware [--requests 20000] [--concurrency 50]
+"""
+if __name__ == "__main__":
+    import os, sys
+    sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../" * 2)))
+
+import argparse
+import asyncio
+from datetime import datetime, timezone
+from time import perf_counter
+import traceback
+from typing import Awaitable, Callable
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse, ORJSONResponse
+from httpx import ASGITransport, AsyncClient
+from starlette.middleware.gzip import GZipMiddleware
+
+from config import load_config, Config
+from src.app.dependencies import get_redis_client
+from src.app.main import create_app
+from src.app.models import PostWithID
+from src.app.routes import setup_routes
+from src.exceptions import KeycloakConnectionException, RedisConnectionException, \
+    InvalidOperationException, UnauthorizedOperationException, ForbiddenOperationException
+from src.util.logging import log
+
+
+class StubRedisClient:
+    """ In-memory replacement of `RedisClient` for the posts route. """
+    def __init__(self):
+        self.post = PostWithID(
+            post_id=1,
+            created_at=datetime.now(tz=timezone.utc),
+            content="a" * 280,
+            author="username"
+        )
+
+    async def get_post(self, post_id: int) -> PostWithID | None:
+        return self.post if post_id == 1 else None
+
+
+async def legacy_error_middleware(
+    request: Request,
+    call_next: Callable[[Request], Awaitable[Response]]
+) -> Response:
+    """ `BaseHTTPMiddleware`-based error middleware, which was previously used by the app. """
+    try:
+        return await call_next(request)
+    except InvalidOperationException as e:
+        return JSONResponse(status_code=400, content={"detail": str(e)})
+    except UnauthorizedOperationException as e:
+        return JSONResponse(status_code=401, content={"detail": str(e)})
+    except ForbiddenOperationException as e:
+        return JSONResponse(status_code=403, content={"detail": str(e)})
+    except (KeycloakConnectionException, RedisConnectionException) as e:
+        log(e)
+        return Response(status_code=503)
+    except Exception as e:
+        log(f"{str(e)}\n{traceback.format_exc()}")
+        return Response(status_code=500)
+
+
+def create_legacy_app(config: Config) -> FastAPI:
+    app = FastAPI(default_response_class=ORJSONResponse)
+    setup_routes(app)
+    app.add_middleware(
+        GZipMiddleware,
+        minimum_size=config.app.gzip_minimum_size,
+        compresslevel=config.app.gzip_compress_level
+    )
+    app.middleware("http")(legacy_error_middleware)
+    return app
+
+
+async def measure_rps(app: FastAPI, requests: int, concurrency: int) -> float:
+    """ Sends `requests` to `GET /posts/1` with `concurrency` workers and returns requests per second. """
+    stub = StubRedisClient()
+    app.dependency_overrides[get_redis_client] = lambda: stub
+    remaining = requests
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                resp = await client.get("/posts/1")
+                assert resp.status_code == 200
+
+        # Warm up
+        await client.get("/posts/1")
+
+        start = perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return requests / (perf_counter() - start)
+
+
+async def main(requests: int, concurrency: int):
+    config = load_config()
+    apps = {
+        "BaseHTTPMiddleware": create_legacy_app(config),
+        "pure ASGI": create_app(config)
+    }
+
+    print(f"GET /posts/{{post_id}} ({requests} requests, concurrency = {concurrency}):")
+    for name, app in apps.items():
+        rps = await measure_rps(app, requests, concurrency)
+        print(f"    {name:<20}{rps:>10.0f} req/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Error middleware throughput benchmark.")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
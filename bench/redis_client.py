@@ -0,0 +1,244 @@
+"""
+Microbenchmarks of `RedisClient` methods with command & round trip accounting.
+
+Each method is called sequentially against a local Redis server (started by the user,
+e.g. via `python -m src.container_cli`) in a separate database, across sweeps of:
+- follower count (feed fan-out & followers pagination);
+- posts per author (post lists & feed updates on follow/unfollow);
+- page offset (deep feed & posts pagination; page size is fixed to 5 items by `RedisClient`).
+
+Besides latency, the number of Redis commands & round trips of each call is counted by the connection,
+so that regressions in the number of round trips are caught, even if they don't show up in localhost timings
+(network latency can be added with a proxy via `--redis-latency` & other `--redis-*` arguments).
+Results can be saved to a JSON file & compared with a baseline (exits with code 1, if commands or round trips grew).
+
+Usage:
+    python -m bench.redis_client [--followers 10 100 1000 10000] [--posts 10 100 1000] [--page-offsets 0 100 1000]
+        [--iterations 100] [--output redis_client_results.json] [--baseline redis_client_results.json]
+"""
+if __name__ == "__main__":
+    import os, sys
+    sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../" * 2)))
+
+import argparse
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import json
+import sys
+from time import perf_counter_ns
+from typing import Awaitable, Callable
+
+from redis.asyncio import Redis
+
+from bench.util import CommandCounter, add_redis_fault_arguments, create_counting_client, flush_bench_database, \
+    get_bench_config, get_percentile, get_redis_faults, proxy_redis
+from src.app.models import Post, PostWithID, User
+from src.redis.client import RedisClient
+from src.redis.util import RedisKeys, get_post_id_mapping
+
+
+SEED_CHUNK_SIZE = 1000
+""" Number of commands in a seeding pipeline. """
+
+
+@dataclass
+class MethodResult:
+    """ Latencies & command counts of calls to a `RedisClient` method with `parameters`. """
+    method: str
+    parameters: dict[str, int] = field(default_factory=dict)
+    latencies: list[int] = field(default_factory=list)
+    """ Call latencies in nanoseconds. """
+    commands: int = 0
+    round_trips: int = 0
+
+    @property
+    def key(self) -> str:
+        return self.method + "".join(f" {name}={value}" for name, value in self.parameters.items())
+
+    def to_dict(self) -> dict:
+        latencies = sorted(self.latencies)
+        calls = len(latencies)
+        return {
+            "method": self.method,
+            "parameters": self.parameters,
+            "calls": calls,
+            "p50_us": round(get_percentile(latencies, 0.5) / 1000, 1),
+            "p99_us": round(get_percentile(latencies, 0.99) / 1000, 1),
+            "commands": round(self.commands / calls, 2),
+            "round_trips": round(self.round_trips / calls, 2)
+        }
+
+
+class Bench:
+    def __init__(self, client: RedisClient, raw_client: Redis, counter: CommandCounter, iterations: int):
+        self.client = client
+        self.raw_client = raw_client
+        """ Redis client for seeding data. """
+        self.counter = counter
+        self.iterations = iterations
+        self.results: list[MethodResult] = []
+        self._next_post_id = 0
+
+    async def run(self, method: str, call: Callable[[], Awaitable], **parameters: int) -> None:
+        """ Calls a `RedisClient` `method` via `call` `iterations` times & records its latency & command counts. """
+        result = MethodResult(method, parameters)
+
+        # Warm up (also opens a connection, so that its handshake is not counted)
+        for _ in range(min(10, self.iterations)):
+            await call()
+
+        for _ in range(self.iterations):
+            self.counter.reset()
+            start = perf_counter_ns()
+            await call()
+            result.latencies.append(perf_counter_ns() - start)
+            result.commands += self.counter.commands
+            result.round_trips += self.counter.round_trips
+
+        self.results.append(result)
+        row = result.to_dict()
+        print(f"    {result.key:<56}{row['p50_us']:>10}{row['p99_us']:>10}{row['commands']:>10}{row['round_trips']:>8}")
+
+    async def seed_followers(self, username: str, count: int) -> None:
+        for start in range(0, count, SEED_CHUNK_SIZE):
+            await self.raw_client.zadd(
+                RedisKeys.user_followers(username),
+                {f"follower{i:07d}": 0 for i in range(start, min(start + SEED_CHUNK_SIZE, count))}
+            )
+
+    async def seed_posts(self, author: str, count: int) -> list[int]:
+        """ Adds `count` posts of an `author` & returns their IDs. """
+        post_ids = list(range(self._next_post_id + 1, self._next_post_id + count + 1))
+        self._next_post_id += count
+        created_at = datetime.now(tz=timezone.utc)
+
+        for start in range(0, count, SEED_CHUNK_SIZE):
+            chunk = post_ids[start:start + SEED_CHUNK_SIZE]
+            pipe = self.raw_client.pipeline(transaction=False)
+            for post_id in chunk:
+                post = PostWithID(post_id=post_id, created_at=created_at, content="a" * 280, author=author)
+                pipe.set(RedisKeys.post(post_id), post.model_dump_json())
+            pipe.zadd(RedisKeys.user_posts(author), get_post_id_mapping(chunk))
+            await pipe.execute()
+        await self.raw_client.set(RedisKeys.next_post_id, self._next_post_id)
+        return post_ids
+
+
+async def run_benchmarks(bench: Bench, followers: list[int], posts: list[int], page_offsets: list[int]) -> None:
+    client = bench.client
+    created_at = datetime.now(tz=timezone.utc)
+
+    # Methods, which don't depend on data size
+    user = User(username="username", first_name="First", last_name="Last")
+    await bench.run("set_user", lambda: client.set_user("user_id", user))
+    await bench.run("get_user", lambda: client.get_user("username"))
+    await bench.run("add_follower", lambda: client.add_follower("username", "follower"))
+    await bench.run("remove_follower", lambda: client.remove_follower("username", "follower"))
+    post = Post(content="a" * 280, created_at=created_at, author="username")
+    await bench.run("add_new_post", lambda: client.add_new_post(post))
+    await bench.run("get_post", lambda: client.get_post(1))
+    await bench.run("get_user_posts_version", lambda: client.get_user_posts_version("username"))
+    await bench.run("get_user_feed_version", lambda: client.get_user_feed_version("username"))
+
+    # Follower count
+    for count in followers:
+        author = f"author_followers{count}"
+        await bench.seed_followers(author, count)
+        post_id = (await bench.seed_posts(author, 1))[0]
+        author_post = PostWithID(post_id=post_id, created_at=created_at, content="a" * 280, author=author)
+        await bench.run("add_post_to_followers_feeds", lambda: client.add_post_to_followers_feeds(author_post),
+                        followers=count)
+        await bench.run("get_paginated_user_followers", lambda: client.get_paginated_user_followers(author, None),
+                        followers=count)
+
+    # Posts per author
+    for count in posts:
+        author = f"author_posts{count}"
+        post_ids = await bench.seed_posts(author, count)
+        await bench.run("get_user_post_ids", lambda: client.get_user_post_ids(author), posts=count)
+        await bench.run("add_post_ids_to_feed", lambda: client.add_post_ids_to_feed("reader_user", post_ids), posts=count)
+        await bench.run("remove_post_ids_from_feed", lambda: client.remove_post_ids_from_feed("reader_user", post_ids),
+                        posts=count)
+
+    # Page offset
+    pager = "pager_user"
+    post_ids = await bench.seed_posts(pager, max(page_offsets) + 5)
+    await client.add_post_ids_to_feed(pager, post_ids)
+    for offset in page_offsets:
+        last_viewed = offset - 1 if offset > 0 else None
+        await bench.run("get_paginated_user_posts", lambda: client.get_paginated_user_posts(pager, last_viewed),
+                        offset=offset)
+        await bench.run("get_paginated_user_feed", lambda: client.get_paginated_user_feed(pager, last_viewed),
+                        offset=offset)
+
+
+def compare_with_baseline(results: list[MethodResult], baseline_path: str) -> bool:
+    """ Prints methods, which send more commands or round trips than in the baseline, & returns, if there are any. """
+    with open(baseline_path) as f:
+        baseline = {
+            MethodResult(row["method"], row["parameters"]).key: row for row in json.load(f)["results"]
+        }
+
+    regressions = False
+    for result in results:
+        row, baseline_row = result.to_dict(), baseline.get(result.key)
+        if baseline_row is None:
+            continue
+        for name in ("commands", "round_trips"):
+            if row[name] > baseline_row[name]:
+                print(f"    {result.key}: {name} increased from {baseline_row[name]} to {row[name]}")
+                regressions = True
+    return regressions
+
+
+async def main(args: argparse.Namespace) -> int:
+    config = get_bench_config(args.database)
+    flush_bench_database(config)
+
+    counter = CommandCounter()
+    print(f"RedisClient methods ({args.iterations} sequential calls; latency in microseconds, commands & round trips per call):")
+    print(f"    {'method':<56}{'p50':>10}{'p99':>10}{'commands':>10}{'RTT':>8}")
+    try:
+        async with proxy_redis(config, get_redis_faults(args)) as bench_config:
+            raw_client = create_counting_client(bench_config.redis, counter)
+            bench = Bench(RedisClient(raw_client), raw_client, counter, args.iterations)
+            try:
+                await run_benchmarks(bench, sorted(args.followers), sorted(args.posts), sorted(args.page_offsets))
+            finally:
+                await raw_client.aclose()
+    finally:
+        flush_bench_database(config)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "timestamp": datetime.now(tz=timezone.utc).isoformat(),
+                "parameters": {key: value for key, value in vars(args).items() if key not in ("output", "baseline", "database")},
+                "results": [result.to_dict() for result in bench.results]
+            }, f, indent=2)
+        print(f"Results are saved to {args.output}")
+
+    if args.baseline:
+        print(f"Comparison with {args.baseline}:")
+        if compare_with_baseline(bench.results, args.baseline):
+            return 1
+        print("    No command or round trip regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="RedisClient methods microbenchmarks.")
+    parser.add_argument("--followers", type=int, nargs="+", default=[10, 100, 1000, 10000], help="Follower counts of authors")
+    parser.add_argument("--posts", type=int, nargs="+", default=[10, 100, 1000], help="Post counts of authors")
+    parser.add_argument("--page-offsets", type=int, nargs="+", default=[0, 100, 1000], help="Offsets of read pages")
+    parser.add_argument("--iterations", type=int, default=100, help="Number of calls of each method")
+    parser.add_argument("--database", type=int, default=None, help="Redis database (the last one by default)")
+    parser.add_argument("--output", default=None, help="JSON file to save results to")
+    parser.add_argument("--baseline", default=None, help="JSON file with previous results to compare commands & round trips with")
+    add_redis_fault_arguments(parser)
+    args = parser.parse_args()
+
+    if args.iterations < 1:
+        parser.error("Number of iterations must be positive")
+    sys.exit(asyncio.run(main(args)))
@@ -0,0 +1,76 @@
+"""
+Response serialization & compression benchmark for a feed page.
+
+Compares stdlib `json` (FastAPI's default `JSONResponse`) and `orjson` (`ORJSONResponse`)
+rendering time, as well as response sizes with different gzip compression levels.
+
+Usage:
+    python -m bench.serialization [--iterations 10000]
+"""
+if __name__ == "__main__":
+    import os, sys
+    sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../" * 2)))
+
+import argparse
+import gzip
+from datetime import datetime, timedelta, timezone
+import random
+import string
+from time import perf_counter
+from typing import Callable
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from src.app.models import PostWithID
+
+
+def get_feed_page(page_size: int = 5, content_length: int = 1000) -> dict:
+    """ Returns a feed page response content with `page_size` posts of max allowed length. """
+    rng = random.Random(0)
+    alphabet = string.ascii_letters + string.digits + " " * 10
+    created_at = datetime.now(tz=timezone.utc)
+    posts = [
+        PostWithID(
+            post_id=page_size - i,
+            created_at=created_at - timedelta(minutes=i),
+            content="".join(rng.choices(alphabet, k=content_length)),
+            author=f"author_{i:04d}"
+        ) for i in range(page_size)
+    ]
+    return {"posts": [post.model_dump() for post in posts]}
+
+
+def measure_us(fn: Callable[[], object], iterations: int) -> float:
+    """ Returns average `fn` execution time in microseconds. """
+    start = perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (perf_counter() - start) / iterations * 1_000_000
+
+
+def main(iterations: int):
+    content = get_feed_page()
+
+    print(f"Serialization of a feed page ({iterations} iterations):")
+    body = b""
+    for response_class in (JSONResponse, ORJSONResponse):
+        body = response_class(content).body
+        us = measure_us(lambda: response_class(content), iterations)
+        print(f"    {response_class.__name__:<16}{us:>10.2f} us/page{len(body):>10} bytes")
+
+    gzip_iterations = max(1, iterations // 10)
+    print(f"\nBytes on the wire (gzip, {gzip_iterations} iterations):")
+    print(f"    {'identity':<16}{'-':>10} us/page{len(body):>10} bytes")
+    for level in (1, 6, 9):
+        size = len(gzip.compress(body, compresslevel=level))
+        us = measure_us(lambda: gzip.compress(body, compresslevel=level), gzip_iterations)
+        print(f"    {f'gzip level {level}':<16}{us:>10.2f} us/page{size:>10} bytes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Feed page serialization benchmark.")
+    parser.add_argument("--iterations", type=int, default=10000)
+    args = parser.parse_args()
+    if args.iterations < 1:
+        parser.error("Number of iterations must be positive")
+    main(args.iterations)
@@ -0,0 +1,89 @@
+"""
+Per-command latency benchmark for Redis transports.
+
+Sends sequential GET & HGETALL commands to the primary Redis instance over TCP
+(with & without TCP_NODELAY) and Unix socket (if `redis.unix_socket_path` is configured),
+using RESP2 & RESP3 protocols, and reports p50/p99 latency of each command.
+Requires a running Redis container.
+
+Usage:
+    python -m bench.transport [--commands 10000]
+"""
+if __name__ == "__main__":
+    import os, sys
+    sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../" * 2)))
+
+import argparse
+import asyncio
+from time import perf_counter_ns
+
+from bench.util import get_percentile
+from config import load_config, RedisConfig
+from src.redis.connection import create_standalone_client
+
+
+STRING_KEY = "bench:transport:string"
+HASH_KEY = "bench:transport:hash"
+
+
+def get_transports(redis_config: RedisConfig) -> dict[str, RedisConfig]:
+    """ Returns a mapping between transport names & Redis configs, which use them. """
+    transports = {}
+    for protocol in (2, 3):
+        transports[f"TCP, RESP{protocol}"] = redis_config.model_copy(
+            update={"unix_socket_path": None, "protocol": protocol}
+        )
+        transports[f"TCP without TCP_NODELAY, RESP{protocol}"] = redis_config.model_copy(
+            update={"unix_socket_path": None, "protocol": protocol, "tcp_nodelay": False}
+        )
+        if redis_config.unix_socket_path:
+            transports[f"Unix socket, RESP{protocol}"] = redis_config.model_copy(update={"protocol": protocol})
+    return transports
+
+
+async def measure_latency(redis_config: RedisConfig, commands: int) -> dict[str, list[int]]:
+    """ Returns sorted latencies in nanoseconds of each command. """
+    client = create_standalone_client(redis_config)
+    try:
+        await client.set(STRING_KEY, "a" * 280)
+        await client.hset(HASH_KEY, mapping={"username": "username", "first_name": "First", "last_name": "Last"})
+
+        latencies: dict[str, list[int]] = {}
+        for name, command in (
+            ("GET", lambda: client.get(STRING_KEY)),
+            ("HGETALL", lambda: client.hgetall(HASH_KEY))
+        ):
+            # Warm up
+            for _ in range(100):
+                await command()
+
+            values = []
+            for _ in range(commands):
+                start = perf_counter_ns()
+                await command()
+                values.append(perf_counter_ns() - start)
+            latencies[name] = sorted(values)
+
+        await client.delete(STRING_KEY, HASH_KEY)
+        return latencies
+    finally:
+        await client.aclose()
+
+
+async def main(commands: int):
+    config = load_config()
+
+    print(f"Redis command latency ({commands} sequential commands, microseconds):")
+    print(f"    {'transport':<36}{'command':<10}{'p50':>8}{'p99':>8}")
+    for name, redis_config in get_transports(config.redis).items():
+        latencies = await measure_latency(redis_config, commands)
+        for command, values in latencies.items():
+            p50, p99 = get_percentile(values, 0.5) / 1000, get_percentile(values, 0.99) / 1000
+            print(f"    {name:<36}{command:<10}{p50:>8.1f}{p99:>8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Redis transport latency benchmark.")
+    parser.add_argument("--commands", type=int, default=10000)
+    args = parser.parse_args()
+    asyncio.run(main(args.commands))
@@ -0,0 +1,177 @@
+"""
+Shared benchmark utilities.
+"""
+import argparse
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, get_args
+from uuid import uuid4
+
+from redis.asyncio import Redis
+from redis.asyncio.connection import AbstractConnection
+
+from config import Config, RedisConfig, load_config
+from src.app.models import UserCredentials, UserRegistrationCredentials
+from src.redis.admin import RedisAdminClient
+from src.redis.connection import get_client_kwargs
+from src.redis.instrumentation import InstrumentedRedis
+from src.redis.pool import InstrumentedConnectionPool
+from src.redis.transport import get_transport_kwargs
+from tests.fault_proxy import FaultProxy, Faults, LatencyDistribution
+
+
+def get_percentile(sorted_values: list[Any], percentile: float) -> Any:
+    return sorted_values[min(int(len(sorted_values) * percentile), len(sorted_values) - 1)]
+
+
+def get_bench_config(database: int | None = None) -> Config:
+    """
+    Returns app config for benchmarks, which uses a separate Redis `database`
+    (the last database by default), so that benchmarks don't affect app data.
+    """
+    config = load_config()
+    config.redis.database = database if database is not None else config.redis.max_databases - 1
+    return config
+
+
+def flush_bench_database(config: Config) -> None:
+    with RedisAdminClient(config.redis) as client:
+        client.flush_db()
+
+
+class StubKeycloakClient:
+    """
+    In-memory replacement of `KeycloakClient` with an optional per-call `latency` in seconds.
+    Access tokens contain usernames, so that they can be "decoded" without Keycloak;
+    users get the roles from `roles`.
+    """
+    def __init__(self, app_client_id: str, latency: float = 0, roles: tuple[str, ...] = ("can-post",)):
+        self.app_client_id = app_client_id
+        self.latency = latency
+        self.roles = list(roles)
+
+    async def register(self, credentials: UserRegistrationCredentials) -> str:
+        await self._wait()
+        return str(uuid4())
+
+    async def login(self, credentials: UserCredentials) -> dict:
+        await self._wait()
+        return {
+            "access_token": get_stub_access_token(credentials.username),
+            "refresh_token": f"refresh:{credentials.username}:{uuid4().hex}",
+            "expires_in": 300,
+            "refresh_expires_in": 1800
+        }
+
+    async def logout(self, refresh_token: str) -> None:
+        await self._wait()
+
+    async def introspect_token(self, access_token: str) -> dict:
+        await self._wait()
+        return {"active": access_token.startswith("access:")}
+
+    async def refresh_token(self, refresh_token: str) -> dict:
+        await self._wait()
+        username = refresh_token.split(":")[1]
+        return await self.login(UserCredentials(username=username, password="password"))
+
+    async def decode_token(self, access_token: str, validate: bool = True) -> dict:
+        await self._wait()
+        return {
+            "preferred_username": access_token.split(":")[1],
+            "resource_access": {self.app_client_id: {"roles": self.roles}}
+        }
+
+    async def _wait(self) -> None:
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+
+
+def get_stub_access_token(username: str) -> str:
+    """ Returns an access token, which is accepted by `StubKeycloakClient`. """
+    return f"access:{username}:{uuid4().hex}"
+
+
+@dataclass
+class CommandCounter:
+    """ Number of Redis commands & round trips (packed writes to a connection, e.g. a single command or a pipeline). """
+    commands: int = 0
+    round_trips: int = 0
+
+    def reset(self) -> None:
+        self.commands = 0
+        self.round_trips = 0
+
+
+class CountingConnectionMixin:
+    """ Connection, which counts sent commands & round trips in a `command_counter`. """
+    def __init__(self, *, command_counter: CommandCounter, **kwargs):
+        super().__init__(**kwargs)
+        self.command_counter = command_counter
+
+    def pack_command(self, *args):
+        # Also called for each command of a pipeline
+        self.command_counter.commands += 1
+        return super().pack_command(*args)   # type: ignore[misc]
+
+    async def send_packed_command(self, command, check_health: bool = True) -> None:
+        self.command_counter.round_trips += 1
+        await super().send_packed_command(command, check_health)   # type: ignore[misc]
+
+
+def create_counting_client(redis_config: RedisConfig, counter: CommandCounter) -> Redis:
+    """ Returns an async client for the primary Redis instance, which counts commands & round trips in a `counter`. """
+    kwargs = {
+        "db": redis_config.database,
+        **get_transport_kwargs(redis_config),
+        **get_client_kwargs(redis_config)
+    }
+    connection_class: type[AbstractConnection] = kwargs["connection_class"]
+    kwargs["connection_class"] = type(f"Counting{connection_class.__name__}", (CountingConnectionMixin, connection_class), {})
+    kwargs["command_counter"] = counter
+    return InstrumentedRedis.from_pool(InstrumentedConnectionPool(**kwargs))
+
+
+def add_redis_fault_arguments(parser: argparse.ArgumentParser) -> None:
+    """ Adds arguments of faults, which are injected between the app & Redis by a proxy. """
+    group = parser.add_argument_group("Redis fault injection", "Connections to Redis are sent via a proxy, if any fault is set")
+    group.add_argument("--redis-latency", type=float, default=0, help="One-way delay in seconds")
+    group.add_argument("--redis-jitter", type=float, default=0, help="Scale of random delay in seconds")
+    group.add_argument("--redis-latency-distribution", choices=get_args(LatencyDistribution), default="constant")
+    group.add_argument("--redis-bandwidth", type=int, default=None, help="Bytes per second in each direction of a connection")
+    group.add_argument("--redis-reset-probability", type=float, default=0, help="Probability of a connection reset per chunk of data")
+    group.add_argument("--redis-stall-probability", type=float, default=0, help="Probability of a stall per chunk of data")
+    group.add_argument("--redis-stall-duration", type=float, default=1, help="Stall duration in seconds")
+
+
+def get_redis_faults(args: argparse.Namespace) -> Faults | None:
+    """ Returns faults from `add_redis_fault_arguments` arguments or None, if no faults are set. """
+    faults = Faults(
+        latency=args.redis_latency,
+        jitter=args.redis_jitter,
+        distribution=args.redis_latency_distribution,
+        bandwidth=args.redis_bandwidth,
+        reset_probability=args.redis_reset_probability,
+        stall_probability=args.redis_stall_probability,
+        stall_duration=args.redis_stall_duration
+    )
+    return None if faults == Faults(distribution=faults.distribution, stall_duration=faults.stall_duration) else faults
+
+
+@asynccontextmanager
+async def proxy_redis(config: Config, faults: Faults | None) -> AsyncIterator[Config]:
+    """
+    Yields a copy of `config`, which routes Redis connections via a proxy with `faults`,
+    or `config` itself, if `faults` are not set.
+    """
+    if faults is None:
+        yield config
+        return
+
+    async with FaultProxy("localhost", config.redis.container_port, faults) as proxy:
+        proxied_config = config.model_copy(update={
+            "redis": config.redis.model_copy(update={"container_port": proxy.port, "unix_socket_path": None})
+        })
+        yield proxied_config
+        print(f"Redis proxy: {proxy.stats.connections} connections, {proxy.stats.resets} resets, {proxy.stats.stalls} stalls")
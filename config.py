@@ -1,5 +1,7 @@
 from pathlib import Path
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator, model_validator
+import socket
+from typing import Literal, Self
 import yaml
 
 
@@ -42,15 +44,100 @@ class RedisConfig(BaseModel):
     retry_base_time: float = Field(ge=0)
     retry_cap_time: float = Field(ge=0)
 
+    blocking_pool: bool = False
+    pool_timeout: float = Field(default=1, ge=0)
+    min_idle_connections: int = Field(default=0, ge=0)
+
+    unix_socket_path: str | None = None
+    socket_keepalive: bool = False
+    socket_keepalive_options: dict[str, int] = Field(default_factory=dict)
+    tcp_nodelay: bool = True
+    protocol: Literal[2, 3] = 2
+    client_name: str | None = Field(default=None, pattern=r"^[\w.-]+$")
+
+    cluster_mode: bool = False
+    cluster_nodes: list[str] = Field(default_factory=list)
+
+    shards: list[str] = Field(default_factory=list)
+
+    replicas: list[str] = Field(default_factory=list)
+    sentinel_nodes: list[str] = Field(default_factory=list)
+    sentinel_service_name: str | None = None
+    sentinel_password: str | None = None
+    replica_hedge_delay: float = Field(default=0, ge=0)
+    replica_failure_cooldown: float = Field(default=5, ge=0)
+    read_your_writes_window: float = Field(default=0, ge=0)
+
+    coalesce_reads: bool = True
+    batch_reads: bool = False
+    batch_max_size: int = Field(default=64, ge=1)
+    batch_max_wait: float = Field(default=0, ge=0)
+
+    @field_validator("socket_keepalive_options")
+    @classmethod
+    def validate_socket_keepalive_options(cls, value: dict[str, int]) -> dict[str, int]:
+        for name in value:
+            if not name.startswith("TCP_") or not hasattr(socket, name):
+                raise ValueError(f"Unsupported TCP keepalive option '{name}'")
+        return value
+
+    @model_validator(mode="after")
+    def validate_sentinel_service_name(self) -> Self:
+        if self.sentinel_nodes and not self.sentinel_service_name:
+            raise ValueError("Sentinel service name is required, when Sentinel nodes are provided")
+        return self
+
+    @model_validator(mode="after")
+    def validate_shards(self) -> Self:
+        if self.shards and self.cluster_mode:
+            raise ValueError("Shards can't be used in cluster mode")
+        return self
+
     @property
     def url(self) -> str:
         """ Redis connection URL. """
         return f"redis://:{self.password}@localhost:{self.container_port}/{self.database}"
 
 
+class AppConfig(BaseModel):
+    log_level: Literal["DEBUG", "INFO", "WARNING", "ERROR"] = "INFO"
+    log_rate_limit: int = Field(default=10, ge=0)
+    log_rate_limit_interval: float = Field(default=10, gt=0)
+
+    gzip_minimum_size: int = Field(default=1024, ge=0)
+    gzip_compress_level: int = Field(default=1, ge=1, le=9)
+
+    metrics_enabled: bool = True
+    metrics_dir: str | None = None
+    metrics_sync_interval: float = Field(default=1, gt=0)
+
+    loop_monitor_enabled: bool = False
+    loop_monitor_interval: float = Field(default=0.1, gt=0)
+    slow_callback_threshold: float = Field(default=0.1, gt=0)
+
+    server_timing: bool = False
+    log_request_timings: bool = False
+
+    tracing_enabled: bool = False
+    tracing_sample_rate: float = Field(default=0.01, ge=0, le=1)
+    tracing_export_path: str = "traces.jsonl"
+    tracing_export_interval: float = Field(default=1, gt=0)
+
+    slowlog_enabled: bool = False
+    slowlog_interval: float = Field(default=10, gt=0)
+    slowlog_max_entries: int = Field(default=128, ge=1)
+
+
 class Config(BaseModel):
     keycloak: KeycloakConfig
     redis: RedisConfig
+    app: AppConfig = AppConfig()
+
+    @model_validator(mode="after")
+    def validate_slowlog_client_name(self) -> Self:
+        if self.app.slowlog_enabled and not self.redis.client_name:
+            raise ValueError("Redis client name is required, when slowlog collector is enabled")
+        return self
 
 
 def load_config() -> Config:
@@ -1,5 +1,4 @@
 from fastapi import Request, Depends
-from redis.asyncio import Redis
 from typing import Annotated
 
 from config import Config
@@ -7,6 +6,7 @@ from src.app.tokens import TokenCache
 from src.keycloak.client import KeycloakClient
 from src.redis.client import RedisClient
 from src.exceptions import UnauthorizedOperationException, ForbiddenOperationException
+from src.util.tracing import traced
 
 
 def get_keycloak_client(request: Request):
@@ -15,8 +15,14 @@ def get_keycloak_client(request: Request):
 
 
 def get_redis_client(request: Request):
-    redis: Redis = request.app.state.redis
-    return RedisClient(redis)
+    state = request.app.state
+    return RedisClient(
+        state.redis,
+        coalescer=state.read_coalescer,
+        batcher=state.read_batcher,
+        replicas=state.replicas,
+        read_tracker=state.read_tracker
+    )
 
 
 def get_token_cache(request: Request):
@@ -31,6 +37,7 @@ def get_bearer_token(request: Request) -> str | None:
     return auth_header[7:]  # Remove 'Bearer ' prefix
 
 
+@traced("dependency get_refreshed_token")
 async def get_refreshed_token(
     access_token: Annotated[str | None, Depends(get_bearer_token)],
     token_cache: Annotated[TokenCache, Depends(get_token_cache)],
@@ -59,6 +66,7 @@ async def get_refreshed_token(
     return new_tokens["access_token"]
 
 
+@traced("dependency get_decoded_token")
 async def get_decoded_token(
     access_token: Annotated[str, Depends(get_refreshed_token)],
     keycloak_client: Annotated[KeycloakClient, Depends(get_keycloak_client)]
@@ -72,6 +80,7 @@ def validate_token_role(role: str):
     Ensures that the current access_token (sent via request or refreshed)
     contains the specified realm `role`.
     """
+    @traced("dependency validate_token_role")
     async def inner(
         request: Request,
         decoded_token: Annotated[dict, Depends(get_decoded_token)]
@@ -0,0 +1,39 @@
+POST_FORMAT_VERSION = 1
+""" Version of post representation in responses; must be incremented, when it changes. """
+
+POST_CACHE_CONTROL = "public, max-age=31536000, immutable"
+""" Cache-Control header value for posts (posts are never changed after being created). """
+
+PAGE_CACHE_CONTROL = "public, no-cache"
+""" Cache-Control header value for paginated post lists (cached, but revalidated on each request). """
+
+
+def get_post_etag(post_id: int) -> str:
+    """
+    Returns a weak ETag of a post with `post_id`
+    (the same tag is used for gzip & identity encodings of the post, so it's not a strong validator).
+    """
+    return f'W/"post-{post_id}-v{POST_FORMAT_VERSION}"'
+
+
+def get_page_etag(name: str, version: int) -> str:
+    """
+    Returns a weak ETag for a page of a post list `name`
+    (e.g. "feed" or "posts"), which has the specified `version`.
+    """
+    return f'W/"{name}-{version}-v{POST_FORMAT_VERSION}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """ Checks if `If-None-Match` header value matches `etag` (using weak comparison). """
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    
+    etag = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def get_cache_headers(etag: str, cache_control: str) -> dict[str, str]:
+    return {"ETag": etag, "Cache-Control": cache_control}
@@ -3,72 +3,177 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from typing import AsyncIterator
 from redis.asyncio import Redis
-from redis.backoff import ExponentialBackoff
-from redis.asyncio.retry import Retry
-from redis.exceptions import BusyLoadingError, ConnectionError, TimeoutError
+from redis.asyncio.cluster import RedisCluster
 
 from config import load_config, Config
 from src.app.middleware import setup_middleware
 from src.app.routes import setup_routes
+from src.app.routes.metrics import metrics_router
 from src.app.tokens import RedisTokenCache
+from src.redis.batching import ReadBatcher
+from src.redis.coalescing import ReadCoalescer
+from src.redis.connection import create_redis_client, create_replica_clients
+from src.redis.pool import PoolMetricsCollector, get_connection_pools
+from src.redis.replicas import ReplicaRouter, ReplicaTarget, ReadYourWritesTracker
+from src.redis.sharding import ShardedRedis
+from src.redis.slowlog import SlowlogCollector, get_client_name
+from src.util.logging import LOGGER, LogLevel
+from src.util.loop_monitor import LoopMonitor
+from src.util.metrics import MultiprocessMetrics, REGISTRY
+from src.util.tracing import JSONLSpanExporter, Tracer
 
 
 def get_lifespan(config: Config):
     @asynccontextmanager
     async def lifespan(app: FastAPI) -> AsyncIterator[None]:
-        redis: Redis | None = None
+        redis: Redis | RedisCluster | ShardedRedis | None = None
+        read_batcher: ReadBatcher | None = None
+        replicas: ReplicaRouter | None = None
+        pool_metrics: PoolMetricsCollector | None = None
+        multiprocess_metrics: MultiprocessMetrics | None = None
+        tracer: Tracer | None = None
+        loop_monitor: LoopMonitor | None = None
+        slowlog_collector: SlowlogCollector | None = None
         try:
             # Config
             app.state.config = config
 
-            # Setup Redis client
-            redis = Redis(
-                # Redis location & credentials
-                host="localhost",
-                port=config.redis.container_port,
-                db=config.redis.database,
-                password=config.redis.password,
-
-                # Connection settings
-                max_connections=config.redis.max_connections,
-                socket_timeout=config.redis.socket_timeout,
-                socket_connect_timeout=config.redis.socket_timeout,
-                
-                decode_responses=True,
-
-                # Retry strategy & exceptions
-                retry=Retry(
-                    ExponentialBackoff(
-                        base=config.redis.retry_base_time,
-                        cap=config.redis.retry_cap_time,
-                    ),
-                    config.redis.number_of_retries
-                ),
-                retry_on_error=[BusyLoadingError, ConnectionError, TimeoutError]
+            # Logging
+            LOGGER.configure(
+                level=LogLevel[config.app.log_level],
+                rate_limit=config.app.log_rate_limit,
+                rate_limit_interval=config.app.log_rate_limit_interval
             )
+
+            # Setup Redis client
+            redis = create_redis_client(config.redis)
             app.state.redis = redis
 
+            # Shared in-flight reads
+            app.state.read_coalescer = ReadCoalescer() if config.redis.coalesce_reads else None
+
+            # Batched reads
+            if config.redis.batch_reads:
+                read_batcher = ReadBatcher(
+                    redis,
+                    max_batch_size=config.redis.batch_max_size,
+                    max_wait=config.redis.batch_max_wait
+                )
+            app.state.read_batcher = read_batcher
+
+            # Read replicas
+            replica_clients = await create_replica_clients(config.redis)
+            if replica_clients:
+                replicas = ReplicaRouter(
+                    [ReplicaTarget(address, client) for address, client in replica_clients.items()],
+                    primary=redis,
+                    hedge_delay=config.redis.replica_hedge_delay,
+                    failure_cooldown=config.redis.replica_failure_cooldown
+                )
+            app.state.replicas = replicas
+            app.state.read_tracker = ReadYourWritesTracker(config.redis.read_your_writes_window) \
+                if replicas is not None and config.redis.read_your_writes_window > 0 else None
+
+            # Pre-warm connection pools
+            connection_pools = get_connection_pools(redis)
+            for client in replica_clients.values():
+                connection_pools.update(get_connection_pools(client))
+            app.state.connection_pools = connection_pools
+
+            if config.redis.min_idle_connections > 0:
+                await asyncio.gather(*(
+                    pool.warm_up(config.redis.min_idle_connections) for pool in connection_pools.values()
+                ))
+
             # Refresh token cache
-            app.state.token_cache = RedisTokenCache(redis)
+            app.state.token_cache = RedisTokenCache(redis, read_batcher)
+
+            # Metrics
+            if config.app.metrics_enabled:
+                pool_metrics = PoolMetricsCollector(connection_pools)
+                REGISTRY.add_collector(pool_metrics)
+
+                if config.app.metrics_dir:
+                    multiprocess_metrics = MultiprocessMetrics(config.app.metrics_dir, config.app.metrics_sync_interval)
+                    multiprocess_metrics.start()
+            app.state.multiprocess_metrics = multiprocess_metrics
+
+            # Tracing
+            if config.app.tracing_enabled:
+                exporter = JSONLSpanExporter(config.app.tracing_export_path, config.app.tracing_export_interval)
+                exporter.start()
+                tracer = Tracer(exporter, config.app.tracing_sample_rate)
+            app.state.tracer = tracer
+
+            # Event loop monitoring
+            if config.app.loop_monitor_enabled:
+                loop_monitor = LoopMonitor(config.app.loop_monitor_interval, config.app.slow_callback_threshold)
+                loop_monitor.start()
+
+            # Redis SLOWLOG & LATENCY collection
+            if config.app.slowlog_enabled:
+                slowlog_collector = SlowlogCollector(
+                    redis,
+                    replica_clients,
+                    get_client_name(config.redis),
+                    config.app.slowlog_interval,
+                    config.app.slowlog_max_entries
+                )
+                slowlog_collector.start()
             
             yield
         
         finally:
-            # Cleanup Redis connection pool (explicit close required for async client)
+            # Stop Redis SLOWLOG collection
+            if slowlog_collector is not None:
+                await slowlog_collector.close()
+
+            # Stop event loop monitoring
+            if loop_monitor is not None:
+                await loop_monitor.close()
+
+            # Export remaining spans
+            if tracer is not None:
+                await tracer.exporter.close()
+
+            # Stop metrics export
+            if multiprocess_metrics is not None:
+                await multiprocess_metrics.close()
+            if pool_metrics is not None:
+                REGISTRY.remove_collector(pool_metrics)
+                pool_metrics.remove_metrics()
+
+            # Send pending batched reads
+            if read_batcher is not None:
+                await read_batcher.close()
+
+            # Cleanup Redis connection pools (explicit close required for async client)
+            if replicas is not None:
+                await replicas.aclose()
             if redis is not None:
                 await redis.aclose()
 
+            # Write pending log records
+            await asyncio.to_thread(LOGGER.flush)
+
     return lifespan
 
 
 def create_app(config: Config) -> FastAPI:
-    app = FastAPI(lifespan=get_lifespan(config))
+    app = FastAPI(
+        lifespan=get_lifespan(config),
+        default_response_class=ORJSONResponse
+    )
     setup_routes(app)
-    setup_middleware(app)
+    if config.app.metrics_enabled:
+        app.include_router(metrics_router)
+    setup_middleware(app, config)
     return app
 
 
@@ -1,38 +1,226 @@
-import traceback
+from time import perf_counter
 from fastapi import FastAPI, Request, Response
-from fastapi.responses import JSONResponse
-from typing import Callable, Awaitable
+from fastapi.responses import ORJSONResponse
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from config import Config
 from src.exceptions import KeycloakConnectionException, RedisConnectionException, \
     InvalidOperationException, UnauthorizedOperationException, ForbiddenOperationException
-from src.util.logging import log
-
-
-async def error_middleware(
-    request: Request,
-    call_next: Callable[[Request],
-    Awaitable[Response]]
-) -> Response:
-    try:
-        return await call_next(request)
-    
-    except InvalidOperationException as e:
-        return JSONResponse(status_code=400, content={"detail": str(e)})
-    
-    except UnauthorizedOperationException as e:
-        return JSONResponse(status_code=401, content={"detail": str(e)})
-    
-    except ForbiddenOperationException as e:
-        return JSONResponse(status_code=403, content={"detail": str(e)})
-    
-    except (KeycloakConnectionException, RedisConnectionException) as e:
-        log(e)
-        return Response(status_code=503)
-    
-    except Exception as e:
-        log(f"{str(e)}\n{traceback.format_exc()}")
-        return Response(status_code=500)
-
-
-def setup_middleware(app: FastAPI) -> None:
-    app.middleware("http")(error_middleware)
+from src.util.logging import log, LogLevel
+from src.util.metrics import GaugeMetric, HistogramMetric
+from src.util.profiler import PROFILER
+from src.util.timing import RequestTimings, request_timings
+from src.util.tracing import Tracer
+
+
+HTTP_REQUEST_DURATION = HistogramMetric(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template, method & response status.",
+    ("route", "method", "status")
+)
+HTTP_REQUESTS_IN_FLIGHT = GaugeMetric("http_requests_in_flight", "Number of HTTP requests being processed.")
+
+
+def get_detail_exception_handler(status_code: int):
+    """ Returns an exception handler, which responds with `status_code` and exception message as detail. """
+    async def handler(request: Request, exc: Exception) -> Response:
+        return ORJSONResponse(status_code=status_code, content={"detail": str(exc)})
+
+    return handler
+
+
+async def connection_exception_handler(request: Request, exc: Exception) -> Response:
+    # Rate limit by exception type, since every request fails during an outage
+    log(exc, LogLevel.WARNING, key=type(exc).__name__, cause=repr(exc.__cause__))
+    return Response(status_code=503)
+
+
+class ErrorMiddleware:
+    """
+    Pure ASGI middleware, which logs unhandled exceptions and returns 500 responses.
+    (Known exceptions are mapped to responses by exception handlers.)
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            log(e, LogLevel.ERROR, exc_info=True)
+
+            # Response can't be changed, if it was already started
+            if not response_started:
+                await Response(status_code=500)(scope, receive, send)
+
+
+class MetricsMiddleware:
+    """ Pure ASGI middleware, which records request latency & the number of in-flight requests. """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.in_flight = HTTP_REQUESTS_IN_FLIGHT.labels()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.in_flight.inc()
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.in_flight.dec()
+
+            # Use route template to keep the number of label values bounded
+            route = getattr(scope.get("route"), "path", "<unmatched>")
+            HTTP_REQUEST_DURATION.labels(route, scope["method"], str(status)).observe(perf_counter() - start)
+
+
+class ServerTimingMiddleware:
+    """
+    Pure ASGI middleware, which records time spent in Redis & Keycloak calls during each request
+    and adds it to a `Server-Timing` response header (and optionally logs it).
+    """
+    def __init__(self, app: ASGIApp, log_timings: bool = False):
+        self.app = app
+        self.log_timings = log_timings
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        status = 500
+        start = perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                server_timing = timings.get_server_timing(perf_counter() - start)
+                message["headers"] = [*message.get("headers", []), (b"server-timing", server_timing.encode())]
+            await send(message)
+
+        token = request_timings.set(timings)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_timings.reset(token)
+
+            if self.log_timings:
+                log(
+                    "request_timings",
+                    rate_limit=False,
+                    method=scope["method"],
+                    route=getattr(scope.get("route"), "path", scope["path"]),
+                    status=status,
+                    total_ms=round((perf_counter() - start) * 1000, 2),
+                    redis_ms=round(timings.redis * 1000, 2),
+                    redis_round_trips=timings.redis_round_trips,
+                    keycloak_ms=round(timings.keycloak * 1000, 2),
+                    keycloak_calls=timings.keycloak_calls
+                )
+
+
+class TracingMiddleware:
+    """
+    Pure ASGI middleware, which starts a root span of each sampled request
+    (uses the tracer from `app.state.tracer`, which is set on app startup).
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        tracer: Tracer | None = getattr(scope["app"].state, "tracer", None) if "app" in scope else None
+        if scope["type"] != "http" or tracer is None:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        traceparent = next((value.decode("latin-1") for name, value in scope["headers"] if name == b"traceparent"), None)
+        with tracer.start_trace("request", traceparent, method=scope["method"]) as span:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                if span is not None:
+                    route = getattr(scope.get("route"), "path", "<unmatched>")
+                    span.name = f"{scope['method']} {route}"
+                    span.attributes.update(route=route, status=status)
+
+
+class ProfilerMiddleware:
+    """ Pure ASGI middleware, which attributes profiler samples to requests (only while a profile is running). """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not PROFILER.active:
+            await self.app(scope, receive, send)
+            return
+
+        with PROFILER.track_request(scope):
+            await self.app(scope, receive, send)
+
+
+def setup_middleware(app: FastAPI, config: Config) -> None:
+    # Map known exceptions to responses
+    app.add_exception_handler(InvalidOperationException, get_detail_exception_handler(400))
+    app.add_exception_handler(UnauthorizedOperationException, get_detail_exception_handler(401))
+    app.add_exception_handler(ForbiddenOperationException, get_detail_exception_handler(403))
+    app.add_exception_handler(KeycloakConnectionException, connection_exception_handler)
+    app.add_exception_handler(RedisConnectionException, connection_exception_handler)
+
+    # Compress large responses for clients, which accept gzip encoding
+    app.add_middleware(
+        GZipMiddleware,
+        minimum_size=config.app.gzip_minimum_size,
+        compresslevel=config.app.gzip_compress_level
+    )
+
+    # Handle other exceptions
+    app.add_middleware(ErrorMiddleware)
+
+    # Attribute profiler samples to requests
+    app.add_middleware(ProfilerMiddleware)
+
+    # Add Redis & Keycloak time breakdown to responses
+    if config.app.server_timing:
+        app.add_middleware(ServerTimingMiddleware, log_timings=config.app.log_request_timings)
+
+    # Trace sampled requests
+    if config.app.tracing_enabled:
+        app.add_middleware(TracingMiddleware)
+
+    # Record request metrics (outermost middleware, so that 500 responses are included)
+    if config.app.metrics_enabled:
+        app.add_middleware(MetricsMiddleware)
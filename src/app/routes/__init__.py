@@ -1,4 +1,5 @@
 from fastapi import FastAPI
+from .admin import admin_router
 from .auth import auth_router
 from .protected_test import protected_router
 from .user_feed import user_feed_router
@@ -16,3 +17,4 @@ def setup_routes(app: FastAPI) -> None:
     app.include_router(user_posts_router)
     app.include_router(users_router)
     app.include_router(posts_router)
+    app.include_router(admin_router)
@@ -0,0 +1,78 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from typing import Annotated
+
+from src.app.dependencies import validate_token_role
+from src.util.memory import MEMORY_TRACER
+from src.util.profiler import PROFILER, format_collapsed_stacks
+from src.util.tracing import TracedRoute
+
+
+admin_router = APIRouter(
+    prefix="/admin",
+    route_class=TracedRoute,
+    dependencies=[Depends(validate_token_role("admin"))]
+)
+
+
+@admin_router.get("/profile", include_in_schema=False)
+async def get_profile(
+    seconds: Annotated[float, Query(gt=0, le=60)] = 10,
+    interval: Annotated[float, Query(ge=0.001, le=1)] = 0.01,
+    idle: bool = False
+):
+    """
+    Samples stacks of the current worker's threads for `seconds`
+    and returns them in collapsed-stack format (can be rendered by flamegraph tools).
+    """
+    stacks = await PROFILER.profile(seconds, interval, include_idle=idle)
+    return PlainTextResponse(format_collapsed_stacks(stacks))
+
+
+@admin_router.post("/memory/start", include_in_schema=False)
+async def start_memory_tracing(frames: Annotated[int, Query(ge=1, le=50)] = 1):
+    """ Starts tracing memory allocations of the current worker with `frames` frames per allocation traceback. """
+    MEMORY_TRACER.start(frames)
+    return {"tracing": True}
+
+
+@admin_router.post("/memory/stop", include_in_schema=False)
+async def stop_memory_tracing():
+    """ Stops tracing memory allocations & removes snapshots. """
+    MEMORY_TRACER.stop()
+    return {"tracing": False}
+
+
+@admin_router.get("/memory/snapshots", include_in_schema=False)
+async def get_memory_snapshots():
+    return {"tracing": MEMORY_TRACER.is_tracing, "snapshot_ids": MEMORY_TRACER.get_snapshot_ids()}
+
+
+@admin_router.post("/memory/snapshots", include_in_schema=False)
+async def take_memory_snapshot():
+    snapshot_id = await MEMORY_TRACER.take_snapshot()
+    return {"snapshot_id": snapshot_id}
+
+
+@admin_router.get("/memory/snapshots/{snapshot_id}", include_in_schema=False)
+async def get_memory_snapshot(snapshot_id: int, limit: Annotated[int, Query(ge=1, le=1000)] = 20):
+    """ Returns top `limit` allocation sites & allocations by module in a snapshot. """
+    ensure_memory_snapshot_exists(snapshot_id)
+    return await MEMORY_TRACER.get_statistics(snapshot_id, limit)
+
+
+@admin_router.get("/memory/snapshots/{old_snapshot_id}/diff/{new_snapshot_id}", include_in_schema=False)
+async def get_memory_snapshot_diff(
+    old_snapshot_id: int,
+    new_snapshot_id: int,
+    limit: Annotated[int, Query(ge=1, le=1000)] = 20
+):
+    """ Returns top `limit` allocation sites & modules by allocated size difference between snapshots. """
+    ensure_memory_snapshot_exists(old_snapshot_id)
+    ensure_memory_snapshot_exists(new_snapshot_id)
+    return await MEMORY_TRACER.get_diff(old_snapshot_id, new_snapshot_id, limit)
+
+
+def ensure_memory_snapshot_exists(snapshot_id: int) -> None:
+    if not MEMORY_TRACER.has_snapshot(snapshot_id):
+        raise HTTPException(status_code=404, detail="Snapshot not found.")
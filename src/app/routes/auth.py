@@ -7,9 +7,10 @@ from src.app.models import UserRegistrationCredentials, UserCredentials
 from src.app.tokens import TokenCache
 from src.keycloak.client import KeycloakClient
 from src.redis.client import RedisClient
+from src.util.tracing import TracedRoute
 
 
-auth_router = APIRouter(prefix="/auth")
+auth_router = APIRouter(prefix="/auth", route_class=TracedRoute)
 
 
 @auth_router.post("/register")
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+
+from src.util.metrics import MultiprocessMetrics, REGISTRY, render_snapshot
+
+
+metrics_router = APIRouter(prefix="/metrics")
+
+
+@metrics_router.get("", include_in_schema=False)
+async def get_metrics(request: Request):
+    """ Returns app metrics in Prometheus text format (aggregated over all workers, if `metrics_dir` is set). """
+    multiprocess_metrics: MultiprocessMetrics | None = request.app.state.multiprocess_metrics
+    snapshot = await multiprocess_metrics.collect() if multiprocess_metrics is not None else REGISTRY.snapshot()
+
+    return PlainTextResponse(render_snapshot(snapshot), media_type="text/plain; version=0.0.4")
@@ -1,18 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.responses import ORJSONResponse
 from typing import Annotated
 
 from src.app.dependencies import get_redis_client
+from src.app.etags import get_post_etag, etag_matches, get_cache_headers, POST_CACHE_CONTROL
 from src.app.models import PostID
 from src.redis.client import RedisClient
+from src.util.tracing import TracedRoute
 
 
-posts_router = APIRouter(prefix="/posts")
+posts_router = APIRouter(prefix="/posts", route_class=TracedRoute)
 
 
 @posts_router.get("/{post_id}")
 async def get_post(
     post_id: PostID,
-    redis_client: Annotated[RedisClient, Depends(get_redis_client)]
+    redis_client: Annotated[RedisClient, Depends(get_redis_client)],
+    if_none_match: Annotated[str | None, Header()] = None
 ):
     # Get post from Redis
     post = await redis_client.get_post(post_id)
@@ -20,4 +24,11 @@ async def get_post(
     if post is None:
         raise HTTPException(status_code=404, detail="Post not found.")
     
-    return {"post": post}
+    # Posts are immutable, so ETag depends only on post ID
+    # (it's checked after the post is fetched, so that a matching ETag of a non-existing post is not confirmed)
+    etag = get_post_etag(post_id)
+    headers = get_cache_headers(etag, POST_CACHE_CONTROL)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    
+    return ORJSONResponse(content={"post": post.model_dump()}, headers=headers)
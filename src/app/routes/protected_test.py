@@ -2,9 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException
 from typing import Annotated
 
 from src.app.dependencies import validate_token_role
+from src.util.tracing import TracedRoute
 
 
-protected_router = APIRouter(prefix="/protected_test")
+protected_router = APIRouter(prefix="/protected_test", route_class=TracedRoute)
 
 
 @protected_router.get("/first")
@@ -1,30 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import JSONResponse
+import asyncio
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import ORJSONResponse
 from typing import Annotated
 
 from src.app.dependencies import get_redis_client
+from src.app.etags import get_page_etag, etag_matches, get_cache_headers, PAGE_CACHE_CONTROL
 from src.app.models import Username, PaginationCursor
 from src.redis.client import RedisClient
+from src.util.tracing import TracedRoute
 
 
-user_feed_router = APIRouter(prefix="/users")
+user_feed_router = APIRouter(prefix="/users", route_class=TracedRoute)
 
 
 @user_feed_router.get("/{username}/feed")
 async def get_user_feed(
     username: Username,
     redis_client: Annotated[RedisClient, Depends(get_redis_client)],
-    last_viewed: Annotated[PaginationCursor | None, Query()] = None
+    last_viewed: Annotated[PaginationCursor | None, Query()] = None,
+    if_none_match: Annotated[str | None, Header()] = None
 ):
-    # Check if user exists
-    user = await redis_client.get_user(username)
+    # Check if user exists & get current feed version
+    # (version is fetched before the feed, so that a concurrent update
+    # can only result in a stale ETag, which will not match on the next request)
+    user, feed_version = await asyncio.gather(
+        redis_client.get_user(username),
+        redis_client.get_user_feed_version(username)
+    )
     if user is None:
         raise HTTPException(status_code=404, detail="User not found.")
     
+    # Return 304, if client has the current version of the page
+    etag = get_page_etag("feed", feed_version)
+    headers = get_cache_headers(etag, PAGE_CACHE_CONTROL)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    
     # Get paginated user feed posts
     posts = await redis_client.get_paginated_user_feed(username, last_viewed)
 
     if not posts:
         raise HTTPException(status_code=404, detail="Posts not found.")
     
-    return JSONResponse(content={"posts": [post.model_dump() for post in posts]})
+    return ORJSONResponse(content={"posts": [post.model_dump() for post in posts]}, headers=headers)
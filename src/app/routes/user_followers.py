@@ -1,15 +1,16 @@
 import asyncio
 from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from typing import Annotated
 
 from src.app.dependencies import get_keycloak_client, get_redis_client, get_refreshed_token, get_decoded_token
 from src.app.models import Username, PaginationCursor
 from src.keycloak.client import KeycloakClient
 from src.redis.client import RedisClient
+from src.util.tracing import TracedRoute
 
 
-user_followers_router = APIRouter(prefix="/users")
+user_followers_router = APIRouter(prefix="/users", route_class=TracedRoute)
 
 
 @user_followers_router.put("/{username}/followers/{follower}")
@@ -67,7 +68,7 @@ async def get_followers(
     followers = await redis_client.get_paginated_user_followers(username, last_viewed)
     if not followers:
         raise HTTPException(status_code=404, detail="Followers not found.")
-    return JSONResponse(content={"followers": followers})
+    return ORJSONResponse(content={"followers": followers})
     
     # # Add a follower
     # await redis_client.add_follower(username, follower)
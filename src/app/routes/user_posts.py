@@ -1,15 +1,17 @@
 import asyncio
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import ORJSONResponse
 from typing import Annotated
 
 from src.app.dependencies import get_redis_client, get_decoded_token, validate_token_role
+from src.app.etags import get_page_etag, etag_matches, get_cache_headers, PAGE_CACHE_CONTROL
 from src.app.models import Username, NewPost, Post, PaginationCursor
 from src.redis.client import RedisClient
+from src.util.tracing import TracedRoute
 
 
-user_posts_router = APIRouter(prefix="/users")
+user_posts_router = APIRouter(prefix="/users", route_class=TracedRoute)
 
 
 @user_posts_router.post("/{username}/posts")
@@ -39,24 +41,34 @@ async def add_post(
     await redis_client.add_post_to_followers_feeds(post_with_id)
     
     # Return new post in response
-    return JSONResponse(status_code=201, content={"post": post_with_id.model_dump()})
+    return ORJSONResponse(status_code=201, content={"post": post_with_id.model_dump()})
 
 
 @user_posts_router.get("/{username}/posts")
 async def get_posts(
     username: Username,
     redis_client: Annotated[RedisClient, Depends(get_redis_client)],
-    last_viewed: Annotated[PaginationCursor | None, Query()] = None
+    last_viewed: Annotated[PaginationCursor | None, Query()] = None,
+    if_none_match: Annotated[str | None, Header()] = None
 ):
-    # Check if user exists
-    user = await redis_client.get_user(username)
+    # Check if user exists & get current version of user's posts
+    user, posts_version = await asyncio.gather(
+        redis_client.get_user(username),
+        redis_client.get_user_posts_version(username)
+    )
     if user is None:
         raise HTTPException(status_code=404, detail="User not found.")
     
+    # Return 304, if client has the current version of the page
+    etag = get_page_etag("posts", posts_version)
+    headers = get_cache_headers(etag, PAGE_CACHE_CONTROL)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    
     # Get paginated user posts
     posts = await redis_client.get_paginated_user_posts(username, last_viewed)
 
     if not posts:
         raise HTTPException(status_code=404, detail="Posts not found.")
     
-    return JSONResponse(content={"posts": [post.model_dump() for post in posts]})
+    return ORJSONResponse(content={"posts": [post.model_dump() for post in posts]}, headers=headers)
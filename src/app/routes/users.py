@@ -4,9 +4,10 @@ from typing import Annotated
 from src.app.dependencies import get_redis_client
 from src.app.models import Username
 from src.redis.client import RedisClient
+from src.util.tracing import TracedRoute
 
 
-users_router = APIRouter(prefix="/users")
+users_router = APIRouter(prefix="/users", route_class=TracedRoute)
 
 
 @users_router.get("/{username}")
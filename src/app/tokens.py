@@ -3,9 +3,11 @@ from functools import wraps
 from redis.asyncio import Redis
 
 from src.exceptions import RedisConnectionException
+from src.redis.batching import ReadBatcher
 from src.redis.client import REDIS_LIB_CONNECTION_EXCEPTIONS
+from src.redis.slowlog import current_redis_method
 from src.redis.util import RedisKeys
-from src.util.logging import log
+from src.util.logging import log, LogLevel
 
 
 class TokenCache:
@@ -36,12 +38,15 @@ def handle_redis_connection_errors(raise_on_error: bool = False):
         @wraps(fn)
         async def inner(self: "RedisTokenCache", *args, **kwargs):
             """ Runs a RedisTokenCache method & handles connection exceptions. """
+            token = current_redis_method.set(fn.__qualname__)
             try:
                 return await fn(self, *args, **kwargs)
             except REDIS_LIB_CONNECTION_EXCEPTIONS as e:
-                log(e)
+                log(e, LogLevel.WARNING, key=type(e).__name__)
                 if raise_on_error:
                     raise RedisConnectionException from e
+            finally:
+                current_redis_method.reset(token)
         
         return inner
     return outer
@@ -49,8 +54,9 @@ def handle_redis_connection_errors(raise_on_error: bool = False):
 
 class RedisTokenCache:
     """"""
-    def __init__(self, client: Redis):
+    def __init__(self, client: Redis, batcher: ReadBatcher | None = None):
         self.client = client
+        self.reads: Redis | ReadBatcher = batcher if batcher is not None else client
     
     @handle_redis_connection_errors()
     async def add(self, tokens: dict) -> None:
@@ -68,7 +74,7 @@ class RedisTokenCache:
     @handle_redis_connection_errors(raise_on_error=True)
     async def get(self, access_token: str) -> str | None:
         """ Returns the refresh token for the provided `access_token` or None. """
-        return await self.client.get(RedisKeys.access_token(access_token))
+        return await self.reads.get(RedisKeys.access_token(access_token))
 
     @handle_redis_connection_errors()
     async def pop(self, access_token: str) -> str | None:
@@ -0,0 +1,227 @@
+"""
+On-disk format of synthetic datasets.
+
+A dataset is a directory with:
+- `metadata.json`: generation parameters & totals;
+- `follows.bin`: a block for each user with followers: user index, number of followers
+  & delta-encoded ascending follower indexes;
+- `posts.bin`: a record for each post in the order of post IDs (starting from 1): author index,
+  milliseconds since the previous post (or dataset start for the first one) & content length.
+
+All numbers are unsigned LEB128 varints, so that files are compact & can be written and read as streams.
+Users are identified by indexes from 0 to `users - 1`; their attributes & post contents are derived from indexes.
+"""
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+import json
+from pathlib import Path
+from typing import BinaryIO, Iterator
+from uuid import NAMESPACE_URL, uuid5
+
+from src.app.models import PostWithID, UserWithID
+
+
+FORMAT_VERSION = 1
+METADATA_FILE = "metadata.json"
+FOLLOWS_FILE = "follows.bin"
+POSTS_FILE = "posts.bin"
+
+READ_BUFFER_SIZE = 1 << 20
+WRITE_BUFFER_SIZE = 1 << 20
+
+
+@dataclass
+class DatasetMetadata:
+    users: int
+    start: str
+    """ ISO timestamp of the start of posting period. """
+    parameters: dict = field(default_factory=dict)
+    """ Generation parameters. """
+    follows: int = 0
+    """ Total number of follower relations. """
+    posts: int = 0
+    max_followers: int = 0
+    max_posts: int = 0
+    """ Maximum number of posts of a single user. """
+    version: int = FORMAT_VERSION
+
+
+@dataclass
+class DatasetPost:
+    post_id: int
+    author: int
+    """ Author index. """
+    created_at: datetime
+    content_length: int
+
+
+def get_username(index: int) -> str:
+    return f"user{index:08d}"
+
+
+def get_user(index: int) -> UserWithID:
+    """ Returns a user with the `index` (user ID is stable for the same index). """
+    username = get_username(index)
+    return UserWithID(
+        user_id=str(uuid5(NAMESPACE_URL, f"dataset:{username}")),
+        username=username,
+        first_name=f"First {index}",
+        last_name=f"Last {index}"
+    )
+
+
+def get_post_content(post_id: int, length: int) -> str:
+    """ Returns deterministic post content of the specified `length`. """
+    prefix = f"Post {post_id}. "
+    text = prefix + "lorem ipsum dolor sit amet " * (length // 27 + 1)
+    return text[:length]
+
+
+def get_post(post: DatasetPost) -> PostWithID:
+    return PostWithID(
+        post_id=post.post_id,
+        created_at=post.created_at,
+        content=get_post_content(post.post_id, post.content_length),
+        author=get_username(post.author)
+    )
+
+
+def encode_varint(value: int, out: bytearray) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+class VarintReader:
+    """ Reads varints from a binary stream via an internal buffer. """
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+        self._buffer = b""
+        self._position = 0
+
+    def read(self) -> int | None:
+        """ Returns the next varint or None at the end of stream. """
+        result = shift = 0
+        while True:
+            if self._position >= len(self._buffer):
+                self._buffer = self.stream.read(READ_BUFFER_SIZE)
+                self._position = 0
+                if not self._buffer:
+                    if shift:
+                        raise ValueError("Unexpected end of stream inside a varint.")
+                    return None
+
+            byte = self._buffer[self._position]
+            self._position += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return result
+            shift += 7
+
+    def read_required(self) -> int:
+        value = self.read()
+        if value is None:
+            raise ValueError("Unexpected end of stream.")
+        return value
+
+
+class DatasetWriter:
+    """ Writes a dataset to the `path` directory (existing dataset files are overwritten). """
+    def __init__(self, path: str | Path, metadata: DatasetMetadata):
+        self.path = Path(path)
+        self.metadata = metadata
+        self._last_post_time = datetime.fromisoformat(metadata.start)
+        self._follows_buffer = bytearray()
+        self._posts_buffer = bytearray()
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._follows_file = open(self.path / FOLLOWS_FILE, "wb")
+        self._posts_file = open(self.path / POSTS_FILE, "wb")
+
+    def __enter__(self) -> "DatasetWriter":
+        return self
+
+    def __exit__(self, exc_type, *args) -> None:
+        self.close(write_metadata=exc_type is None)
+
+    def add_followers(self, user: int, followers: list[int]) -> None:
+        """ Adds `followers` (ascending, unique indexes) of a `user`. """
+        if not followers:
+            return
+        buffer = self._follows_buffer
+        encode_varint(user, buffer)
+        encode_varint(len(followers), buffer)
+        previous = 0
+        for follower in followers:
+            encode_varint(follower - previous, buffer)
+            previous = follower
+
+        self.metadata.follows += len(followers)
+        self.metadata.max_followers = max(self.metadata.max_followers, len(followers))
+        if len(buffer) >= WRITE_BUFFER_SIZE:
+            self._flush()
+
+    def add_post(self, author: int, created_at: datetime, content_length: int) -> int:
+        """ Adds a post (posts must be added in the order of `created_at`) & returns its ID. """
+        delta = round((created_at - self._last_post_time).total_seconds() * 1000)
+        if delta < 0:
+            raise ValueError("Posts must be added in the order of their creation time.")
+        self._last_post_time += timedelta(milliseconds=delta)
+
+        buffer = self._posts_buffer
+        encode_varint(author, buffer)
+        encode_varint(delta, buffer)
+        encode_varint(content_length, buffer)
+        self.metadata.posts += 1
+        if len(buffer) >= WRITE_BUFFER_SIZE:
+            self._flush()
+        return self.metadata.posts
+
+    def close(self, write_metadata: bool = True) -> None:
+        self._flush()
+        self._follows_file.close()
+        self._posts_file.close()
+        if write_metadata:
+            with open(self.path / METADATA_FILE, "w") as f:
+                json.dump(asdict(self.metadata), f, indent=2)
+
+    def _flush(self) -> None:
+        self._follows_file.write(self._follows_buffer)
+        self._follows_buffer.clear()
+        self._posts_file.write(self._posts_buffer)
+        self._posts_buffer.clear()
+
+
+class DatasetReader:
+    """ Reads a dataset from the `path` directory. """
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with open(self.path / METADATA_FILE) as f:
+            self.metadata = DatasetMetadata(**json.load(f))
+        if self.metadata.version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported dataset format version: {self.metadata.version}")
+
+    def iter_followers(self) -> Iterator[tuple[int, list[int]]]:
+        """ Yields user indexes & ascending indexes of their followers. """
+        with open(self.path / FOLLOWS_FILE, "rb") as f:
+            reader = VarintReader(f)
+            while (user := reader.read()) is not None:
+                count = reader.read_required()
+                followers = []
+                follower = 0
+                for _ in range(count):
+                    follower += reader.read_required()
+                    followers.append(follower)
+                yield user, followers
+
+    def iter_posts(self) -> Iterator[DatasetPost]:
+        """ Yields posts in the order of their IDs. """
+        created_at = datetime.fromisoformat(self.metadata.start)
+        with open(self.path / POSTS_FILE, "rb") as f:
+            reader = VarintReader(f)
+            post_id = 0
+            while (author := reader.read()) is not None:
+                created_at += timedelta(milliseconds=reader.read_required())
+                post_id += 1
+                yield DatasetPost(post_id, author, created_at, reader.read_required())
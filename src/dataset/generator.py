@@ -0,0 +1,153 @@
+"""
+Synthetic social graph generator.
+
+Follower counts of users follow a power law (a Pareto distribution with `exponent`, truncated to `users - 1`),
+so that most users have a few followers and a few celebrities have a large share of all followers.
+Followers of each user are sampled uniformly from other users.
+
+Posting rates of users are log-normally distributed around `posts_per_day`; posts of each user form a Poisson process.
+The superposition of users' processes is a Poisson process with the total rate, where each post is authored by
+a user with a probability, proportional to the user's rate, so posts are generated in the order of their creation
+(and IDs, like the app assigns them) without keeping them in memory.
+
+Generation is deterministic for the same parameters & seed.
+"""
+from array import array
+from bisect import bisect_right
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+import math
+from pathlib import Path
+import random
+from time import perf_counter
+from typing import Callable
+
+from src.dataset.format import DatasetMetadata, DatasetWriter
+
+
+MAX_CONTENT_LENGTH = 1000
+""" Maximum post content length, allowed by the app. """
+
+
+@dataclass
+class GraphParameters:
+    users: int
+    avg_followers: float = 10
+    """ Expected mean number of followers (before truncation to `users - 1`). """
+    exponent: float = 2.1
+    """ Power law exponent of follower counts (must be > 2 for a finite mean; lower values result in heavier tails). """
+    posts_per_day: float = 1
+    """ Mean posting rate of a user. """
+    posting_rate_sigma: float = 1
+    """ Standard deviation of the log of users' posting rates. """
+    days: float = 30
+    """ Duration of posting period. """
+    avg_content_length: int = 140
+    start: str = "2025-01-01T00:00:00+00:00"
+    """ ISO timestamp of the start of posting period. """
+    seed: int = 0
+
+    def validate(self) -> None:
+        if self.users < 2:
+            raise ValueError("At least 2 users are required.")
+        if self.exponent <= 2:
+            raise ValueError("Follower count exponent must be greater than 2.")
+        if self.avg_followers < 0 or self.posts_per_day < 0 or self.days < 0 or self.posting_rate_sigma < 0:
+            raise ValueError("Averages, posting rate deviation & duration must not be negative.")
+        if not 1 <= self.avg_content_length <= MAX_CONTENT_LENGTH:
+            raise ValueError(f"Average content length must be between 1 and {MAX_CONTENT_LENGTH}.")
+
+
+@dataclass
+class GenerationProgress:
+    stage: str
+    """ "follows" or "posts". """
+    done: int
+    """ Number of processed users or generated posts. """
+    total: int
+    """ Number of users or expected number of posts. """
+    elapsed: float
+
+
+def get_follower_count(rng: random.Random, parameters: GraphParameters) -> int:
+    """ Returns a random number of followers from a power law distribution with the mean of `avg_followers`. """
+    alpha = parameters.exponent - 1     # shape of Pareto distribution of follower counts
+    minimum = parameters.avg_followers * (alpha - 1) / alpha
+    return min(parameters.users - 1, int(minimum * rng.paretovariate(alpha)))
+
+
+def sample_followers(rng: random.Random, users: int, user: int, count: int) -> list[int]:
+    """ Returns `count` ascending indexes of unique users except `user`. """
+    followers = rng.sample(range(users - 1), count)
+    followers.sort()
+    # Skip the user itself
+    return [follower + 1 if follower >= user else follower for follower in followers]
+
+
+def get_content_length(rng: random.Random, parameters: GraphParameters) -> int:
+    return max(1, min(MAX_CONTENT_LENGTH, round(rng.expovariate(1 / parameters.avg_content_length))))
+
+
+def generate_dataset(
+    path: str | Path,
+    parameters: GraphParameters,
+    on_progress: Callable[[GenerationProgress], None] | None = None,
+    progress_interval: int = 100_000
+) -> DatasetMetadata:
+    """
+    Generates a dataset with `parameters` in the `path` directory & returns its metadata.
+    `on_progress` is called after each `progress_interval` users or posts.
+    """
+    parameters.validate()
+    start_time = perf_counter()
+    start = datetime.fromisoformat(parameters.start)
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    metadata = DatasetMetadata(users=parameters.users, start=start.isoformat(), parameters=asdict(parameters))
+
+    def report(stage: str, done: int, total: int) -> None:
+        if on_progress is not None:
+            on_progress(GenerationProgress(stage, done, total, perf_counter() - start_time))
+
+    with DatasetWriter(path, metadata) as writer:
+        # Followers (a separate random generator for each stage, so that stages don't affect each other)
+        rng = random.Random(f"{parameters.seed}:follows")
+        for user in range(parameters.users):
+            count = get_follower_count(rng, parameters)
+            if count > 0:
+                writer.add_followers(user, sample_followers(rng, parameters.users, user, count))
+            if (user + 1) % progress_interval == 0:
+                report("follows", user + 1, parameters.users)
+        if parameters.users % progress_interval:
+            report("follows", parameters.users, parameters.users)
+
+        # Posting rates (posts per day) & their cumulative sums for sampling authors
+        rng = random.Random(f"{parameters.seed}:posts")
+        sigma = parameters.posting_rate_sigma
+        rates = (
+            parameters.posts_per_day * math.exp(rng.gauss(-sigma * sigma / 2, sigma))
+            for _ in range(parameters.users)
+        )
+        cumulative_rates = array("d", accumulate(rates))
+        total_rate = cumulative_rates[-1]
+        expected_posts = round(total_rate * parameters.days)
+
+        # Posts
+        post_counts = array("I", bytes(4 * parameters.users))
+        day = 0.0
+        while total_rate > 0:
+            day += rng.expovariate(total_rate)
+            if day >= parameters.days:
+                break
+
+            author = min(bisect_right(cumulative_rates, rng.random() * total_rate), parameters.users - 1)
+            post_counts[author] += 1
+            post_id = writer.add_post(author, start + timedelta(days=day), get_content_length(rng, parameters))
+            if post_id % progress_interval == 0:
+                report("posts", post_id, expected_posts)
+
+        metadata.max_posts = max(post_counts, default=0)
+        report("posts", metadata.posts, metadata.posts)
+
+    return metadata
@@ -0,0 +1,242 @@
+"""
+Bulk loader of synthetic datasets into Redis.
+
+Produces the same keys as the live write paths would, if follows of a dataset were added before its posts:
+- user hashes & follower sets (`RedisClient.set_user` & `add_follower`);
+- posts, posts of users & their versions (`add_new_post`), `next_post_id`;
+- feeds & their versions, which are incremented for each post (`add_post_to_followers_feeds`).
+
+Users are split into partitions by their indexes, and each partition is loaded by a separate process
+with non-transactional pipelines of raw commands (per shard, if client-side sharding is used).
+"""
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import multiprocessing
+from pathlib import Path
+from time import perf_counter, sleep
+from typing import Any, Callable
+
+from redis import Redis
+from redis.cluster import RedisCluster
+
+from config import RedisConfig
+from src.dataset.format import DatasetReader, get_post, get_user, get_username
+from src.redis.admin import close_admin_clients, create_admin_clients, get_primary_nodes
+from src.redis.sharding import HashRing
+from src.redis.util import RedisKeys
+
+
+@dataclass
+class LoadStats:
+    keys: int = 0
+    """ Number of key writes (a key, which is written by multiple commands, e.g. a feed, is counted for each of them). """
+    total_keys: int | None = None
+    """ Number of keys in the database after loading. """
+    elapsed: float = 0
+
+
+class PipelineWriter:
+    """
+    Writes commands via non-transactional pipelines of `batch_size` commands
+    (a separate pipeline for each shard, if `clients` contain multiple shards).
+    """
+    def __init__(self, clients: dict[str, Redis] | RedisCluster, batch_size: int, on_flush: Callable[[int], None]):
+        self.batch_size = batch_size
+        self.on_flush = on_flush
+        """ Called with the number of written commands after each pipeline is executed. """
+        if isinstance(clients, RedisCluster):
+            self._ring = None
+            self._pipelines = {"": clients.pipeline()}
+        else:
+            self._ring = HashRing(list(clients)) if len(clients) > 1 else None
+            self._pipelines = {node: client.pipeline(transaction=False) for node, client in clients.items()}
+        self._single_pipeline = next(iter(self._pipelines.values())) if len(self._pipelines) == 1 else None
+
+    def write(self, *args: Any) -> None:
+        """ Adds a command with a key as its second argument (e.g. "SET", key, value). """
+        pipe = self._single_pipeline
+        if pipe is None:
+            pipe = self._pipelines[self._ring.get_node(args[1])]  # type: ignore[union-attr]
+        pipe.execute_command(*args)
+        if len(pipe) >= self.batch_size:
+            self._execute(pipe)
+
+    def flush(self) -> None:
+        for pipe in self._pipelines.values():
+            if len(pipe):
+                self._execute(pipe)
+
+    def _execute(self, pipe) -> None:
+        count = len(pipe)
+        pipe.execute()
+        self.on_flush(count)
+
+
+class DatasetLoader:
+    """
+    Loads a dataset from the `path` directory into an empty Redis database, which is configured in `redis_config`,
+    with `workers` processes. Members of large sorted sets are added with multiple commands of `batch_size` members.
+    """
+    def __init__(self, redis_config: RedisConfig, path: str | Path, workers: int = 4, batch_size: int = 1000):
+        self.redis_config = redis_config
+        self.path = Path(path)
+        self.workers = workers
+        self.batch_size = batch_size
+        self.metadata = DatasetReader(path).metadata
+
+    def load(
+        self,
+        flush: bool = False,
+        on_progress: Callable[[LoadStats], None] | None = None,
+        progress_interval: float = 1
+    ) -> LoadStats:
+        """
+        Loads the dataset & returns loading statistics.
+        If `flush` is true, clears the database before loading; otherwise, it must be empty,
+        because feed versions are incremented.
+        `on_progress` is called with current statistics each `progress_interval` seconds.
+        """
+        clients = create_admin_clients(self.redis_config)
+        try:
+            nodes = get_primary_nodes(clients)
+            if flush:
+                for node in nodes:
+                    node.flushdb()
+            elif any(node.dbsize() for node in nodes):
+                raise ValueError("Database is not empty.")
+
+            stats = LoadStats()
+            start = perf_counter()
+            progress = multiprocessing.Array("q", self.workers)
+
+            with ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(progress,)) as executor:
+                futures = [
+                    executor.submit(
+                        load_partition, self.redis_config, self.path, partition, self.workers, self.batch_size
+                    )
+                    for partition in range(self.workers)
+                ]
+                next_report = progress_interval
+                while not all(future.done() for future in futures):
+                    sleep(0.1)
+                    stats.keys = sum(progress)  # type: ignore[arg-type]
+                    stats.elapsed = perf_counter() - start
+                    if on_progress is not None and stats.elapsed >= next_report:
+                        on_progress(stats)
+                        next_report += progress_interval
+                stats.keys = sum(future.result() for future in futures)
+
+            if self.metadata.posts:
+                writer = PipelineWriter(clients, self.batch_size, lambda count: None)
+                writer.write("SET", RedisKeys.next_post_id, self.metadata.posts)
+                writer.flush()
+                stats.keys += 1
+
+            stats.total_keys = sum(node.dbsize() for node in nodes)  # type: ignore[misc]
+            stats.elapsed = perf_counter() - start
+            if on_progress is not None:
+                on_progress(stats)
+            return stats
+        finally:
+            close_admin_clients(clients)
+
+
+_progress: Any = None
+""" Shared array with the number of written keys of each partition. """
+
+
+def _init_worker(progress: Any) -> None:
+    global _progress
+    _progress = progress
+
+
+def load_partition(redis_config: RedisConfig, path: Path, partition: int, partitions: int, batch_size: int) -> int:
+    """
+    Loads data of users with indexes, which give `partition` remainder, when divided by `partitions`
+    (users, their followers, posts & posts in their followers' feeds) & returns the number of written keys.
+    """
+    reader = DatasetReader(path)
+    users = reader.metadata.users
+    written = 0
+
+    def on_flush(count: int) -> None:
+        nonlocal written
+        written += count
+        if _progress is not None:
+            _progress[partition] = written
+
+    clients = create_admin_clients(redis_config)
+    try:
+        writer = PipelineWriter(clients, batch_size, on_flush)
+
+        # Posts (post IDs of each author are collected for posts lists & feeds)
+        authors, post_ids = array("I"), array("I")
+        for post in reader.iter_posts():
+            if post.author % partitions == partition:
+                writer.write("SET", RedisKeys.post(post.post_id), get_post(post).model_dump_json())
+                authors.append(post.author)
+                post_ids.append(post.post_id)
+
+        # Group post IDs by author (ascending for each author)
+        offsets = array("Q", bytes(8 * (users + 1)))
+        for author in authors:
+            offsets[author + 1] += 1
+        for i in range(users):
+            offsets[i + 1] += offsets[i]
+        positions = array("Q", offsets)
+        author_post_ids = array("I", bytes(4 * len(post_ids)))
+        for author, post_id in zip(authors, post_ids):
+            author_post_ids[positions[author]] = post_id
+            positions[author] += 1
+        del authors, post_ids, positions
+
+        def get_post_id_args(user: int) -> list:
+            """ Returns score-member arguments of ZADD for posts of a `user` (as in `get_post_id_mapping`). """
+            args = []
+            for post_id in author_post_ids[offsets[user]:offsets[user + 1]]:
+                args.extend((-post_id, post_id))
+            return args
+
+        # Users & their posts lists
+        for user in range(partition, users, partitions):
+            username = get_username(user)
+            writer.write("HSET", RedisKeys.user(username), *_get_hash_args(get_user(user).model_dump()))
+            post_id_args = get_post_id_args(user)
+            if post_id_args:
+                _write_zadd(writer, RedisKeys.user_posts(username), post_id_args, batch_size)
+                writer.write("SET", RedisKeys.user_posts_version(username), len(post_id_args) // 2)
+
+        # Followers & feeds (feed version is incremented for each post of followed users)
+        for user, followers in reader.iter_followers():
+            if user % partitions != partition:
+                continue
+            follower_usernames = [get_username(follower) for follower in followers]
+            follower_args = []
+            for follower in follower_usernames:
+                follower_args.extend((0, follower))
+            _write_zadd(writer, RedisKeys.user_followers(get_username(user)), follower_args, batch_size)
+
+            post_id_args = get_post_id_args(user)
+            if post_id_args:
+                for follower in follower_usernames:
+                    _write_zadd(writer, RedisKeys.user_feed(follower), post_id_args, batch_size)
+                    writer.write("INCRBY", RedisKeys.user_feed_version(follower), len(post_id_args) // 2)
+
+        writer.flush()
+        return written
+    finally:
+        close_admin_clients(clients)
+
+
+def _get_hash_args(mapping: dict) -> list:
+    args = []
+    for item in mapping.items():
+        args.extend(item)
+    return args
+
+
+def _write_zadd(writer: PipelineWriter, key: str, score_member_args: list, batch_size: int) -> None:
+    """ Adds members to a sorted set with ZADD commands of at most `batch_size` members. """
+    for i in range(0, len(score_member_args), 2 * batch_size):
+        writer.write("ZADD", key, *score_member_args[i:i + 2 * batch_size])
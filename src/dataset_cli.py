@@ -0,0 +1,75 @@
+from pathlib import Path
+import typer
+
+if __name__ == "__main__":
+    import sys
+    project_root = Path(__file__).parent.parent
+    sys.path.insert(0, str(project_root))
+
+from config import load_config
+from src.dataset.generator import GenerationProgress, GraphParameters, generate_dataset
+from src.dataset.loader import DatasetLoader, LoadStats
+
+
+app = typer.Typer(pretty_exceptions_enable=False)
+""" CLI utility for generating synthetic datasets & loading them into Redis. """
+
+
+@app.callback()
+def main():
+    pass
+
+
+@app.command(help="Generates a synthetic social graph with power law follower counts & posts in the `path` directory.")
+def generate(
+    path: Path,
+    users: int = typer.Option(..., help="Number of users."),
+    avg_followers: float = typer.Option(10, help="Mean number of followers of a user."),
+    exponent: float = typer.Option(2.1, help="Power law exponent of follower counts (> 2, lower values result in more celebrities)."),
+    posts_per_day: float = typer.Option(1, help="Mean number of posts of a user per day."),
+    posting_rate_sigma: float = typer.Option(1, help="Standard deviation of the log of users' posting rates."),
+    days: float = typer.Option(30, help="Duration of posting period in days."),
+    avg_content_length: int = 140,
+    start: str = typer.Option(GraphParameters.start, help="ISO timestamp of the start of posting period."),
+    seed: int = 0
+):
+    parameters = GraphParameters(
+        users=users, avg_followers=avg_followers, exponent=exponent, posts_per_day=posts_per_day,
+        posting_rate_sigma=posting_rate_sigma, days=days, avg_content_length=avg_content_length, start=start, seed=seed
+    )
+
+    def on_progress(progress: GenerationProgress) -> None:
+        typer.echo(f"\r{progress.stage}: {progress.done} / {progress.total} ({progress.elapsed:.1f}s)", nl=False)
+        if progress.done == progress.total:
+            typer.echo("")
+
+    metadata = generate_dataset(path, parameters, on_progress=on_progress)
+    typer.echo(
+        f"Generated {metadata.users} users, {metadata.follows} follows (max {metadata.max_followers} followers) "
+        f"& {metadata.posts} posts (max {metadata.max_posts} per user) in {path}."
+    )
+
+
+@app.command(help="Loads a dataset from the `path` directory into the configured Redis database, which must be empty.")
+def load(
+    path: Path,
+    workers: int = typer.Option(4, help="Number of loading processes."),
+    batch_size: int = typer.Option(1000, help="Number of commands in a pipeline & maximum number of members in a ZADD."),
+    flush: bool = typer.Option(False, help="Clear the database before loading.")
+):
+    config = load_config()
+
+    def on_progress(stats: LoadStats) -> None:
+        rate = stats.keys / stats.elapsed if stats.elapsed else 0
+        typer.echo(f"\rwritten {stats.keys} keys ({rate:.0f} keys/s)", nl=False)
+
+    stats = DatasetLoader(config.redis, path, workers, batch_size).load(flush=flush, on_progress=on_progress)
+    typer.echo("")
+    typer.echo(
+        f"Wrote {stats.keys} keys in {stats.elapsed:.1f}s ({stats.keys / stats.elapsed:.0f} keys/s), "
+        f"database contains {stats.total_keys} keys."
+    )
+
+
+if __name__ == "__main__":
+    app()
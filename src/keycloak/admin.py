@@ -9,7 +9,10 @@ from config import KeycloakConfig
 
 
 ALL_ROLES = ["role-1", "role-2", "can-post"]
-""" Full list of Keycloak app client roles. """
+""" Full list of Keycloak app client roles, which are granted to users by default. """
+
+ADMIN_ROLE = "admin"
+""" App client role, which is required by admin routes (granted to users explicitly). """
 
 
 def reset_keycloak_app_realm(kc_config: KeycloakConfig):
@@ -25,6 +28,7 @@ def reset_keycloak_app_realm(kc_config: KeycloakConfig):
         keycloak_admin_client.add_client_role("role-1")
         keycloak_admin_client.add_client_role("role-2")
         keycloak_admin_client.add_client_role("can-post")
+        keycloak_admin_client.add_client_role(ADMIN_ROLE)
 
 
 def reset_keycloak_app_realm_users(kc_config: KeycloakConfig):
@@ -1,5 +1,6 @@
 from functools import wraps
 import json
+from time import perf_counter
 
 from keycloak import KeycloakOpenID, KeycloakAdmin
 from keycloak.exceptions import KeycloakAuthenticationError, KeycloakPostError, \
@@ -8,6 +9,41 @@ from keycloak.exceptions import KeycloakAuthenticationError, KeycloakPostError,
 from config import KeycloakConfig
 from src.app.models import UserCredentials, UserRegistrationCredentials
 from src.exceptions import InvalidOperationException, UnauthorizedOperationException, KeycloakConnectionException
+from src.util.metrics import HistogramMetric
+from src.util.timing import add_keycloak_time
+from src.util.tracing import record_span
+
+
+KEYCLOAK_REQUEST_DURATION = HistogramMetric(
+    "keycloak_request_duration_seconds",
+    "Keycloak call latency by operation & outcome (success or error).",
+    ("operation", "outcome")
+)
+
+
+def observe_operation(operation: str):
+    """ Decorator, which records the latency of a Keycloak `operation` in metrics, current request timings & trace. """
+    def decorator(fn):
+        @wraps(fn)
+        async def inner(self: "KeycloakClient", *args, **kwargs):
+            start = perf_counter()
+            outcome = "error"
+            error: BaseException | None = None
+            try:
+                result = await fn(self, *args, **kwargs)
+                outcome = "success"
+                return result
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                record_span(f"keycloak {operation}", start, error)
+                duration = perf_counter() - start
+                KEYCLOAK_REQUEST_DURATION.labels(operation, outcome).observe(duration)
+                add_keycloak_time(duration)
+
+        return inner
+    return decorator
 
 
 def ensure_admin_token(fn):
@@ -47,6 +83,7 @@ class KeycloakClient:
             realm_name=kc_config.app_realm_name
         )
     
+    @observe_operation("register")
     @ensure_admin_token
     async def register(self, credentials: UserRegistrationCredentials) -> str:
         try:
@@ -79,6 +116,7 @@ class KeycloakClient:
         except (KeycloakConnectionError,) as e:
             raise KeycloakConnectionException from e
     
+    @observe_operation("token")
     async def login(self, credentials: UserCredentials) -> dict:
         try:
             return await self.client.a_token(credentials.username, credentials.password)
@@ -88,6 +126,7 @@ class KeycloakClient:
         except (KeycloakConnectionError,) as e:
             raise KeycloakConnectionException from e
     
+    @observe_operation("logout")
     async def logout(self, refresh_token: str):
         try:
             await self.client.a_logout(refresh_token)
@@ -103,6 +142,7 @@ class KeycloakClient:
             except:
                 raise e
 
+    @observe_operation("introspect")
     async def introspect_token(self, access_token: str) -> dict:
         """ Introspects the `access_token` and returns the introspection results. """
         try:
@@ -110,6 +150,7 @@ class KeycloakClient:
         except KeycloakConnectionError as e:
             raise KeycloakConnectionException from e
 
+    @observe_operation("refresh")
     async def refresh_token(self, refresh_token: str) -> dict:
         """ Refreshes access token using `refresh_token`. Returns new tokens. """
         try:
@@ -119,6 +160,7 @@ class KeycloakClient:
         except (KeycloakAuthenticationError, KeycloakPostError) as e:
             raise UnauthorizedOperationException("User session expired or do not exist.") from e
 
+    @observe_operation("decode")
     async def decode_token(self, access_token: str, validate: bool = True) -> dict:
         """ Decodes the access token and returns its contents. """
         try:
@@ -0,0 +1,108 @@
+from pathlib import Path
+import typer
+
+if __name__ == "__main__":
+    import sys
+    project_root = Path(__file__).parent.parent
+    sys.path.insert(0, str(project_root))
+
+from config import load_config
+from src.redis.admin import close_admin_clients, create_admin_clients, get_primary_nodes
+from src.redis.memory import MemoryAnalyzer, MemoryReport, project_memory
+
+
+config = load_config()
+app = typer.Typer(pretty_exceptions_enable=False)
+""" CLI utility for analyzing Redis memory usage. """
+
+
+@app.callback()
+def main():
+    pass
+
+
+def format_bytes(value: float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(value) < 1024:
+            return f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} TiB"
+
+
+def echo_report(report: MemoryReport) -> None:
+    typer.echo(
+        f"Scanned {report.scanned} of {report.total_keys} keys, "
+        f"used memory: {format_bytes(report.used_memory)}, keys: {format_bytes(report.keys_memory)}."
+    )
+    typer.echo(f"{'prefix':<20}{'keys':>12}{'sampled':>9}{'avg size':>12}{'avg length':>12}{'total':>12}  encodings")
+    for stats in report.prefixes.values():
+        encodings = ", ".join(f"{encoding}: {count}" for encoding, count in stats.encodings.items())
+        typer.echo(
+            f"{stats.prefix:<20}{stats.keys:>12}{len(stats.samples):>9}{format_bytes(stats.avg_memory):>12}"
+            f"{stats.avg_length:>12.1f}{format_bytes(stats.total_memory):>12}  {encodings}"
+        )
+
+    typer.echo("")
+    typer.echo("Families:")
+    for family, memory in sorted(report.families.items(), key=lambda item: -item[1]):
+        share = memory / report.keys_memory if report.keys_memory else 0
+        typer.echo(f"  {family:<10}{format_bytes(memory):>12}{share:>8.1%}")
+
+    # Sets, which were converted from compact encodings
+    for stats in report.prefixes.values():
+        non_compact = stats.non_compact_samples
+        if non_compact:
+            largest = max(non_compact, key=lambda sample: sample.length)
+            limit = report.compact_limits.get(largest.type)
+            typer.echo(
+                f"WARNING: {len(non_compact)} of {len(stats.samples)} sampled {stats.prefix} keys are "
+                f"{largest.encoding}-encoded (compact limit: {limit} entries); "
+                f"the largest one ({largest.key}) has {largest.length} members & takes {format_bytes(largest.memory)}."
+            )
+
+
+@app.command(help="Estimates memory usage of each key prefix & family from a sample of keys.")
+def analyze(
+    sample_size: int = typer.Option(200, help="Maximum number of sampled keys of each prefix."),
+    max_scanned_keys: int = typer.Option(None, help="Scan only a part of the keyspace & extrapolate key counts."),
+    memory_samples: int = typer.Option(None, help="SAMPLES argument of MEMORY USAGE (0 to inspect all nested values)."),
+    users: int = typer.Option(None, help="Target number of users for memory projection."),
+    avg_followers: float = typer.Option(None, help="Target average number of followers for memory projection."),
+    seed: int = typer.Option(None, help="Seed for key sampling.")
+):
+    clients = create_admin_clients(config.redis)
+    try:
+        analyzer = MemoryAnalyzer(get_primary_nodes(clients), sample_size, max_scanned_keys, memory_samples, seed=seed)
+        report = analyzer.analyze(on_progress=lambda scanned: typer.echo(f"\rscanned {scanned} keys", nl=False))
+    finally:
+        close_admin_clients(clients)
+    typer.echo("")
+    echo_report(report)
+
+    if users is None and avg_followers is None:
+        return
+    users = users or report.users
+    avg_followers = report.avg_followers if avg_followers is None else avg_followers
+    projection = project_memory(report, users, avg_followers)
+
+    typer.echo("")
+    typer.echo(
+        f"Projection for {users} users with {avg_followers:.1f} followers on average "
+        f"(current: {report.users} users, {report.avg_followers:.1f} followers):"
+    )
+    typer.echo(f"{'prefix':<20}{'keys':>12}{'avg size':>12}{'total':>12}{'non-compact':>13}")
+    for prefix in projection.values():
+        typer.echo(
+            f"{prefix.prefix:<20}{prefix.keys:>12}{format_bytes(prefix.avg_memory):>12}"
+            f"{format_bytes(prefix.total_memory):>12}{prefix.non_compact_ratio:>13.1%}"
+        )
+    total = sum(prefix.total_memory for prefix in projection.values())
+    overhead = report.used_memory / report.keys_memory if report.keys_memory else 1
+    typer.echo(
+        f"Total: {format_bytes(total)} of keys, ~{format_bytes(total * overhead)} with current overhead ratio "
+        f"({overhead:.2f})."
+    )
+
+
+if __name__ == "__main__":
+    app()
@@ -1,4 +1,5 @@
-from redis import Redis
+from redis import ConnectionPool, Redis
+from redis.cluster import ClusterNode, RedisCluster
 from redis.exceptions import BusyLoadingError, ConnectionError
 
 from time import sleep
@@ -6,6 +7,8 @@ from typing import Self
 
 from config import RedisConfig
 from src.app.models import UserWithID, PostWithID
+from src.redis.connection import parse_address
+from src.redis.transport import get_keepalive_kwargs, get_transport_kwargs
 from src.redis.util import RedisKeys, get_post_id_mapping
 
 
@@ -15,14 +18,15 @@ class RedisAdminClient:
     """
 
     def __init__(self, redis_config: RedisConfig):
-        self.client = Redis(
-            host="localhost",
-            port=redis_config.container_port,
+        self.client = Redis.from_pool(ConnectionPool(
+            # Redis location & credentials
+            **get_transport_kwargs(redis_config, sync=True),
             db=redis_config.database,
             password=redis_config.password,
 
-            decode_responses=True
-        )
+            decode_responses=True,
+            protocol=redis_config.protocol
+        ))
     
     def __enter__(self) -> Self:
         self.wait_for_server()
@@ -66,6 +70,7 @@ class RedisAdminClient:
         user_post_ids: list[str] = self.client.zrange(RedisKeys.user_posts(username), 0, -1)    # type: ignore
         if user_post_ids:
             self.client.zadd(RedisKeys.user_feed(follower), get_post_id_mapping(user_post_ids))
+            self.client.incr(RedisKeys.user_feed_version(follower))
     
     def get_user_followers(self, username: str) -> list[str]:
         return self.client.zrange(
@@ -78,11 +83,13 @@ class RedisAdminClient:
 
         # Add post to the posts of author
         self.client.zadd(RedisKeys.user_posts(post.author), get_post_id_mapping(post.post_id))
+        self.client.incr(RedisKeys.user_posts_version(post.author))
 
         # Add post to the feeds of author followers
         followers: list[str] = self.client.zrange(RedisKeys.user_followers(post.author), 0, -1) # type: ignore
         for follower in followers:
             self.client.zadd( RedisKeys.user_feed(follower), get_post_id_mapping(post.post_id))
+            self.client.incr(RedisKeys.user_feed_version(follower))
     
     def get_user_post_ids(self, username: str) -> list[int]:
         return [
@@ -100,9 +107,50 @@ class RedisAdminClient:
             self.client.get(RedisKeys.next_post_id) # type: ignore
         )
     
+    def get_user_feed_version(self, username: str) -> int:
+        return int(self.client.get(RedisKeys.user_feed_version(username)) or 0)    # type: ignore
+    
     def get_user_feed(self, username: str) -> list[int]:
         str_post_ids: list[str] = self.client.zrange(
             RedisKeys.user_feed(username), 0, -1
         )   # type: ignore
         return [int(post_id) for post_id in str_post_ids]
 
+
+def create_admin_clients(redis_config: RedisConfig) -> dict[str, Redis] | RedisCluster:
+    """
+    Returns a sync cluster client, if cluster mode is enabled in `redis_config`,
+    or a mapping between shard addresses & their clients (a single client for the primary, if shards are not used).
+    """
+    kwargs = {"password": redis_config.password, "socket_timeout": redis_config.socket_timeout}
+    if redis_config.cluster_mode:
+        cluster_nodes = redis_config.cluster_nodes or [f"localhost:{redis_config.container_port}"]
+        return RedisCluster(
+            startup_nodes=[ClusterNode(*parse_address(node)) for node in cluster_nodes],
+            **get_keepalive_kwargs(redis_config),
+            **kwargs
+        )
+
+    # Shards are keyed by their configured addresses, so that keys are mapped to the same shards as by `ShardedRedis`
+    shards = redis_config.shards or [""]
+    return {
+        shard: Redis.from_pool(ConnectionPool(
+            **get_transport_kwargs(redis_config, parse_address(shard) if shard else None, sync=True),
+            db=redis_config.database,
+            protocol=redis_config.protocol,
+            **kwargs
+        ))
+        for shard in shards
+    }
+
+
+def get_primary_nodes(clients: dict[str, Redis] | RedisCluster) -> list[Redis]:
+    """ Returns clients of all primary nodes (shards or cluster primaries). """
+    if isinstance(clients, RedisCluster):
+        return [clients.get_redis_connection(node) for node in clients.get_primaries()]
+    return list(clients.values())
+
+
+def close_admin_clients(clients: dict[str, Redis] | RedisCluster) -> None:
+    for client in ([clients] if isinstance(clients, RedisCluster) else clients.values()):
+        client.close()
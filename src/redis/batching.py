@@ -0,0 +1,103 @@
+import asyncio
+from typing import Any
+
+from redis.asyncio import Redis
+
+
+class ReadBatcher:
+    """
+    Collects GET, HGETALL, ZRANGE & MGET commands, which were issued by concurrent callers
+    in the same event loop tick (or during `max_wait` seconds), and sends them to Redis
+    as a single non-transactional pipeline. Results are dispatched back to each caller.
+
+    Exposes the same signatures of read commands as `redis.asyncio.Redis`.
+    """
+    def __init__(self, client: Redis, max_batch_size: int, max_wait: float):
+        self.client = client
+        self.max_batch_size = max_batch_size
+        """ Maximum number of commands in a batch; full batches are sent immediately. """
+        self.max_wait = max_wait
+        """ Time in seconds to wait for more commands after the first command of a batch (0 = until the end of current tick). """
+
+        self._batch: list[tuple[str, tuple, asyncio.Future]] = []
+        self._flush_handle: asyncio.Handle | None = None
+        self._running: set[asyncio.Task] = set()
+
+        self.batches = 0
+        """ Number of sent batches. """
+        self.commands = 0
+        """ Number of sent commands. """
+    
+    def get(self, key: str) -> asyncio.Future:
+        return self._add("get", key)
+    
+    def hgetall(self, key: str) -> asyncio.Future:
+        return self._add("hgetall", key)
+    
+    def zrange(self, key: str, start: int, end: int) -> asyncio.Future:
+        return self._add("zrange", key, start, end)
+    
+    def mget(self, keys: list[str]) -> asyncio.Future:
+        return self._add("mget", keys)
+    
+    async def close(self) -> None:
+        """ Sends current batch & waits for running batches to complete. """
+        self._flush()
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+    
+    def _add(self, command: str, *args: Any) -> asyncio.Future:
+        """ Adds a command to the current batch and returns a future for its result. """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._batch.append((command, args, future))
+
+        if len(self._batch) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_soon(self._flush) if self.max_wait == 0 \
+                else loop.call_later(self.max_wait, self._flush)
+        
+        return future
+
+    def _flush(self) -> None:
+        """ Starts sending current batch. """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        
+        batch, self._batch = self._batch, []
+        if batch:
+            task = asyncio.ensure_future(self._send(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+    
+    async def _send(self, batch: list[tuple[str, tuple, asyncio.Future]]) -> None:
+        """ Sends `batch` commands to Redis & sets results of their futures. """
+        self.batches += 1
+        self.commands += len(batch)
+
+        try:
+            # Avoid pipeline overhead for single commands
+            if len(batch) == 1:
+                command, args, _ = batch[0]
+                results = [await getattr(self.client, command)(*args)]
+            else:
+                pipe = self.client.pipeline(transaction=False)
+                for command, args, _ in batch:
+                    getattr(pipe, command)(*args)
+                results = await pipe.execute(raise_on_error=False)
+        
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, _, future), result in zip(batch, results):
+            if future.done():   # caller was cancelled
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -1,11 +1,17 @@
 from functools import wraps
 
 from redis.asyncio import Redis
+from redis.asyncio.cluster import RedisCluster
 from redis.exceptions import BusyLoadingError, ConnectionError, TimeoutError
 
 from src.app.models import User, UserPublic, PostWithID, Post
 from src.exceptions import RedisConnectionException
-from src.redis.util import RedisKeys, get_post_id_mapping
+from src.redis.batching import ReadBatcher
+from src.redis.coalescing import ReadCoalescer, coalesce_reads
+from src.redis.replicas import ReplicaRouter, ReadYourWritesTracker
+from src.redis.sharding import ShardedRedis
+from src.redis.slowlog import current_redis_method
+from src.redis.util import RedisKeys, get_post_id_mapping, group_by_slot
 
 
 REDIS_LIB_CONNECTION_EXCEPTIONS = (BusyLoadingError, ConnectionError, TimeoutError)
@@ -15,22 +21,38 @@ def handle_redis_connection_errors(fn):
     @wraps(fn)
     async def inner(self: "RedisClient", *args, **kwargs):
         """ Runs a Redis client method & handles connection exceptions. """
+        token = current_redis_method.set(fn.__qualname__)
         try:
             return await fn(self, *args, **kwargs)
         except REDIS_LIB_CONNECTION_EXCEPTIONS as e:
             raise RedisConnectionException from e
+        finally:
+            current_redis_method.reset(token)
     
     return inner
 
 
 class RedisClient:
-    def __init__(self, client: Redis):
+    def __init__(
+        self,
+        client: Redis | RedisCluster | ShardedRedis,
+        coalescer: ReadCoalescer | None = None,
+        batcher: ReadBatcher | None = None,
+        replicas: ReplicaRouter | None = None,
+        read_tracker: ReadYourWritesTracker | None = None
+    ):
         self.client = client
+        self.coalescer = coalescer
+        self.reads: Redis | RedisCluster | ShardedRedis | ReadBatcher = batcher if batcher is not None else client
+        """ Client for GET, HGETALL, ZRANGE & MGET commands on the primary (batched, if `batcher` is provided). """
+        self.replicas = replicas
+        self.read_tracker = read_tracker
     
     @handle_redis_connection_errors
     async def set_user(
         self, user_id: str, user: User) -> None:
         """ Adds properties from Keycloak UserRepresentation `data` to Redis. """
+        self._mark_written(RedisKeys.user(user.username))
         await self.client.hset(
             RedisKeys.user(user.username),
             mapping={
@@ -42,14 +64,23 @@ class RedisClient:
         ) # type: ignore (async client is not fully typed: https://github.com/redis/redis-py/issues/3169)
 
     @handle_redis_connection_errors
+    @coalesce_reads
     async def get_user(self, username: str) -> UserPublic | None:
         """ Returns public attributes of a user with provided `username`, if he exists. """
-        user_data = await self.client.hgetall(RedisKeys.user(username)) # type: ignore
+        key = RedisKeys.user(username)
+        reads = self._get_read_only_client(key)
+        user_data = await reads.hgetall(key) # type: ignore
+
+        # Check primary, in case user was not yet replicated
+        if not user_data and reads is self.replicas:
+            user_data = await self.reads.hgetall(key) # type: ignore
+        
         return UserPublic.model_validate(user_data) if user_data else None
 
     @handle_redis_connection_errors
     async def add_follower(self, username: str, follower: str) -> None:
         """ Adds a `follower` to the followers sorted set of a `username`. """
+        self._mark_written(RedisKeys.user_followers(username))
         await self.client.zadd(
             RedisKeys.user_followers(username),
             {follower: 0}
@@ -59,11 +90,13 @@ class RedisClient:
     async def get_paginated_user_followers(self, username: str, last_viewed: int | None) -> list[str]:
         start = last_viewed + 1 if last_viewed is not None else 0
         end = start + 4    # 5 per page
-        return await self.client.zrange(RedisKeys.user_followers(username), start, end)
+        key = RedisKeys.user_followers(username)
+        return await self._get_read_only_client(key).zrange(key, start, end)
     
     @handle_redis_connection_errors
     async def remove_follower(self, username: str, follower: str) -> None:
         """ Removes a `follower` from the followers sorted set of a `username`. """
+        self._mark_written(RedisKeys.user_followers(username))
         await self.client.zrem(
             RedisKeys.user_followers(username),
             follower
@@ -77,18 +110,30 @@ class RedisClient:
         
         # Set post data
         added_post = PostWithID.model_validate({**post.model_dump(), "post_id": post_id})
+        self._mark_written(RedisKeys.post(post_id), RedisKeys.user_posts(post.author))
         await self.client.set(RedisKeys.post(post_id), added_post.model_dump_json())
 
-        # Add post to author's list of posts
-        await self.client.zadd(RedisKeys.user_posts(post.author), get_post_id_mapping(post_id))
+        # Add post to author's list of posts & update its version
+        pipe = self.client.pipeline()
+        pipe.zadd(RedisKeys.user_posts(post.author), get_post_id_mapping(post_id))
+        pipe.incr(RedisKeys.user_posts_version(post.author))
+        await pipe.execute()
         
         # Return ID of new post
         return added_post
 
     @handle_redis_connection_errors
+    @coalesce_reads
     async def get_post(self, post_id: int) -> PostWithID | None:
         """ Returns a post with the provided `post_id`, if it exists. """
-        post_data = await self.client.get(RedisKeys.post(post_id))
+        key = RedisKeys.post(post_id)
+        reads = self._get_read_only_client(key)
+        post_data = await reads.get(key)
+
+        # Check primary, in case post was not yet replicated
+        if post_data is None and reads is self.replicas:
+            post_data = await self.reads.get(key)
+        
         return PostWithID.model_validate_json(post_data) if post_data else None
 
     @handle_redis_connection_errors
@@ -96,17 +141,24 @@ class RedisClient:
         """ Returns a paginated list of posts of `username` after `last_viewed` or from start. """
         start = last_viewed + 1 if last_viewed is not None else 0
         end = start + 4     # 5 per page
-        post_ids: list[str] = await self.client.zrange(RedisKeys.user_posts(username), start, end)
+        key = RedisKeys.user_posts(username)
+        post_ids: list[str] = await self._get_read_only_client(key).zrange(key, start, end)
         if post_ids:
-            posts_data = await self.client.mget([RedisKeys.post(post_id) for post_id in post_ids])
+            posts_data = await self._mget([RedisKeys.post(post_id) for post_id in post_ids])
             return [PostWithID.model_validate_json(post) for post in posts_data]
         else:
             return []
     
+    @handle_redis_connection_errors
+    async def get_user_posts_version(self, username: str) -> int:
+        """ Returns current version of `username`'s posts list, which is incremented on each change. """
+        key = RedisKeys.user_posts_version(username)
+        return int(await self._get_read_only_client(key).get(key) or 0)
+    
     @handle_redis_connection_errors
     async def get_user_post_ids(self, username: str) -> list[str]:
         """ Returns a list of post IDs authored by `username`. """
-        return await self.client.zrange(RedisKeys.user_posts(username), 0, -1)  # type: ignore
+        return await self.reads.zrange(RedisKeys.user_posts(username), 0, -1)  # type: ignore
     
     # @handle_redis_connection_errors
     # async def get_user_posts(self, username: str) -> list[PostWithID]:
@@ -120,35 +172,80 @@ class RedisClient:
     @handle_redis_connection_errors
     async def add_post_to_followers_feeds(self, post: PostWithID) -> None:
         """ Adds a `post` IDs to the feeds of its author's followers. """
-        followers = await self.client.zrange(RedisKeys.user_followers(post.author), 0, -1)
-        if followers:
-            pipe = self.client.pipeline()
-            post_id_mapping = get_post_id_mapping(post.post_id)
-            for follower in followers:
-                pipe.zadd(RedisKeys.user_feed(follower), post_id_mapping)
-            await pipe.execute()
+        followers: list[str] = await self.reads.zrange(RedisKeys.user_followers(post.author), 0, -1)
+        if not followers: return
+        post_id_mapping = get_post_id_mapping(post.post_id)
+
+        # Non-transactional pipeline is split per node in cluster mode (& per shard by sharded client)
+        pipe = self.client.pipeline(transaction=False)
+        for follower in followers:
+            pipe.zadd(RedisKeys.user_feed(follower), post_id_mapping)
+            pipe.incr(RedisKeys.user_feed_version(follower))
+        await pipe.execute()
     
     @handle_redis_connection_errors
     async def add_post_ids_to_feed(self, username: str, post_ids: list[int] | list[str]) -> None:
         """ Adds `post_ids` to the feed of a user with `username`. """
         if not post_ids: return
-        await self.client.zadd( RedisKeys.user_feed(username), get_post_id_mapping(post_ids))
+        self._mark_written(RedisKeys.user_feed(username))
+        pipe = self.client.pipeline()
+        pipe.zadd(RedisKeys.user_feed(username), get_post_id_mapping(post_ids))
+        pipe.incr(RedisKeys.user_feed_version(username))
+        await pipe.execute()
     
     @handle_redis_connection_errors
     async def remove_post_ids_from_feed(self, username: str, post_ids: list[int] | list[str]) -> None:
         """ Removes `post_ids` from the feed of a user with `username`. """
         if not post_ids: return
         removed_post_ids = [str(post_id) for post_id in post_ids]
-        await self.client.zrem( RedisKeys.user_feed(username), *removed_post_ids)
+        self._mark_written(RedisKeys.user_feed(username))
+        pipe = self.client.pipeline()
+        pipe.zrem(RedisKeys.user_feed(username), *removed_post_ids)
+        pipe.incr(RedisKeys.user_feed_version(username))
+        await pipe.execute()
+    
+    @handle_redis_connection_errors
+    async def get_user_feed_version(self, username: str) -> int:
+        """ Returns current version of `username`'s feed, which is incremented on each change. """
+        key = RedisKeys.user_feed_version(username)
+        return int(await self._get_read_only_client(key).get(key) or 0)
 
     @handle_redis_connection_errors
     async def get_paginated_user_feed(self, username: str, last_viewed: int | None) -> list[PostWithID]:
         """ Returns a paginated list of posts from `username`'s feed after `last_viewed` or from start. """
         start = last_viewed + 1 if last_viewed is not None else 0
         end = start + 4     # 5 per page
-        post_ids: list[str] = await self.client.zrange(RedisKeys.user_feed(username), start, end)
+        key = RedisKeys.user_feed(username)
+        post_ids: list[str] = await self._get_read_only_client(key).zrange(key, start, end)
         if post_ids:
-            posts_data = await self.client.mget([RedisKeys.post(post_id) for post_id in post_ids])
+            posts_data = await self._mget([RedisKeys.post(post_id) for post_id in post_ids])
             return [PostWithID.model_validate_json(post) for post in posts_data]
         else:
             return []
+    
+    def _get_read_only_client(self, *keys: str) -> Redis | RedisCluster | ShardedRedis | ReadBatcher | ReplicaRouter:
+        """
+        Returns a client for read-only commands on `keys`:
+        replicas, if they are configured and none of the `keys` were recently written
+        (in read-your-writes mode), or primary otherwise.
+        """
+        if self.replicas is None:
+            return self.reads
+        if self.read_tracker is not None and self.read_tracker.is_recent(*keys):
+            return self.reads
+        return self.replicas
+    
+    def _mark_written(self, *keys: str) -> None:
+        """ Marks `keys` as recently written for read-your-writes mode. """
+        if self.read_tracker is not None:
+            self.read_tracker.mark(*keys)
+    
+    async def _mget(self, keys: list[str]) -> list[str | None]:
+        """
+        Returns values of `keys` (from replicas, if possible).
+        In cluster mode, keys from multiple slots are fetched with per-slot MGET commands,
+        which are sent in a single pipeline to each node.
+        """
+        if isinstance(self.client, RedisCluster) and len(group_by_slot(keys)) > 1:
+            return await self.client.mget_nonatomic(keys)
+        return await self._get_read_only_client(*keys).mget(keys)
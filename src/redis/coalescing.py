@@ -0,0 +1,54 @@
+import asyncio
+from functools import wraps
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class ReadCoalescer:
+    """
+    Shares a single in-flight read between concurrent calls with the same key,
+    so that only one of them results in a Redis round trip.
+    """
+    def __init__(self):
+        self._in_flight: dict[Hashable, asyncio.Future] = {}
+        self.reads = 0
+        """ Number of reads, which were sent to Redis. """
+        self.saved_round_trips = 0
+        """ Number of reads, which reused the result of an in-flight read. """
+    
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """ Returns the result of an in-flight read with the same `key` or runs `fn`, if there is none. """
+        future = self._in_flight.get(key)
+
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda f: self._on_done(key, f))
+            self.reads += 1
+        else:
+            self.saved_round_trips += 1
+        
+        # Shield the shared read, so that cancellation of a single caller
+        # does not affect other callers
+        return await asyncio.shield(future)
+    
+    def _on_done(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+        
+        # Mark exception as retrieved, in case all callers were cancelled
+        if not future.cancelled():
+            future.exception()
+
+
+def coalesce_reads(fn):
+    """
+    Decorator for RedisClient read methods, which coalesces concurrent calls with the same arguments,
+    if the client has a `ReadCoalescer`.
+    """
+    @wraps(fn)
+    async def inner(self, *args):
+        if self.coalescer is None:
+            return await fn(self, *args)
+        return await self.coalescer.run((fn.__name__, *args), lambda: fn(self, *args))
+    
+    return inner
@@ -0,0 +1,125 @@
+from redis.asyncio import Redis
+from redis.asyncio.cluster import RedisCluster, ClusterNode
+from redis.asyncio.retry import Retry
+from redis.asyncio.sentinel import Sentinel
+from redis.backoff import ExponentialBackoff
+from redis.exceptions import BusyLoadingError, ConnectionError, TimeoutError
+
+from config import RedisConfig
+from src.redis.instrumentation import InstrumentedRedis, InstrumentedRedisCluster
+from src.redis.pool import InstrumentedConnectionPool, InstrumentedBlockingConnectionPool
+from src.redis.sharding import ShardedRedis
+from src.redis.slowlog import get_client_name
+from src.redis.transport import get_keepalive_kwargs, get_transport_kwargs
+
+
+def parse_address(address: str) -> tuple[str, int]:
+    """ Parses a "host:port" string. """
+    host, port = address.rsplit(":", 1)
+    return host, int(port)
+
+
+def get_retry(redis_config: RedisConfig) -> Retry:
+    """ Returns retry strategy for Redis clients. """
+    return Retry(
+        ExponentialBackoff(
+            base=redis_config.retry_base_time,
+            cap=redis_config.retry_cap_time,
+        ),
+        redis_config.number_of_retries
+    )
+
+
+def get_client_kwargs(redis_config: RedisConfig) -> dict:
+    """ Returns common keyword arguments for standalone & cluster Redis clients. """
+    return {
+        "password": redis_config.password,
+
+        # Connection settings
+        "max_connections": redis_config.max_connections,
+        "socket_timeout": redis_config.socket_timeout,
+        "socket_connect_timeout": redis_config.socket_timeout,
+
+        "decode_responses": True,
+        "protocol": redis_config.protocol,
+        "client_name": get_client_name(redis_config),
+
+        # Retry strategy & exceptions
+        "retry": get_retry(redis_config),
+        "retry_on_error": [BusyLoadingError, ConnectionError, TimeoutError]
+    }
+
+
+def create_standalone_client(redis_config: RedisConfig, address: tuple[str, int] | None = None) -> Redis:
+    """
+    Returns an async client for a standalone Redis instance with an instrumented connection pool
+    (a blocking one, if it's enabled in `redis_config`).
+    If `address` is not provided, returns a client for the primary instance.
+    """
+    kwargs = {
+        "db": redis_config.database,
+        **get_transport_kwargs(redis_config, address),
+        **get_client_kwargs(redis_config)
+    }
+
+    if redis_config.blocking_pool:
+        pool = InstrumentedBlockingConnectionPool(timeout=redis_config.pool_timeout, **kwargs)
+    else:
+        pool = InstrumentedConnectionPool(**kwargs)
+    return InstrumentedRedis.from_pool(pool)
+
+
+def create_redis_client(redis_config: RedisConfig) -> Redis | RedisCluster | ShardedRedis:
+    """
+    Returns an async Redis client for the app.
+    Returns a cluster client, if cluster mode is enabled in `redis_config`,
+    or a sharded client, if shards are configured.
+    """
+    if redis_config.cluster_mode:
+        cluster_nodes = redis_config.cluster_nodes or [f"localhost:{redis_config.container_port}"]
+        return InstrumentedRedisCluster(
+            startup_nodes=[ClusterNode(*parse_address(node)) for node in cluster_nodes],
+            **get_keepalive_kwargs(redis_config),
+            **get_client_kwargs(redis_config)
+        )
+
+    if redis_config.shards:
+        shards = {}
+        for shard in redis_config.shards:
+            shards[shard] = create_standalone_client(redis_config, parse_address(shard))
+        return ShardedRedis(shards)
+
+    return create_standalone_client(redis_config)
+
+
+async def create_replica_clients(redis_config: RedisConfig) -> dict[str, Redis]:
+    """
+    Returns a mapping between "host:port" addresses of read replicas and their clients.
+    Replicas are taken from `redis_config.replicas` and discovered via Sentinel, if it's configured.
+    (Replicas are not used in cluster mode or with shards.)
+    """
+    if redis_config.cluster_mode or redis_config.shards:
+        return {}
+
+    addresses = [parse_address(replica) for replica in redis_config.replicas]
+
+    if redis_config.sentinel_nodes:
+        sentinel = Sentinel(
+            [parse_address(node) for node in redis_config.sentinel_nodes],
+            sentinel_kwargs={
+                "password": redis_config.sentinel_password,
+                "socket_timeout": redis_config.socket_timeout,
+                "socket_connect_timeout": redis_config.socket_timeout
+            }
+        )
+        try:
+            discovered = await sentinel.discover_slaves(redis_config.sentinel_service_name)  # type: ignore[arg-type]
+            addresses.extend((str(host), int(port)) for host, port in discovered)
+        finally:
+            for sentinel_client in sentinel.sentinels:
+                await sentinel_client.aclose()
+
+    return {
+        f"{host}:{port}": create_standalone_client(redis_config, (host, port))
+        for host, port in dict.fromkeys(addresses)
+    }
@@ -1,30 +1,48 @@
+from pathlib import Path
+
 from config import RedisConfig
 from src.util.container_manager import ContainerManager
 
 
+CONTAINER_SOCKET_DIR = "/run/redis"
+""" Directory of Redis Unix socket inside the container. """
+
 
 def get_redis_container_manager(
         redis_config: RedisConfig,
         debug: bool
     ):
+    run_args = [
+        # Expose Redis on a custom port
+        "-p", f"{redis_config.container_port}:6379"
+    ]
+    run_command_args = [
+        "redis-server",
+        
+        # Add a password for default user
+        f'--requirepass "{redis_config.password}"',
+
+        # Set number of logical databases
+        f'--databases {redis_config.max_databases}'
+    ]
+
+    # Expose Unix socket via a mounted host directory
+    if redis_config.unix_socket_path:
+        socket_path = Path(redis_config.unix_socket_path).absolute()
+        socket_path.parent.mkdir(parents=True, exist_ok=True)
+        run_args.extend(["-v", f"{socket_path.parent}:{CONTAINER_SOCKET_DIR}"])
+        run_command_args.extend([
+            f"--unixsocket {CONTAINER_SOCKET_DIR}/{socket_path.name}",
+            "--unixsocketperm 777"
+        ])
+
     return ContainerManager(
         name=redis_config.container_name,
-        run_args=[
-            # Expose Redis on a custom port
-            "-p", f"{redis_config.container_port}:6379"
-        ],
+        run_args=run_args,
 
         image="redis:8.2.1",
 
-        run_command_args=[
-            "redis-server",
-            
-            # Add a password for default user
-            f'--requirepass "{redis_config.password}"',
-
-            # Set number of logical databases
-            f'--databases {redis_config.max_databases}'
-        ],
+        run_command_args=run_command_args,
         debug=debug
     )
 
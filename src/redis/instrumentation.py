@@ -0,0 +1,119 @@
+from time import perf_counter
+from typing import Any, Awaitable
+
+from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+from redis.asyncio.cluster import ClusterPipeline, RedisCluster
+from redis.exceptions import RedisClusterException
+
+from src.redis.slowlog import COMMAND_TAGGER
+from src.redis.util import get_key_family
+from src.util.metrics import HistogramMetric
+from src.util.timing import add_redis_time
+from src.util.tracing import record_span
+
+
+REDIS_COMMAND_DURATION = HistogramMetric(
+    "redis_command_duration_seconds",
+    "Redis command latency by command & key family (pipelines are measured as a whole).",
+    ("command", "family")
+)
+
+
+def observe_command(args: tuple, start: float) -> None:
+    """ Records the latency of a command with `args`, which was started at `start`. """
+    duration = perf_counter() - start
+    family = get_key_family(args[1]) if len(args) > 1 else "none"
+    REDIS_COMMAND_DURATION.labels(str(args[0]).upper(), family).observe(duration)
+    add_redis_time(duration)
+
+
+async def observe_pipeline(execute: Awaitable[list[Any]], commands: list[tuple], command: str) -> list[Any]:
+    """
+    Awaits `execute` of a pipeline with `commands` & records its latency as a `command` (MULTI or PIPELINE)
+    of the key family of its commands (and a span, if the current request is traced).
+    """
+    families = {get_key_family(args[1]) if len(args) > 1 else "none" for args in commands}
+    family = families.pop() if len(families) == 1 else "mixed"
+    size = len(commands)
+    if COMMAND_TAGGER.enabled:
+        for args in commands:
+            COMMAND_TAGGER.tag(args)
+
+    start = perf_counter()
+    error: BaseException | None = None
+    try:
+        return await execute
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        record_span(f"redis {command}", start, error, commands=size, family=family)
+        duration = perf_counter() - start
+        REDIS_COMMAND_DURATION.labels(command, family).observe(duration)
+        add_redis_time(duration)
+
+
+class InstrumentedRedis(Redis):
+    """ Async Redis client, which records command latency metrics. """
+    async def execute_command(self, *args: Any, **options: Any) -> Any:
+        COMMAND_TAGGER.tag(args)
+        start = perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            observe_command(args, start)
+
+    def pipeline(self, transaction: bool = True, shard_hint: Any = None) -> "InstrumentedPipeline":
+        return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+class InstrumentedPipeline(Pipeline):
+    """ Pipeline, which records the latency of its execution (and a span, if the current request is traced). """
+    async def execute(self, raise_on_error: bool = True) -> list[Any]:
+        commands = [args for args, _ in self.command_stack]
+        command = "MULTI" if self.is_transaction else "PIPELINE"
+        return await observe_pipeline(super().execute(raise_on_error), commands, command)
+
+
+class InstrumentedRedisCluster(RedisCluster):
+    """ Async Redis Cluster client, which records command & pipeline latency metrics. """
+    async def execute_command(self, *args: Any, **kwargs: Any) -> Any:
+        COMMAND_TAGGER.tag(args)
+        start = perf_counter()
+        try:
+            return await super().execute_command(*args, **kwargs)
+        finally:
+            observe_command(args, start)
+
+    def pipeline(self, transaction: Any = None, shard_hint: Any = None) -> "InstrumentedClusterPipeline":
+        if shard_hint:
+            raise RedisClusterException("shard_hint is deprecated in cluster mode")
+        return InstrumentedClusterPipeline(self, transaction)
+
+
+class InstrumentedClusterPipeline(ClusterPipeline):
+    """
+    Cluster pipeline, which records the latency of its execution (and a span, if the current request is traced).
+    Commands are sent to their nodes concurrently, so the whole pipeline is measured (including MGETs of `mget_nonatomic`).
+    """
+    __slots__ = ("_commands",)
+
+    def __init__(self, client: RedisCluster, transaction: bool | None = None):
+        super().__init__(client, transaction)
+        self._commands: list[tuple] = []
+        """ Arguments of queued commands (command queue of the execution strategy is not public). """
+
+    def execute_command(self, *args: Any, **kwargs: Any) -> "InstrumentedClusterPipeline":
+        self._commands.append(args)
+        return super().execute_command(*args, **kwargs)   # type: ignore[return-value]
+
+    async def execute(self, raise_on_error: bool = True, allow_redirections: bool = True) -> list[Any]:
+        command = "MULTI" if self._transaction else "PIPELINE"
+        return await observe_pipeline(
+            super().execute(raise_on_error, allow_redirections), self._commands, command
+        )
+
+    async def reset(self) -> None:
+        self._commands = []
+        await super().reset()
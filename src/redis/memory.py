@@ -0,0 +1,309 @@
+"""
+Redis memory usage analysis by key prefixes.
+
+Keys are counted with SCAN (optionally, over a part of the keyspace, which is extrapolated to the whole database),
+and a random sample of keys with each `RedisKeys` prefix is inspected with MEMORY USAGE, OBJECT ENCODING
+and a cardinality command, so that total memory of each prefix & key family is estimated from the sample.
+
+Memory for a target number of users & average followers is projected from the sampled keys:
+numbers of keys scale with users, and cardinalities of follower sets & feeds scale with average followers.
+Memory of a key with a projected cardinality is estimated by a linear model of sampled keys with the same encoding,
+which it would have (e.g. sorted sets with more than `zset-max-listpack-entries` members are converted to skiplists).
+"""
+from dataclasses import dataclass, field
+import random
+from typing import Callable
+
+from redis import Redis
+
+from src.redis.util import KEY_FAMILIES
+
+
+OTHER_PREFIX = "other"
+
+NON_COMPACT_ENCODINGS = {"skiplist", "hashtable"}
+""" Encodings of aggregate keys, which have grown beyond `*-max-listpack-*` limits. """
+
+FOLLOWER_SCALED_PREFIXES = {"user_followers", "user_feed"}
+""" Prefixes of keys, which cardinalities are proportional to the average number of followers. """
+
+FIXED_PREFIXES = {"next_post_id", OTHER_PREFIX}
+""" Prefixes of keys, which numbers don't depend on the number of users. """
+
+LENGTH_COMMANDS = {"string": "STRLEN", "hash": "HLEN", "set": "SCARD", "zset": "ZCARD", "list": "LLEN"}
+
+COMPACT_LIMIT_SETTINGS = {
+    "hash": ("hash-max-listpack-entries", "hash-max-ziplist-entries"),
+    "set": ("set-max-listpack-entries", "set-max-intset-entries"),
+    "zset": ("zset-max-listpack-entries", "zset-max-ziplist-entries")
+}
+""" Settings with maximum numbers of entries in compact encodings of key types (for new & old Redis versions). """
+
+
+@dataclass
+class KeySample:
+    key: str
+    type: str
+    encoding: str
+    memory: int
+    """ Bytes, reported by MEMORY USAGE. """
+    length: int
+    """ Number of members of an aggregate key or string length. """
+
+
+@dataclass
+class PrefixStats:
+    prefix: str
+    keys: int
+    """ Estimated number of keys. """
+    samples: list[KeySample] = field(default_factory=list)
+
+    @property
+    def family(self) -> str:
+        return KEY_FAMILIES.get(self.prefix, OTHER_PREFIX)
+
+    @property
+    def avg_memory(self) -> float:
+        return sum(sample.memory for sample in self.samples) / len(self.samples) if self.samples else 0
+
+    @property
+    def avg_length(self) -> float:
+        return sum(sample.length for sample in self.samples) / len(self.samples) if self.samples else 0
+
+    @property
+    def total_memory(self) -> float:
+        """ Estimated memory of all keys with the prefix. """
+        return self.avg_memory * self.keys
+
+    @property
+    def encodings(self) -> dict[str, int]:
+        """ Numbers of sampled keys with each encoding. """
+        result: dict[str, int] = {}
+        for sample in self.samples:
+            result[sample.encoding] = result.get(sample.encoding, 0) + 1
+        return result
+
+    @property
+    def non_compact_samples(self) -> list[KeySample]:
+        """ Sampled aggregate keys, which were converted from compact encodings. """
+        return [sample for sample in self.samples if sample.encoding in NON_COMPACT_ENCODINGS]
+
+
+@dataclass
+class MemoryReport:
+    prefixes: dict[str, PrefixStats]
+    scanned: int
+    """ Number of scanned keys. """
+    total_keys: int
+    """ Number of keys in the database(s). """
+    used_memory: int = 0
+    """ Total memory, allocated by Redis (including non-key overheads). """
+    compact_limits: dict[str, int] = field(default_factory=dict)
+    """ Maximum numbers of entries in compact encodings of key types. """
+
+    @property
+    def families(self) -> dict[str, float]:
+        """ Estimated memory of each key family. """
+        result: dict[str, float] = {}
+        for stats in self.prefixes.values():
+            result[stats.family] = result.get(stats.family, 0) + stats.total_memory
+        return result
+
+    @property
+    def keys_memory(self) -> float:
+        return sum(stats.total_memory for stats in self.prefixes.values())
+
+    @property
+    def users(self) -> int:
+        return self.prefixes["user"].keys if "user" in self.prefixes else 0
+
+    @property
+    def avg_followers(self) -> float:
+        """ Average number of followers of a user (estimated from sampled follower sets). """
+        stats = self.prefixes.get("user_followers")
+        if stats is None or not self.users:
+            return 0
+        return stats.avg_length * stats.keys / self.users
+
+
+@dataclass
+class PrefixProjection:
+    prefix: str
+    keys: int
+    avg_memory: float
+    non_compact_ratio: float
+    """ Share of keys, which would be converted from compact encodings. """
+
+    @property
+    def total_memory(self) -> float:
+        return self.keys * self.avg_memory
+
+
+def get_prefix(key: str) -> str:
+    prefix = key.partition(":")[0]
+    return prefix if prefix in KEY_FAMILIES else OTHER_PREFIX
+
+
+class MemoryAnalyzer:
+    """
+    Samples up to `sample_size` keys of each prefix from `nodes` (standalone instances, shards or cluster primaries).
+    If `max_scanned_keys` is set, only the part of the keyspace is scanned & key counts are extrapolated.
+    `memory_samples` is passed to MEMORY USAGE (the number of sampled nested values; 0 for all of them).
+    """
+    def __init__(
+        self,
+        nodes: list[Redis],
+        sample_size: int = 200,
+        max_scanned_keys: int | None = None,
+        memory_samples: int | None = None,
+        scan_batch_size: int = 1000,
+        seed: int | None = None
+    ):
+        self.nodes = nodes
+        self.sample_size = sample_size
+        self.max_scanned_keys = max_scanned_keys
+        self.memory_samples = memory_samples
+        self.scan_batch_size = scan_batch_size
+        self._rng = random.Random(seed)
+
+    def analyze(self, on_progress: Callable[[int], None] | None = None) -> MemoryReport:
+        """ Returns memory report of the database(s). `on_progress` is called with the number of scanned keys. """
+        counts: dict[str, int] = {}
+        samples: dict[str, list[tuple[Redis, str]]] = {}
+        scanned = 0
+        total_keys = sum(node.dbsize() for node in self.nodes)  # type: ignore[misc]
+        scan_limit = self.max_scanned_keys // len(self.nodes) if self.max_scanned_keys else None
+
+        for node in self.nodes:
+            node_scanned = 0
+            for key in node.scan_iter(count=self.scan_batch_size):
+                key = key.decode() if isinstance(key, bytes) else key
+                prefix = get_prefix(key)
+
+                # Reservoir sampling of keys of each prefix
+                count = counts[prefix] = counts.get(prefix, 0) + 1
+                prefix_samples = samples.setdefault(prefix, [])
+                if len(prefix_samples) < self.sample_size:
+                    prefix_samples.append((node, key))
+                elif (i := self._rng.randrange(count)) < self.sample_size:
+                    prefix_samples[i] = (node, key)
+
+                scanned += 1
+                node_scanned += 1
+                if on_progress is not None and scanned % self.scan_batch_size == 0:
+                    on_progress(scanned)
+                if scan_limit is not None and node_scanned >= scan_limit:
+                    break
+
+        # Extrapolate key counts, if only a part of the keyspace was scanned
+        scale = total_keys / scanned if scanned and scanned < total_keys else 1
+        return MemoryReport(
+            prefixes={
+                prefix: PrefixStats(prefix, round(count * scale), self._inspect(samples[prefix]))
+                for prefix, count in sorted(counts.items())
+            },
+            scanned=scanned,
+            total_keys=total_keys,
+            used_memory=sum(int(node.info("memory")["used_memory"]) for node in self.nodes),
+            compact_limits=self._get_compact_limits()
+        )
+
+    def _inspect(self, keys: list[tuple[Redis, str]]) -> list[KeySample]:
+        """ Returns memory usage, encoding & length of `keys` (skipping the ones, which were deleted after SCAN). """
+        result = []
+        for node in self.nodes:
+            node_keys = [key for key_node, key in keys if key_node is node]
+            if not node_keys:
+                continue
+
+            pipe = node.pipeline(transaction=False)
+            for key in node_keys:
+                pipe.type(key)
+                pipe.object("encoding", key)
+                pipe.memory_usage(key, samples=self.memory_samples)
+            responses = pipe.execute(raise_on_error=False)
+            types = [_decode(response) for response in responses[::3]]
+
+            pipe = node.pipeline(transaction=False)
+            for key, key_type in zip(node_keys, types):
+                pipe.execute_command(LENGTH_COMMANDS.get(key_type, "EXISTS"), key)
+            lengths = pipe.execute(raise_on_error=False)
+
+            for i, (key, key_type, length) in enumerate(zip(node_keys, types, lengths)):
+                encoding, memory = responses[3 * i + 1], responses[3 * i + 2]
+                if key_type == "none" or not isinstance(memory, int) or isinstance(length, Exception):
+                    continue
+                result.append(KeySample(key, key_type, _decode(encoding), memory, length))
+        return result
+
+    def _get_compact_limits(self) -> dict[str, int]:
+        node = self.nodes[0]
+        limits = {}
+        for key_type, settings in COMPACT_LIMIT_SETTINGS.items():
+            for setting in settings:
+                values = {_decode(name): value for name, value in node.config_get(setting).items()}
+                if (value := values.get(setting)) is not None:
+                    limits[key_type] = int(value)
+                    break
+        return limits
+
+
+def _decode(value: object) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+def fit_memory_model(samples: list[KeySample]) -> tuple[float, float]:
+    """
+    Returns base & per-member memory of `samples` (least squares fit of memory by length).
+    If lengths of all samples are the same, base memory is 0.
+    """
+    n = len(samples)
+    mean_length = sum(sample.length for sample in samples) / n
+    mean_memory = sum(sample.memory for sample in samples) / n
+    variance = sum((sample.length - mean_length) ** 2 for sample in samples)
+    if variance == 0:
+        return 0, mean_memory / mean_length if mean_length else 0
+    per_member = sum((sample.length - mean_length) * (sample.memory - mean_memory) for sample in samples) / variance
+    return mean_memory - per_member * mean_length, per_member
+
+
+def project_memory(report: MemoryReport, users: int, avg_followers: float) -> dict[str, PrefixProjection]:
+    """
+    Returns projected numbers of keys & memory of each prefix for `users` with `avg_followers`.
+    Key counts (except fixed ones) are scaled by the ratio of users, lengths of follower sets & feeds -
+    by the ratio of average followers.
+    """
+    user_ratio = users / report.users if report.users else 0
+    followers_ratio = avg_followers / report.avg_followers if report.avg_followers else 1
+    result = {}
+
+    for prefix, stats in report.prefixes.items():
+        keys = stats.keys if prefix in FIXED_PREFIXES else round(stats.keys * user_ratio)
+        if prefix not in FOLLOWER_SCALED_PREFIXES or not stats.samples:
+            non_compact_ratio = len(stats.non_compact_samples) / len(stats.samples) if stats.samples else 0
+            result[prefix] = PrefixProjection(prefix, keys, stats.avg_memory, non_compact_ratio)
+            continue
+
+        # Models of memory by length for each encoding
+        models = {}
+        for compact in (True, False):
+            encoding_samples = [
+                sample for sample in stats.samples if (sample.encoding in NON_COMPACT_ENCODINGS) != compact
+            ]
+            if encoding_samples:
+                models[compact] = fit_memory_model(encoding_samples)
+
+        # Estimate memory of each sampled key with a scaled length
+        total_memory, non_compact = 0.0, 0
+        for sample in stats.samples:
+            length = sample.length * followers_ratio
+            compact_limit = report.compact_limits.get(sample.type)
+            compact = compact_limit is None or length <= compact_limit
+            non_compact += not compact
+            base, per_member = models.get(compact) or next(iter(models.values()))
+            total_memory += max(base + per_member * length, 0)
+
+        result[prefix] = PrefixProjection(
+            prefix, keys, total_memory / len(stats.samples), non_compact / len(stats.samples)
+        )
+    return result
@@ -0,0 +1,138 @@
+import asyncio
+from collections import deque
+from time import monotonic, perf_counter
+
+from redis.asyncio import Redis
+from redis.asyncio.connection import ConnectionPool, BlockingConnectionPool
+
+from src.util.logging import log, LogLevel
+from src.util.metrics import CounterMetric, GaugeMetric, Histogram, HistogramMetric
+
+
+REDIS_POOL_CONNECTIONS = GaugeMetric(
+    "redis_pool_connections", "Number of Redis connections by pool & state (in_use or idle).", ("pool", "state")
+)
+REDIS_POOL_CONNECTIONS_CREATED = CounterMetric(
+    "redis_pool_connections_created_total", "Number of Redis connections, created by pool.", ("pool",)
+)
+REDIS_POOL_WAIT = HistogramMetric(
+    "redis_pool_wait_seconds", "Time to acquire a Redis connection from the pool (including connecting).", ("pool",)
+)
+
+
+class PoolStats:
+    """ Connection pool statistics. """
+    CREATION_RATE_WINDOW = 60
+    """ Time window in seconds, over which connection creation rate is calculated. """
+
+    def __init__(self):
+        self.wait_time = Histogram()
+        """ Time in seconds, spent to acquire a connection from the pool (including connecting). """
+        self.created = 0
+        self._created_at: deque[float] = deque()
+
+    def add_created(self) -> None:
+        self.created += 1
+        self._created_at.append(monotonic())
+
+    def get_creation_rate(self) -> float:
+        """ Returns the number of connections, created per second over the last minute. """
+        threshold = monotonic() - self.CREATION_RATE_WINDOW
+        while self._created_at and self._created_at[0] < threshold:
+            self._created_at.popleft()
+        return len(self._created_at) / self.CREATION_RATE_WINDOW
+
+
+class InstrumentedPoolMixin:
+    """ Collects connection pool statistics & pre-warms connections. """
+    _available_connections: list
+    _in_use_connections: set
+    max_connections: int
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    @property
+    def in_use_connections(self) -> int:
+        return len(self._in_use_connections)
+
+    @property
+    def idle_connections(self) -> int:
+        return len(self._available_connections)
+
+    async def get_connection(self, command_name=None, *keys, **options):
+        start = perf_counter()
+        try:
+            return await super().get_connection()    # type: ignore[misc]
+        finally:
+            self.stats.wait_time.observe(perf_counter() - start)
+
+    def make_connection(self):
+        self.stats.add_created()
+        return super().make_connection()    # type: ignore[misc]
+
+    async def warm_up(self, min_idle: int) -> None:
+        """ Opens new connections, until the pool has `min_idle` idle connections or reaches its size limit. """
+        count = min(
+            min_idle - self.idle_connections,
+            self.max_connections - self.idle_connections - self.in_use_connections
+        )
+        if count <= 0:
+            return
+
+        connections = [self.make_connection() for _ in range(count)]
+        results = await asyncio.gather(*(connection.connect() for connection in connections), return_exceptions=True)
+
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            log(f"Failed to open {len(errors)} of {count} connections during warm-up: {errors[0]}", LogLevel.WARNING)
+
+        self._available_connections.extend(
+            connection for connection, result in zip(connections, results) if not isinstance(result, Exception)
+        )
+
+
+class InstrumentedConnectionPool(InstrumentedPoolMixin, ConnectionPool):
+    """ Default connection pool, which raises ConnectionError, if it is exhausted. """
+
+
+class InstrumentedBlockingConnectionPool(InstrumentedPoolMixin, BlockingConnectionPool):
+    """ Connection pool, which waits for a free connection up to `timeout` seconds, if it is exhausted. """
+
+
+def get_connection_pools(client: object) -> dict[str, InstrumentedPoolMixin]:
+    """
+    Returns a mapping between "host:port" addresses (or Unix socket paths) & instrumented connection pools
+    of a Redis `client` (a sharded client returns pools of all shards; cluster clients are not instrumented).
+    """
+    if isinstance(client, Redis):
+        pool = client.connection_pool
+        if isinstance(pool, InstrumentedPoolMixin):
+            kwargs = pool.connection_kwargs
+            return {kwargs["path"] if "path" in kwargs else f"{kwargs['host']}:{kwargs['port']}": pool}
+        return {}
+
+    shards: dict[str, Redis] = getattr(client, "shards", {})
+    return {address: pool for shard in shards.values() for address, pool in get_connection_pools(shard).items()}
+
+
+class PoolMetricsCollector:
+    """ Registry collector, which exports statistics of connection `pools` into metrics. """
+    def __init__(self, pools: dict[str, InstrumentedPoolMixin]):
+        self.pools = pools
+
+    def __call__(self) -> None:
+        for address, pool in self.pools.items():
+            REDIS_POOL_CONNECTIONS.labels(address, "in_use").set(pool.in_use_connections)
+            REDIS_POOL_CONNECTIONS.labels(address, "idle").set(pool.idle_connections)
+            REDIS_POOL_CONNECTIONS_CREATED.labels(address).value = pool.stats.created
+            REDIS_POOL_WAIT.bind((address,), pool.stats.wait_time)
+
+    def remove_metrics(self) -> None:
+        """ Removes metrics of the pools (e.g. after they are closed). """
+        for address in self.pools:
+            REDIS_POOL_CONNECTIONS.remove(address, "in_use")
+            REDIS_POOL_CONNECTIONS.remove(address, "idle")
+            REDIS_POOL_CONNECTIONS_CREATED.remove(address)
+            REDIS_POOL_WAIT.remove(address)
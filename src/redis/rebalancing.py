@@ -0,0 +1,115 @@
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Callable
+
+from redis import Redis
+
+from config import RedisConfig
+from src.redis.connection import parse_address
+from src.redis.sharding import HashRing
+
+
+@dataclass
+class RebalanceStats:
+    scanned: int = 0
+    moved: int = 0
+    elapsed: float = 0
+
+
+class ShardRebalancer:
+    """
+    Moves keys between standalone Redis instances after the list of shards is changed,
+    so that each key is stored on the shard, which is assigned to it by the new hash ring.
+
+    Keys are streamed from each of the `old_shards` with SCAN and copied to their new shards
+    with DUMP/RESTORE (preserving TTLs); copied keys are then deleted from the source shard.
+    Writes to the app should be paused during rebalancing.
+    """
+    def __init__(
+        self,
+        redis_config: RedisConfig,
+        old_shards: list[str],
+        new_shards: list[str],
+        batch_size: int = 500
+    ):
+        self.old_shards = old_shards
+        self.new_ring = HashRing(new_shards)
+        self.batch_size = batch_size
+
+        self.clients: dict[str, Redis] = {}
+        for shard in dict.fromkeys(old_shards + new_shards):
+            host, port = parse_address(shard)
+            self.clients[shard] = Redis(
+                host=host,
+                port=port,
+                db=redis_config.database,
+                password=redis_config.password,
+                socket_timeout=redis_config.socket_timeout
+            )
+
+    def rebalance(
+        self,
+        dry_run: bool = False,
+        on_progress: Callable[[str, RebalanceStats], None] | None = None
+    ) -> RebalanceStats:
+        """
+        Moves keys to their new shards and returns rebalancing statistics.
+        If `dry_run` is true, only counts keys, which should be moved.
+        `on_progress` is called with source shard address & current statistics after each batch.
+        """
+        stats = RebalanceStats()
+        start = perf_counter()
+
+        for source in self.old_shards:
+            client = self.clients[source]
+            cursor = 0
+
+            while True:
+                cursor, keys = client.scan(cursor, count=self.batch_size)
+                stats.scanned += len(keys)
+
+                moves: dict[str, list[bytes]] = {}
+                for key in keys:
+                    target = self.new_ring.get_node(key.decode())
+                    if target != source:
+                        moves.setdefault(target, []).append(key)
+
+                for target, target_keys in moves.items():
+                    stats.moved += len(target_keys) if dry_run else self._move_keys(source, target, target_keys)
+
+                stats.elapsed = perf_counter() - start
+                if on_progress is not None:
+                    on_progress(source, stats)
+                if cursor == 0:
+                    break
+
+        return stats
+
+    def close(self) -> None:
+        for client in self.clients.values():
+            client.close()
+
+    def _move_keys(self, source: str, target: str, keys: list[bytes]) -> int:
+        """ Copies `keys` from `source` to `target` shard, deletes them from `source` & returns the number of moved keys. """
+        pipe = self.clients[source].pipeline(transaction=False)
+        for key in keys:
+            pipe.dump(key)
+            pipe.pttl(key)
+        results = pipe.execute()
+
+        # Skip keys, which were deleted or expired after SCAN
+        dumps = [
+            (key, value, max(ttl, 0))
+            for key, value, ttl in zip(keys, results[::2], results[1::2])
+            if value is not None and ttl != -2
+        ]
+        if not dumps:
+            return 0
+
+        pipe = self.clients[target].pipeline(transaction=False)
+        for key, value, ttl in dumps:
+            pipe.restore(key, ttl, value, replace=True)
+        pipe.execute()
+
+        self.clients[source].delete(*(key for key, _, _ in dumps))
+        return len(dumps)
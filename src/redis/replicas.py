@@ -0,0 +1,181 @@
+import asyncio
+from time import monotonic, perf_counter
+from typing import Any
+
+from redis.asyncio import Redis
+from redis.exceptions import BusyLoadingError, ConnectionError, TimeoutError
+
+from src.redis.util import get_hash_tag
+
+
+_CONNECTION_EXCEPTIONS = (BusyLoadingError, ConnectionError, TimeoutError)
+
+
+class ReplicaTarget:
+    """ Read replica client with its health & latency statistics. """
+    def __init__(self, address: str, client: Redis):
+        self.address = address
+        self.client = client
+
+        self.latency_ewma = 0.0
+        """ Exponentially weighted moving average of successful command latency in seconds. """
+        self.in_flight = 0
+        self.commands = 0
+        self.errors = 0
+        self.unhealthy_until = 0.0
+        """ `time.monotonic()` value, until which the replica is not used after a connection error. """
+
+    def is_healthy(self, now: float) -> bool:
+        return self.unhealthy_until <= now
+
+    def get_load_score(self) -> float:
+        """ Returns an estimate of time required to execute a command on the replica. """
+        return self.latency_ewma * (self.in_flight + 1)
+
+    def add_latency(self, latency: float) -> None:
+        self.latency_ewma = latency if self.commands == 0 else 0.9 * self.latency_ewma + 0.1 * latency
+        self.commands += 1
+
+
+class ReplicaRouter:
+    """
+    Sends read commands to the healthy replica with the least expected latency.
+    Exposes the same signatures of read commands (GET, HGETALL, ZRANGE & MGET) as `redis.asyncio.Redis`.
+
+    If a replica does not respond during `hedge_delay` seconds, the command is also sent
+    to the next replica and the first successful result is returned.
+    Replicas, which fail with a connection error, are skipped for `failure_cooldown` seconds;
+    if all replicas fail, the command is sent to the `primary`.
+    """
+    def __init__(
+        self,
+        targets: list[ReplicaTarget],
+        primary: Any,
+        hedge_delay: float,
+        failure_cooldown: float
+    ):
+        self.targets = targets
+        self.primary = primary
+        """ Client for the primary instance (or a `ReadBatcher` for it). """
+        self.hedge_delay = hedge_delay
+        self.failure_cooldown = failure_cooldown
+
+        self.hedged_commands = 0
+        """ Number of commands, which were sent to a second replica. """
+        self.primary_fallbacks = 0
+        """ Number of commands, which were sent to the primary after replica failures. """
+
+    async def get(self, key: str) -> Any:
+        return await self._execute("get", key)
+
+    async def hgetall(self, key: str) -> Any:
+        return await self._execute("hgetall", key)
+
+    async def zrange(self, key: str, start: int, end: int) -> Any:
+        return await self._execute("zrange", key, start, end)
+
+    async def mget(self, keys: list[str]) -> Any:
+        return await self._execute("mget", keys)
+
+    async def aclose(self) -> None:
+        for target in self.targets:
+            await target.client.aclose()
+
+    def _get_targets(self) -> list[ReplicaTarget]:
+        """ Returns healthy replicas ordered by their expected latency. """
+        now = monotonic()
+        return sorted(
+            (target for target in self.targets if target.is_healthy(now)),
+            key=ReplicaTarget.get_load_score
+        )
+
+    async def _execute(self, command: str, *args: Any) -> Any:
+        """ Executes `command` on replicas with hedging or on the primary, if replicas are not available. """
+        targets = self._get_targets()
+        tasks: list[asyncio.Task] = []
+        next_target = 0
+
+        def send_to_next_target():
+            nonlocal next_target
+            tasks.append(asyncio.ensure_future(self._run(targets[next_target], command, args)))
+            next_target += 1
+
+        try:
+            if targets:
+                send_to_next_target()
+
+            while tasks:
+                can_hedge = self.hedge_delay > 0 and next_target < min(len(targets), 2)
+                done, _ = await asyncio.wait(
+                    tasks,
+                    timeout=self.hedge_delay if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+
+                # Send a hedged command, if current replica is slow
+                if not done:
+                    self.hedged_commands += 1
+                    send_to_next_target()
+                    continue
+
+                for task in done:
+                    tasks.remove(task)
+                    exception = task.exception()
+                    if exception is None:
+                        return task.result()
+                    if not isinstance(exception, _CONNECTION_EXCEPTIONS):
+                        raise exception
+
+                # Send the command to the next replica, if all sent commands failed
+                if not tasks and next_target < len(targets):
+                    send_to_next_target()
+
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        # Read from primary, if replicas are not available
+        self.primary_fallbacks += 1
+        return await getattr(self.primary, command)(*args)
+
+    async def _run(self, target: ReplicaTarget, command: str, args: tuple) -> Any:
+        """ Runs `command` on `target` & updates its statistics. """
+        target.in_flight += 1
+        start = perf_counter()
+        try:
+            result = await getattr(target.client, command)(*args)
+            target.add_latency(perf_counter() - start)
+            return result
+        except _CONNECTION_EXCEPTIONS:
+            target.errors += 1
+            target.unhealthy_until = monotonic() + self.failure_cooldown
+            raise
+        finally:
+            target.in_flight -= 1
+
+
+class ReadYourWritesTracker:
+    """
+    Tracks hash tags (usernames & other key IDs) of recently written keys,
+    so that their reads can be sent to the primary during `window` seconds after a write.
+    (Writes are tracked per worker process.)
+    """
+    _PRUNE_THRESHOLD = 10000
+
+    def __init__(self, window: float):
+        self.window = window
+        self._expires: dict[str, float] = {}
+
+    def mark(self, *keys: str) -> None:
+        """ Marks `keys` as recently written. """
+        now = monotonic()
+        if len(self._expires) > self._PRUNE_THRESHOLD:
+            self._expires = {tag: expires for tag, expires in self._expires.items() if expires > now}
+
+        for key in keys:
+            self._expires[get_hash_tag(key)] = now + self.window
+
+    def is_recent(self, *keys: str) -> bool:
+        """ Checks if any of `keys` was recently written. """
+        now = monotonic()
+        return any(self._expires.get(get_hash_tag(key), 0) > now for key in keys)
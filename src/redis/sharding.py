@@ -0,0 +1,164 @@
+import asyncio
+from bisect import bisect
+from hashlib import md5
+from typing import Any
+
+from redis.asyncio import Redis
+
+from src.redis.util import get_hash_tag
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(md5(value.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """ Consistent hash ring, which maps keys to `nodes` (shard addresses). """
+    def __init__(self, nodes: list[str], virtual_nodes: int = 160):
+        if not nodes:
+            raise ValueError("Hash ring requires at least one node.")
+
+        ring = sorted((_hash(f"{node}#{i}"), node) for node in nodes for i in range(virtual_nodes))
+        self._hashes = [hash_ for hash_, _ in ring]
+        self._nodes = [node for _, node in ring]
+
+    def get_node(self, key: str) -> str:
+        """ Returns the node of a `key`, which is determined by its hash tag (username or post ID). """
+        i = bisect(self._hashes, _hash(get_hash_tag(key))) % len(self._hashes)
+        return self._nodes[i]
+
+    def group_by_node(self, keys: list[str]) -> dict[str, list[int]]:
+        """ Returns a mapping between nodes and indexes of `keys`, which belong to them. """
+        result: dict[str, list[int]] = {}
+        for i, key in enumerate(keys):
+            result.setdefault(self.get_node(key), []).append(i)
+        return result
+
+
+def _single_key_command(name: str):
+    """ Returns a ShardedRedis method, which runs command `name` on the shard of its key. """
+    async def command(self: "ShardedRedis", key: str, *args, **kwargs) -> Any:
+        return await getattr(self.get_shard(key), name)(key, *args, **kwargs)
+
+    command.__name__ = name
+    return command
+
+
+class ShardedRedis:
+    """
+    Client for multiple standalone Redis instances, which routes keys
+    to instances via consistent hashing on their hash tags.
+
+    Exposes a subset of `redis.asyncio.Redis` commands, which are used by the app.
+    Multi-key commands & pipelines are split per shard and executed concurrently.
+    """
+    def __init__(self, shards: dict[str, Redis]):
+        self.shards = shards
+        """ Mapping between shard addresses & their clients. """
+        self.ring = HashRing(list(shards))
+
+    def get_shard(self, key: str) -> Redis:
+        return self.shards[self.ring.get_node(key)]
+
+    get = _single_key_command("get")
+    set = _single_key_command("set")
+    setex = _single_key_command("setex")
+    getdel = _single_key_command("getdel")
+    exists = _single_key_command("exists")
+    incr = _single_key_command("incr")
+    hset = _single_key_command("hset")
+    hgetall = _single_key_command("hgetall")
+    zadd = _single_key_command("zadd")
+    zrem = _single_key_command("zrem")
+    zrange = _single_key_command("zrange")
+
+    async def mget(self, keys: list[str]) -> list[Any]:
+        """ Runs a separate MGET for each shard concurrently & returns values in the order of `keys`. """
+        groups = self.ring.group_by_node(keys)
+        shard_values = await asyncio.gather(*(
+            self.shards[node].mget([keys[i] for i in indexes]) for node, indexes in groups.items()
+        ))
+
+        values: list[Any] = [None] * len(keys)
+        for indexes, group_values in zip(groups.values(), shard_values):
+            for i, value in zip(indexes, group_values):
+                values[i] = value
+        return values
+
+    def pipeline(self, transaction: bool = True) -> "ShardedPipeline":
+        return ShardedPipeline(self, transaction)
+
+    async def aclose(self) -> None:
+        for client in self.shards.values():
+            await client.aclose()
+
+
+def _buffered_command(name: str):
+    """ Returns a ShardedPipeline method, which adds command `name` to the pipeline. """
+    def command(self: "ShardedPipeline", *args, **kwargs) -> "ShardedPipeline":
+        self._commands.append((name, args, kwargs))
+        return self
+
+    command.__name__ = name
+    return command
+
+
+class ShardedPipeline:
+    """
+    Pipeline for ShardedRedis, which sends buffered commands as a separate pipeline
+    to each shard concurrently. (Transactions are only guaranteed within a single shard.)
+    """
+    def __init__(self, sharded: ShardedRedis, transaction: bool):
+        self.sharded = sharded
+        self.transaction = transaction
+        self._commands: list[tuple[str, tuple, dict]] = []
+
+    get = _buffered_command("get")
+    set = _buffered_command("set")
+    setex = _buffered_command("setex")
+    incr = _buffered_command("incr")
+    hset = _buffered_command("hset")
+    hgetall = _buffered_command("hgetall")
+    zadd = _buffered_command("zadd")
+    zrem = _buffered_command("zrem")
+    zrange = _buffered_command("zrange")
+    mget = _buffered_command("mget")
+
+    async def execute(self, raise_on_error: bool = True) -> list[Any]:
+        commands, self._commands = self._commands, []
+
+        # Split commands per shard
+        # (each part stores command index & key indexes for MGET parts)
+        parts: dict[str, list[tuple[int, str, tuple, dict, list[int] | None]]] = {}
+        for i, (name, args, kwargs) in enumerate(commands):
+            if name == "mget":
+                keys = args[0]
+                for node, indexes in self.sharded.ring.group_by_node(keys).items():
+                    parts.setdefault(node, []).append((i, name, ([keys[j] for j in indexes],), kwargs, indexes))
+            else:
+                parts.setdefault(self.sharded.ring.get_node(args[0]), []).append((i, name, args, kwargs, None))
+
+        async def run(node: str) -> list[Any]:
+            pipe = self.sharded.shards[node].pipeline(transaction=self.transaction)
+            for _, name, args, kwargs, _ in parts[node]:
+                getattr(pipe, name)(*args, **kwargs)
+            return await pipe.execute(raise_on_error=raise_on_error)
+
+        nodes = list(parts)
+        shard_results = await asyncio.gather(*(run(node) for node in nodes))
+
+        # Restore the order of results & merge MGET parts
+        results: list[Any] = [None] * len(commands)
+        for node, node_results in zip(nodes, shard_results):
+            for (i, _, _, _, indexes), result in zip(parts[node], node_results):
+                if indexes is None or isinstance(result, Exception):
+                    results[i] = result
+                    continue
+
+                if results[i] is None:
+                    results[i] = [None] * len(commands[i][1][0])
+                if not isinstance(results[i], Exception):
+                    for j, value in zip(indexes, result):
+                        results[i][j] = value
+
+        return results
@@ -0,0 +1,234 @@
+"""
+Redis SLOWLOG & LATENCY collector.
+
+Connections of each worker process are named with CLIENT SETNAME (`get_client_name`), so that SLOWLOG entries,
+which contain client names, are attributed to the worker, which issued the command.
+While the collector is running, instrumented clients remember the `RedisClient` method, which sent each recent
+command with a key (command tagging), so that slow commands (e.g. fan-outs to huge follower sets) are attributed
+to the methods, which issued them.
+Commands are tagged by command name & key (the last method, which sent a command with the same key, wins),
+so concurrent methods, which send the same command for the same key, may be mislabeled with each other's names.
+
+Each worker polls SLOWLOG of all Redis nodes periodically & exports its own entries via metrics & logs;
+LATENCY LATEST events of each node are exported as gauges.
+"""
+import asyncio
+from contextvars import ContextVar
+import os
+import socket
+from typing import Any, Awaitable, Callable
+
+from redis.asyncio import Redis
+from redis.asyncio.cluster import RedisCluster
+
+from config import RedisConfig
+from src.redis.sharding import ShardedRedis
+from src.redis.util import get_key_family
+from src.util.logging import log, LogLevel
+from src.util.metrics import CounterMetric, GaugeMetric, HistogramMetric
+
+
+SLOW_COMMAND_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+REDIS_SLOW_COMMANDS = CounterMetric(
+    "redis_slow_commands_total",
+    "Number of commands of the worker in Redis SLOWLOG by command, key family & RedisClient method.",
+    ("command", "family", "method")
+)
+REDIS_SLOW_COMMAND_DURATION = HistogramMetric(
+    "redis_slow_command_duration_seconds",
+    "Server-side execution time of commands of the worker in Redis SLOWLOG.",
+    ("command", "family", "method"),
+    buckets=SLOW_COMMAND_BUCKETS
+)
+REDIS_LATENCY_EVENT = GaugeMetric(
+    "redis_latency_event_seconds", "Latest latency spike of Redis LATENCY events by node & event.",
+    ("node", "event"), aggregation="max"
+)
+REDIS_LATENCY_EVENT_MAX = GaugeMetric(
+    "redis_latency_event_max_seconds", "Maximum latency spike of Redis LATENCY events by node & event.",
+    ("node", "event"), aggregation="max"
+)
+
+UNKNOWN_METHOD = "unknown"
+
+LOGGED_COMMAND_LENGTH = 200
+""" Maximum length of logged slow commands. """
+
+
+current_redis_method: ContextVar[str | None] = ContextVar("current_redis_method", default=None)
+""" Qualified name of the `RedisClient` (or `RedisTokenCache`) method, which is currently executed. """
+
+
+def get_client_name(redis_config: RedisConfig) -> str | None:
+    """ Returns a connection name of the current worker process (`<client_name>:<host>:<pid>`). """
+    if not redis_config.client_name:
+        return None
+    host = "".join(c if c.isalnum() or c in "-_." else "_" for c in socket.gethostname())
+    return f"{redis_config.client_name}:{host}:{os.getpid()}"
+
+
+class CommandTagger:
+    """
+    Remembers the `RedisClient` method, which sent each of the last `max_size` commands with a key,
+    while it's `enabled` (commands are identified by name & key, so the last method, which sent a command, wins).
+    """
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self.enabled = False
+        self._methods: dict[tuple[str, str], str] = {}
+
+    def tag(self, args: tuple) -> None:
+        """ Remembers the current method for a command with `args`. """
+        if not self.enabled or len(args) < 2:
+            return
+        method = current_redis_method.get()
+        if method is None:
+            return
+
+        methods = self._methods
+        command = (str(args[0]).upper(), str(args[1]))
+        methods.pop(command, None)      # move to the end
+        methods[command] = method
+        if len(methods) > self.max_size:
+            del methods[next(iter(methods))]
+
+    def get_method(self, args: list[str]) -> str:
+        """ Returns the method, which sent the last command with `args` (name & key), or "unknown". """
+        if len(args) < 2:
+            return UNKNOWN_METHOD
+        return self._methods.get((args[0].upper(), args[1]), UNKNOWN_METHOD)
+
+    def clear(self) -> None:
+        self._methods.clear()
+
+
+COMMAND_TAGGER = CommandTagger()
+
+
+def _decode(value: Any) -> str:
+    return value.decode(errors="replace") if isinstance(value, bytes) else str(value)
+
+
+class SlowlogCollector:
+    """
+    Polls SLOWLOG (up to `max_entries` latest entries) & LATENCY LATEST of the nodes of `redis` & `replicas`
+    every `interval` seconds & exports entries of connections with `client_name`.
+    Entries, which were logged before the collector was started, are skipped.
+    """
+    def __init__(
+        self,
+        redis: Redis | RedisCluster | ShardedRedis,
+        replicas: dict[str, Redis],
+        client_name: str | None,
+        interval: float,
+        max_entries: int = 128,
+        tagger: CommandTagger = COMMAND_TAGGER
+    ):
+        self.redis = redis
+        self.replicas = replicas
+        self.client_name = client_name
+        self.interval = interval
+        self.max_entries = max_entries
+        self.tagger = tagger
+        self._last_ids: dict[str, int] = {}
+        """ ID of the last processed SLOWLOG entry of each node. """
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self.tagger.enabled = True
+        self._task = asyncio.ensure_future(self._run())
+
+    async def close(self) -> None:
+        self.tagger.enabled = False
+        self.tagger.clear()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def collect(self) -> None:
+        """ Polls all nodes once. """
+        nodes = self._get_nodes()
+        await asyncio.gather(*(self._collect_node(node, execute) for node, execute in nodes.items()))
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.collect()
+            except Exception as e:
+                log(e, LogLevel.WARNING, exc_info=True, key="slowlog_collector")
+            await asyncio.sleep(self.interval)
+
+    def _get_nodes(self) -> dict[str, Callable[..., Awaitable[Any]]]:
+        """ Returns a mapping between node addresses & functions, which execute a command on them. """
+        nodes: dict[str, Callable[..., Awaitable[Any]]] = {}
+        if isinstance(self.redis, RedisCluster):
+            cluster = self.redis
+            for node in cluster.get_nodes():
+                nodes[node.name] = lambda *args, node=node: cluster.execute_command(*args, target_nodes=node)
+        elif isinstance(self.redis, ShardedRedis):
+            for address, client in self.redis.shards.items():
+                nodes[address] = client.execute_command
+        else:
+            nodes["primary"] = self.redis.execute_command
+        for address, client in self.replicas.items():
+            nodes[address] = client.execute_command
+        return nodes
+
+    async def _collect_node(self, node: str, execute: Callable[..., Awaitable[Any]]) -> None:
+        try:
+            entries, events = await asyncio.gather(
+                execute("SLOWLOG", "GET", self.max_entries),
+                execute("LATENCY", "LATEST")
+            )
+        except Exception as e:
+            log(e, LogLevel.WARNING, key=f"slowlog_collector:{node}")
+            return
+        self._process_slowlog(node, entries or [])
+        self._process_latency(node, events or [])
+
+    def _process_slowlog(self, node: str, entries: list) -> None:
+        # Entries are returned from the latest to the oldest
+        latest_id = int(entries[0][0]) if entries else -1
+        last_id = self._last_ids.get(node)
+        self._last_ids[node] = latest_id
+        if last_id is None:
+            return      # first poll
+        if latest_id < last_id:
+            last_id = -1    # slowlog was reset or the server was restarted
+
+        for entry in reversed(entries):
+            entry_id, duration = int(entry[0]), int(entry[2]) / 1_000_000
+            if entry_id <= last_id:
+                continue
+            client_name = _decode(entry[5]) if len(entry) > 5 else ""
+            if self.client_name is None or client_name != self.client_name:
+                continue    # other clients or workers
+
+            args = [_decode(arg) for arg in entry[3]]
+            command = args[0].upper() if args else ""
+            family = get_key_family(args[1]) if len(args) > 1 else "none"
+            method = self.tagger.get_method(args)
+
+            REDIS_SLOW_COMMANDS.labels(command, family, method).inc()
+            REDIS_SLOW_COMMAND_DURATION.labels(command, family, method).observe(duration)
+            log(
+                "Slow Redis command",
+                LogLevel.WARNING,
+                key=f"redis_slowlog:{method}:{command}",
+                node=node,
+                duration=duration,
+                command=" ".join(args)[:LOGGED_COMMAND_LENGTH],
+                method=method,
+                client=client_name,
+                slowlog_id=entry_id
+            )
+
+    def _process_latency(self, node: str, events: list) -> None:
+        for event, _, latest, maximum in events:
+            event = _decode(event)
+            REDIS_LATENCY_EVENT.labels(node, event).set(int(latest) / 1000)
+            REDIS_LATENCY_EVENT_MAX.labels(node, event).set(int(maximum) / 1000)
@@ -0,0 +1,70 @@
+import socket
+
+from redis import connection as sync_connection
+from redis.asyncio import connection as async_connection
+
+from config import RedisConfig
+
+
+class TCPConnection(async_connection.Connection):
+    """ Async TCP connection with a configurable TCP_NODELAY option (redis-py always enables it). """
+    def __init__(self, *, tcp_nodelay: bool = True, **kwargs):
+        super().__init__(**kwargs)
+        self.tcp_nodelay = tcp_nodelay
+
+    async def _connect(self):
+        await super()._connect()
+        if not self.tcp_nodelay and self._writer is not None:
+            sock = self._writer.transport.get_extra_info("socket")
+            if sock:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 0)
+
+
+class SyncTCPConnection(sync_connection.Connection):
+    """ Sync TCP connection with a configurable TCP_NODELAY option (redis-py always enables it). """
+    def __init__(self, *, tcp_nodelay: bool = True, **kwargs):
+        super().__init__(**kwargs)
+        self.tcp_nodelay = tcp_nodelay
+
+    def _connect(self):
+        sock = super()._connect()
+        if not self.tcp_nodelay:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 0)
+        return sock
+
+
+def get_keepalive_kwargs(redis_config: RedisConfig) -> dict:
+    """ Returns TCP keepalive keyword arguments for Redis clients. """
+    return {
+        "socket_keepalive": redis_config.socket_keepalive,
+        "socket_keepalive_options": {
+            getattr(socket, name): value for name, value in redis_config.socket_keepalive_options.items()
+        }
+    }
+
+
+def get_transport_kwargs(
+    redis_config: RedisConfig,
+    address: tuple[str, int] | None = None,
+    sync: bool = False
+) -> dict:
+    """
+    Returns connection class & location keyword arguments for a connection pool.
+    If `address` is not provided, returns arguments for the primary instance
+    (its Unix socket, if it's configured, or `localhost:<container_port>` otherwise).
+    """
+    if address is None and redis_config.unix_socket_path:
+        return {
+            "connection_class": sync_connection.UnixDomainSocketConnection if sync \
+                else async_connection.UnixDomainSocketConnection,
+            "path": redis_config.unix_socket_path
+        }
+
+    host, port = address or ("localhost", redis_config.container_port)
+    return {
+        "connection_class": SyncTCPConnection if sync else TCPConnection,
+        "host": host,
+        "port": port,
+        "tcp_nodelay": redis_config.tcp_nodelay,
+        **get_keepalive_kwargs(redis_config)
+    }
@@ -1,21 +1,38 @@
 from typing import cast
 
+from redis.crc import key_slot
+
+
 class RedisKeys:
+    """
+    Redis key schema.
+
+    Keys of a user contain a hash tag with the username (e.g. "user:{username}"),
+    so that all of them are stored in the same slot in cluster mode.
+    """
     @staticmethod
     def user(username: str) -> str:
-        return f"user:{username}"
+        return f"user:{{{username}}}"
     
     @staticmethod
     def user_followers(username: str) -> str:
-        return f"user_followers:{username}"
+        return f"user_followers:{{{username}}}"
     
     @staticmethod
     def user_posts(username: str) -> str:
-        return f"user_posts:{username}"
+        return f"user_posts:{{{username}}}"
     
     @staticmethod
     def user_feed(username: str) -> str:
-        return f"user_feed:{username}"
+        return f"user_feed:{{{username}}}"
+    
+    @staticmethod
+    def user_posts_version(username: str) -> str:
+        return f"user_posts_version:{{{username}}}"
+    
+    @staticmethod
+    def user_feed_version(username: str) -> str:
+        return f"user_feed_version:{{{username}}}"
     
     @staticmethod
     def post(post_id: str | int) -> str:
@@ -28,9 +45,48 @@ class RedisKeys:
     next_post_id = "next_post_id"
 
 
+KEY_FAMILIES = {
+    "user": "user",
+    "user_followers": "user",
+    "user_posts": "user",
+    "user_posts_version": "user",
+    "user_feed": "feed",
+    "user_feed_version": "feed",
+    "post": "post",
+    "next_post_id": "post",
+    "access_token": "token"
+}
+""" Mapping between key prefixes & key families, which are used in metrics. """
+
+
+def get_key_family(key: object) -> str:
+    """ Returns the family of a `key` (user, feed, post, token or other). """
+    if not isinstance(key, str):
+        return "other"
+    return KEY_FAMILIES.get(key.partition(":")[0], "other")
+
+
 def get_post_id_mapping(post_ids: list[int] | list[str] | int | str):
     """ Returns a mapping for provided `post_ids` to be inserted into a sorted set. """
     if not isinstance(post_ids, list):
         post_ids = [post_ids]   # type: ignore
     post_ids = cast(list[int] | list[str], post_ids)
     return {str(post_id): -int(post_id) for post_id in post_ids}
+
+
+def get_hash_tag(key: str) -> str:
+    """ Returns hash tag of the `key` (the content of the first {...}) or the whole key, if it has no hash tag. """
+    start = key.find("{")
+    if start != -1:
+        end = key.find("}", start + 1)
+        if end > start + 1:
+            return key[start + 1:end]
+    return key
+
+
+def group_by_slot(keys: list[str]) -> dict[int, list[int]]:
+    """ Returns a mapping between cluster slots and indexes of `keys`, which belong to them. """
+    result: dict[int, list[int]] = {}
+    for i, key in enumerate(keys):
+        result.setdefault(key_slot(key.encode()), []).append(i)
+    return result
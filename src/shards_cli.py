@@ -0,0 +1,52 @@
+from pathlib import Path
+import typer
+
+if __name__ == "__main__":
+    import sys
+    project_root = Path(__file__).parent.parent
+    sys.path.insert(0, str(project_root))
+
+from config import load_config
+from src.redis.rebalancing import RebalanceStats, ShardRebalancer
+
+
+config = load_config()
+app = typer.Typer(pretty_exceptions_enable=False)
+""" CLI utility for managing client-side Redis shards. """
+
+
+@app.callback()
+def main():
+    pass
+
+
+@app.command(help="Moves keys to new shards. Run before adding the new shards to `redis.shards` setting.")
+def rebalance(
+    add: list[str] = typer.Option(..., help="Address of a new shard in \"host:port\" format."),
+    batch_size: int = 500,
+    dry_run: bool = False
+):
+    old_shards = config.redis.shards or [f"localhost:{config.redis.container_port}"]
+    new_shards = old_shards + [shard for shard in add if shard not in old_shards]
+
+    def on_progress(source: str, stats: RebalanceStats) -> None:
+        rate = stats.scanned / stats.elapsed if stats.elapsed else 0
+        typer.echo(
+            f"\r{source}: scanned {stats.scanned}, moved {stats.moved} keys ({rate:.0f} keys/s)",
+            nl=False
+        )
+
+    rebalancer = ShardRebalancer(config.redis, old_shards, new_shards, batch_size)
+    try:
+        stats = rebalancer.rebalance(dry_run=dry_run, on_progress=on_progress)
+    finally:
+        rebalancer.close()
+
+    typer.echo("")
+    action = "Would move" if dry_run else "Moved"
+    typer.echo(f"{action} {stats.moved} of {stats.scanned} keys in {stats.elapsed:.1f}s.")
+    typer.echo(f"New shards setting: {new_shards}")
+
+
+if __name__ == "__main__":
+    app()
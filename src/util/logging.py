@@ -1,3 +1,224 @@
-def log(msg: str | Exception) -> None:
-    """ Production-ready logging function. """
-    print(msg)
+"""
+Non-blocking structured logging.
+
+`log` puts records into a bounded in-memory queue, which is drained by a background thread:
+the thread formats records as JSON lines, writes them in batches & flushes the stream once per batch,
+so that logging never blocks the event loop on I/O. Records are dropped, if the queue is full,
+and repeated messages are rate limited (e.g. connection errors of every request during an outage).
+"""
+import atexit
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from enum import IntEnum
+import json
+import queue
+import sys
+import threading
+from time import monotonic, time
+import traceback
+from typing import Any, TextIO
+
+from src.util.metrics import CounterMetric
+
+
+LOG_RECORDS_DROPPED = CounterMetric("log_records_dropped_total", "Number of log records dropped due to a full queue.")
+
+
+class LogLevel(IntEnum):
+    DEBUG = 10
+    INFO = 20
+    WARNING = 30
+    ERROR = 40
+
+
+@dataclass(slots=True)
+class LogRecord:
+    time: float
+    level: LogLevel
+    message: str
+    exception: BaseException | None = None
+    """ Exception, which traceback is logged (formatted by the writer thread). """
+    fields: dict[str, Any] = field(default_factory=dict)
+
+
+class Logger:
+    """
+    Logger, which writes records to `stream` (stdout by default) from a background thread.
+
+    At most `rate_limit` records with the same key (message text by default) are logged
+    in each `rate_limit_interval` seconds; the number of suppressed records is logged after the interval ends.
+    """
+    def __init__(
+        self,
+        level: LogLevel = LogLevel.INFO,
+        max_queue_size: int = 10000,
+        batch_size: int = 256,
+        rate_limit: int = 10,
+        rate_limit_interval: float = 10,
+        stream: TextIO | None = None
+    ):
+        self.level = level
+        self.batch_size = batch_size
+        self.rate_limit = rate_limit
+        """ Max number of records with the same key per interval (0 disables rate limiting). """
+        self.rate_limit_interval = rate_limit_interval
+        self.stream = stream
+
+        self.dropped = 0
+        """ Number of records, which were dropped due to a full queue. """
+        self._reported_dropped = 0
+
+        self._queue: queue.Queue[LogRecord | None] = queue.Queue(max_queue_size)
+        self._thread: threading.Thread | None = None
+        self._thread_lock = threading.Lock()
+
+        self._rate_limit_lock = threading.Lock()
+        self._window_start = monotonic()
+        self._message_counts: dict[str, int] = {}
+
+    def configure(
+        self,
+        level: LogLevel | None = None,
+        rate_limit: int | None = None,
+        rate_limit_interval: float | None = None
+    ) -> None:
+        if level is not None: self.level = level
+        if rate_limit is not None: self.rate_limit = rate_limit
+        if rate_limit_interval is not None: self.rate_limit_interval = rate_limit_interval
+
+    def log(
+        self,
+        msg: str | BaseException,
+        level: LogLevel = LogLevel.INFO,
+        exc_info: bool = False,
+        key: str | None = None,
+        rate_limit: bool = True,
+        **fields: Any
+    ) -> None:
+        """
+        Enqueues a record with `msg` & additional `fields`.
+        If `msg` is an exception & `exc_info` is true, its traceback is logged as well.
+        `key` identifies repeated messages for rate limiting (defaults to message text);
+        `rate_limit` = false disables it for records, which are expected to repeat.
+        """
+        if level < self.level:
+            return
+
+        message = (str(msg) or type(msg).__name__) if isinstance(msg, BaseException) else msg
+        if rate_limit and not self._is_allowed(key or message):
+            return
+
+        exception = msg if exc_info and isinstance(msg, BaseException) else None
+        self._enqueue(LogRecord(time(), level, message, exception, fields))
+
+    def flush(self) -> None:
+        """ Blocks, until all enqueued records are written. """
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def close(self) -> None:
+        """ Writes enqueued records & stops the writer thread. """
+        with self._thread_lock:
+            if self._thread is None:
+                return
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _enqueue(self, record: LogRecord) -> None:
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            LOG_RECORDS_DROPPED.labels().inc()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                self._thread.start()
+
+    def _is_allowed(self, key: str) -> bool:
+        if self.rate_limit == 0:
+            return True
+
+        with self._rate_limit_lock:
+            now = monotonic()
+            if now - self._window_start >= self.rate_limit_interval:
+                suppressed = {k: count - self.rate_limit for k, count in self._message_counts.items() if count > self.rate_limit}
+                self._window_start = now
+                self._message_counts.clear()
+            else:
+                suppressed = {}
+
+            count = self._message_counts.get(key, 0) + 1
+            self._message_counts[key] = count
+
+        for suppressed_key, suppressed_count in suppressed.items():
+            self._enqueue(LogRecord(
+                time(), LogLevel.WARNING, f"Suppressed {suppressed_count} repeated log records",
+                fields={"key": suppressed_key}
+            ))
+        return count <= self.rate_limit
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            lines = [self._format(record) for record in batch if record is not None]
+
+            # Report records, which were dropped since the previous batch
+            dropped = self.dropped
+            if dropped > self._reported_dropped:
+                lines.append(self._format(LogRecord(
+                    time(), LogLevel.WARNING, f"Dropped {dropped - self._reported_dropped} log records (queue is full)"
+                )))
+                self._reported_dropped = dropped
+
+            try:
+                stream = self.stream or sys.stdout
+                stream.write("".join(lines))
+                stream.flush()
+            except (OSError, ValueError):
+                pass    # stream is closed or unavailable
+
+            for _ in batch:
+                self._queue.task_done()
+            if None in batch:
+                return
+
+    def _format(self, record: LogRecord) -> str:
+        data = {
+            "time": datetime.fromtimestamp(record.time, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.level.name,
+            "message": record.message,
+            **record.fields
+        }
+        if record.exception is not None:
+            data["traceback"] = "".join(traceback.format_exception(record.exception))
+        return json.dumps(data, default=str) + "\n"
+
+
+LOGGER = Logger()
+""" Default app logger. """
+atexit.register(LOGGER.close)
+
+
+def log(
+    msg: str | BaseException,
+    level: LogLevel = LogLevel.INFO,
+    exc_info: bool = False,
+    key: str | None = None,
+    rate_limit: bool = True,
+    **fields: Any
+) -> None:
+    """ Logs `msg` via the default logger without blocking (see `Logger.log`). """
+    LOGGER.log(msg, level, exc_info, key, rate_limit, **fields)
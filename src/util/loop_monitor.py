@@ -0,0 +1,93 @@
+"""
+Event loop lag & blocking callback monitor.
+
+A task on the monitored loop sleeps for a fixed interval & measures how late it's woken up (scheduling lag).
+A watchdog thread checks, whether the task is overdue by more than a threshold; if so, the loop is blocked
+by a callback, and the stack of the loop thread (which includes the frames of the offending coroutine) is logged.
+"""
+import asyncio
+import sys
+import threading
+from time import perf_counter
+import traceback
+
+from src.util.logging import log, LogLevel
+from src.util.metrics import CounterMetric, GaugeMetric, HistogramMetric
+
+
+EVENT_LOOP_LAG = GaugeMetric(
+    "event_loop_lag_seconds", "Event loop scheduling lag during the last check.", aggregation="max"
+)
+EVENT_LOOP_LAG_HISTOGRAM = HistogramMetric("event_loop_lag_histogram_seconds", "Event loop scheduling lag.")
+EVENT_LOOP_BLOCKED = CounterMetric(
+    "event_loop_blocked_total", "Number of times the event loop was blocked by a callback longer than the threshold."
+)
+
+
+class LoopMonitor:
+    """
+    Measures lag of the current event loop every `interval` seconds
+    and logs stacks of callbacks, which block it longer than `slow_callback_threshold` seconds.
+    """
+    def __init__(self, interval: float, slow_callback_threshold: float):
+        self.interval = interval
+        self.slow_callback_threshold = slow_callback_threshold
+
+        self._expected_wakeup = 0.0
+        """ Time, when the monitor task should be woken up (updated by the task, read by the watchdog). """
+        self._reported_wakeup = 0.0
+        self._loop_thread_id = 0
+        self._task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        self._loop_thread_id = threading.get_ident()
+        self._expected_wakeup = perf_counter() + self.interval
+        self._task = asyncio.ensure_future(self._run())
+
+        self._stopped.clear()
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def close(self) -> None:
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+
+    async def _run(self) -> None:
+        lag_gauge, lag_histogram, blocked = EVENT_LOOP_LAG.labels(), EVENT_LOOP_LAG_HISTOGRAM.labels(), EVENT_LOOP_BLOCKED.labels()
+        while True:
+            self._expected_wakeup = perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+
+            lag = max(perf_counter() - self._expected_wakeup, 0)
+            lag_gauge.set(lag)
+            lag_histogram.observe(lag)
+            if lag > self.slow_callback_threshold:
+                blocked.inc()
+
+    def _watch(self) -> None:
+        # Check a few times per threshold, so that a blocking callback is caught while it's still running
+        while not self._stopped.wait(self.slow_callback_threshold / 4):
+            expected_wakeup = self._expected_wakeup
+            if perf_counter() - expected_wakeup <= self.slow_callback_threshold or expected_wakeup == self._reported_wakeup:
+                continue
+            self._reported_wakeup = expected_wakeup     # report each blocking once
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame)
+            log(
+                f"Event loop is blocked for more than {self.slow_callback_threshold} seconds",
+                LogLevel.WARNING,
+                key=f"loop_blocked:{stack[-1].filename}:{stack[-1].lineno}",
+                stack="".join(stack.format())
+            )
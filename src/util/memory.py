@@ -0,0 +1,152 @@
+"""
+On-demand memory allocation tracing via `tracemalloc`.
+
+Tracing can be started & stopped in a running worker; snapshots of traced allocations are kept in memory
+and can be summarized by allocation site & module or compared with each other.
+"""
+import asyncio
+from collections import defaultdict
+from pathlib import Path
+import sysconfig
+import tracemalloc
+from typing import Any
+
+from src.exceptions import InvalidOperationException
+
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+STDLIB_PATH = Path(sysconfig.get_paths()["stdlib"])
+
+
+def get_module_group(filename: str) -> str:
+    """
+    Returns a group of a source file for aggregation:
+    "src/<package>" for app sources, top-level package name for installed packages, "stdlib" or "other".
+    """
+    path = Path(filename)
+    if path.is_relative_to(PROJECT_ROOT / "src"):
+        parts = path.relative_to(PROJECT_ROOT).parts
+        return "/".join(parts[:2]) if len(parts) > 2 else "src"
+
+    parts = path.parts
+    for directory in ("site-packages", "dist-packages"):
+        if directory in parts:
+            index = parts.index(directory)
+            if index + 1 < len(parts):
+                return parts[index + 1].removesuffix(".py")
+
+    if path.is_relative_to(STDLIB_PATH):
+        return "stdlib"
+    return "other"
+
+
+class MemoryTracer:
+    """ Controls `tracemalloc` & stores up to `max_snapshots` most recent snapshots. """
+    def __init__(self, max_snapshots: int = 10):
+        self.max_snapshots = max_snapshots
+        self._snapshots: dict[int, tracemalloc.Snapshot] = {}
+        self._next_snapshot_id = 1
+
+    @property
+    def is_tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int) -> None:
+        """ Starts tracing allocations with `frames` frames of each allocation traceback. """
+        if tracemalloc.is_tracing():
+            raise InvalidOperationException("Memory tracing is already running.")
+        tracemalloc.start(frames)
+
+    def stop(self) -> None:
+        """ Stops tracing & removes snapshots (traces can't be taken after tracing is stopped). """
+        tracemalloc.stop()
+        self._snapshots.clear()
+
+    async def take_snapshot(self) -> int:
+        """ Takes a snapshot of traced allocations & returns its ID. """
+        if not tracemalloc.is_tracing():
+            raise InvalidOperationException("Memory tracing is not running.")
+
+        snapshot = await asyncio.to_thread(self._take_snapshot)
+        snapshot_id = self._next_snapshot_id
+        self._next_snapshot_id += 1
+        self._snapshots[snapshot_id] = snapshot
+
+        # Remove the oldest snapshots
+        while len(self._snapshots) > self.max_snapshots:
+            del self._snapshots[min(self._snapshots)]
+        return snapshot_id
+
+    def get_snapshot_ids(self) -> list[int]:
+        return list(self._snapshots)
+
+    def has_snapshot(self, snapshot_id: int) -> bool:
+        return snapshot_id in self._snapshots
+
+    async def get_statistics(self, snapshot_id: int, limit: int) -> dict[str, Any]:
+        """ Returns top `limit` allocation sites & total allocations of each module group in a snapshot. """
+        snapshot = self._snapshots[snapshot_id]
+        return await asyncio.to_thread(self._get_statistics, snapshot, limit)
+
+    async def get_diff(self, old_snapshot_id: int, new_snapshot_id: int, limit: int) -> dict[str, Any]:
+        """ Returns top `limit` allocation sites & module groups by allocated size difference between snapshots. """
+        old_snapshot, new_snapshot = self._snapshots[old_snapshot_id], self._snapshots[new_snapshot_id]
+        return await asyncio.to_thread(self._get_diff, old_snapshot, new_snapshot, limit)
+
+    def _take_snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            tracemalloc.Filter(False, "<unknown>")
+        ))
+
+    def _get_statistics(self, snapshot: tracemalloc.Snapshot, limit: int) -> dict[str, Any]:
+        modules: dict[str, dict[str, int]] = defaultdict(lambda: {"size": 0, "count": 0})
+        for stat in snapshot.statistics("filename"):
+            module = modules[get_module_group(stat.traceback[0].filename)]
+            module["size"] += stat.size
+            module["count"] += stat.count
+
+        return {
+            "total_size": sum(module["size"] for module in modules.values()),
+            "modules": dict(sorted(modules.items(), key=lambda item: item[1]["size"], reverse=True)),
+            "top": [
+                {**self._get_site(stat.traceback), "size": stat.size, "count": stat.count}
+                for stat in snapshot.statistics("traceback")[:limit]
+            ]
+        }
+
+    def _get_diff(self, old_snapshot: tracemalloc.Snapshot, new_snapshot: tracemalloc.Snapshot, limit: int) -> dict[str, Any]:
+        modules: dict[str, dict[str, int]] = defaultdict(lambda: {"size_diff": 0, "count_diff": 0})
+        for stat in new_snapshot.compare_to(old_snapshot, "filename"):
+            module = modules[get_module_group(stat.traceback[0].filename)]
+            module["size_diff"] += stat.size_diff
+            module["count_diff"] += stat.count_diff
+
+        stats = new_snapshot.compare_to(old_snapshot, "traceback")     # sorted by absolute size difference
+        return {
+            "total_size_diff": sum(module["size_diff"] for module in modules.values()),
+            "modules": dict(sorted(modules.items(), key=lambda item: abs(item[1]["size_diff"]), reverse=True)),
+            "top": [
+                {
+                    **self._get_site(stat.traceback),
+                    "size": stat.size, "size_diff": stat.size_diff,
+                    "count": stat.count, "count_diff": stat.count_diff
+                }
+                for stat in stats[:limit]
+            ]
+        }
+
+    def _get_site(self, traceback: tracemalloc.Traceback) -> dict[str, Any]:
+        # Traceback frames are ordered from the oldest one
+        frame = traceback[-1]
+        return {
+            "site": f"{frame.filename}:{frame.lineno}",
+            "module": get_module_group(frame.filename),
+            "traceback": [f"{frame.filename}:{frame.lineno}" for frame in traceback] if len(traceback) > 1 else None
+        }
+
+
+MEMORY_TRACER = MemoryTracer()
+""" Memory tracer of the current process. """
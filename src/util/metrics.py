@@ -0,0 +1,312 @@
+"""
+Lightweight Prometheus-style metrics.
+
+Metric values are plain Python numbers & preallocated bucket lists, which are updated
+without locks (the app updates them from the event loop thread only).
+Metrics of multiple worker processes can be aggregated via snapshot files (see `MultiprocessMetrics`).
+"""
+from abc import ABC, abstractmethod
+import asyncio
+from bisect import bisect_left
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Literal
+
+
+DEFAULT_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+""" Default histogram bucket upper bounds in seconds. """
+
+
+class Histogram:
+    """ Histogram of observed values with fixed bucket upper bounds (the last bucket is +Inf). """
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        """ Number of observations in each bucket (not cumulative). """
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class CounterValue:
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+class GaugeValue:
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+
+class Metric(ABC):
+    """ Base class for metric families with a fixed set of label names. """
+    type: str
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = (), registry: "MetricsRegistry | None" = None):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._children: dict[tuple[str, ...], Any] = {}
+        (registry or REGISTRY).register(self)
+
+    def labels(self, *values: str) -> Any:
+        """ Returns the value of the metric with provided label `values` (created on the first call). """
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"Metric '{self.name}' expects labels {self.labelnames}, got {values}")
+            child = self._children[values] = self._create_child()
+        return child
+
+    def remove(self, *values: str) -> None:
+        self._children.pop(values, None)
+
+    def snapshot(self) -> dict:
+        """ Returns a JSON-serializable snapshot of the metric family. """
+        return {
+            "type": self.type,
+            "help": self.help,
+            "labelnames": list(self.labelnames),
+            "samples": [[list(labels), self._get_sample(child)] for labels, child in self._children.items()]
+        }
+
+    @abstractmethod
+    def _create_child(self) -> Any:
+        """ Returns a new value of the metric with a set of label values. """
+
+    def _get_sample(self, child: Any) -> Any:
+        return child.value
+
+
+class CounterMetric(Metric):
+    type = "counter"
+
+    def _create_child(self) -> CounterValue:
+        return CounterValue()
+
+
+class GaugeMetric(Metric):
+    type = "gauge"
+
+    def __init__(self, *args, aggregation: Literal["sum", "max"] = "sum", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.aggregation = aggregation
+        """ Aggregation of values from multiple worker processes. """
+
+    def snapshot(self) -> dict:
+        return {**super().snapshot(), "aggregation": self.aggregation}
+
+    def _create_child(self) -> GaugeValue:
+        return GaugeValue()
+
+
+class HistogramMetric(Metric):
+    type = "histogram"
+
+    def __init__(self, *args, buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = buckets
+
+    def bind(self, values: tuple[str, ...], histogram: Histogram) -> None:
+        """ Uses an existing `histogram` as the value of the metric with label `values`. """
+        if histogram.buckets != self.buckets:
+            raise ValueError(f"Histogram buckets do not match buckets of metric '{self.name}'")
+        self._children[values] = histogram
+
+    def snapshot(self) -> dict:
+        return {**super().snapshot(), "buckets": list(self.buckets)}
+
+    def _create_child(self) -> Histogram:
+        return Histogram(self.buckets)
+
+    def _get_sample(self, child: Histogram) -> Any:
+        return {"counts": child.counts, "sum": child.sum, "count": child.count}
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+        self._collectors: list[Callable[[], None]] = []
+
+    def register(self, metric: Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric '{metric.name}' is already registered")
+        self._metrics[metric.name] = metric
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """ Adds a function, which updates metric values before each snapshot. """
+        self._collectors.append(collector)
+
+    def remove_collector(self, collector: Callable[[], None]) -> None:
+        self._collectors.remove(collector)
+
+    def snapshot(self) -> dict[str, dict]:
+        """ Returns a JSON-serializable snapshot of all metrics. """
+        for collector in self._collectors:
+            collector()
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+
+REGISTRY = MetricsRegistry()
+""" Default registry of app metrics. """
+
+
+def merge_snapshots(snapshots: list[dict[str, dict]]) -> dict[str, dict]:
+    """
+    Merges metric snapshots of multiple worker processes:
+    counters & histograms are summed, gauges are summed or maxed according to their aggregation.
+    """
+    result: dict[str, dict] = {}
+    for snapshot in snapshots:
+        for name, family in snapshot.items():
+            merged = result.setdefault(name, {**family, "samples": {}})
+            samples: dict[tuple, Any] = merged["samples"]
+
+            for labels, value in family["samples"]:
+                key = tuple(labels)
+                current = samples.get(key)
+                if current is None:
+                    samples[key] = dict(value, counts=list(value["counts"])) if family["type"] == "histogram" else value
+                elif family["type"] == "histogram":
+                    current["counts"] = [a + b for a, b in zip(current["counts"], value["counts"])]
+                    current["sum"] += value["sum"]
+                    current["count"] += value["count"]
+                elif family.get("aggregation") == "max":
+                    samples[key] = max(current, value)
+                else:
+                    samples[key] = current + value
+
+    for family in result.values():
+        family["samples"] = [[list(labels), value] for labels, value in family["samples"].items()]
+    return result
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: list[str], values: list[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape_label_value(str(value))}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render_snapshot(snapshot: dict[str, dict]) -> str:
+    """ Renders a metrics snapshot in Prometheus text exposition format. """
+    lines: list[str] = []
+    for name, family in snapshot.items():
+        lines.append(f"# HELP {name} {family['help']}")
+        lines.append(f"# TYPE {name} {family['type']}")
+        labelnames = family["labelnames"]
+
+        for labels, value in family["samples"]:
+            if family["type"] != "histogram":
+                lines.append(f"{name}{_format_labels(labelnames, labels)} {_format_value(value)}")
+                continue
+
+            cumulative = 0
+            for bound, count in zip(family["buckets"] + [float("inf")], value["counts"]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{name}_bucket{_format_labels(labelnames, labels, le)} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labelnames, labels)} {_format_value(value['sum'])}")
+            lines.append(f"{name}_count{_format_labels(labelnames, labels)} {value['count']}")
+
+    return "\n".join(lines) + "\n"
+
+
+class MultiprocessMetrics:
+    """
+    Aggregates metrics of multiple worker processes via snapshot files in a shared `directory`.
+    Each worker periodically writes its registry snapshot into "<pid>.json" file;
+    snapshots of all live workers are merged, when metrics are requested.
+    """
+    def __init__(self, directory: str, interval: float, registry: MetricsRegistry | None = None):
+        self.directory = Path(directory)
+        self.interval = interval
+        self.registry = registry or REGISTRY
+        self.path = self.directory / f"{os.getpid()}.json"
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._task = asyncio.ensure_future(self._run())
+
+    async def close(self) -> None:
+        """ Stops periodic writes and removes the snapshot file of the current process. """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self.path.unlink(missing_ok=True)
+
+    async def write(self) -> None:
+        """ Writes a snapshot of the current process (file is written in a separate thread). """
+        data = json.dumps(self.registry.snapshot())
+        await asyncio.to_thread(self._write_file, data)
+
+    async def collect(self) -> dict[str, dict]:
+        """ Returns merged snapshots of all live worker processes. """
+        await self.write()
+        return merge_snapshots(await asyncio.to_thread(self._read_files))
+
+    async def _run(self) -> None:
+        while True:
+            await self.write()
+            await asyncio.sleep(self.interval)
+
+    def _write_file(self, data: str) -> None:
+        temp_path = self.path.with_suffix(".tmp")
+        temp_path.write_text(data)
+        os.replace(temp_path, self.path)
+
+    def _read_files(self) -> list[dict[str, dict]]:
+        snapshots = []
+        for path in self.directory.glob("*.json"):
+            # Skip unrelated files & snapshots of terminated workers
+            if not path.stem.isdigit():
+                continue
+            if not _is_process_alive(int(path.stem)):
+                path.unlink(missing_ok=True)
+                continue
+            try:
+                snapshots.append(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                pass    # file was removed or replaced during read
+        return snapshots
+
+
+def _is_process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
@@ -0,0 +1,140 @@
+"""
+On-demand sampling CPU profiler.
+
+While a profile is running, a sampler thread periodically captures stacks of all threads via `sys._current_frames`
+and aggregates them in collapsed-stack format ("frame;frame;frame count"), which is accepted by flamegraph tools.
+Samples of the event loop thread are attributed to the route of the request, which is handled by the current task.
+No threads are running & no requests are tracked, when the profiler is idle.
+"""
+import asyncio
+from collections import Counter
+from contextlib import contextmanager
+import os
+import sys
+import threading
+from time import perf_counter, sleep
+from types import FrameType
+from typing import Iterator
+
+from starlette.types import Scope
+
+from src.exceptions import InvalidOperationException
+
+
+IDLE_FRAMES = {
+    ("select", "selectors.py"),     # event loop waits for I/O
+    ("wait", "threading.py"),       # thread waits for a condition (including queue & event waits)
+    ("_worker", "thread.py")        # thread pool worker waits for work
+}
+""" Innermost frames (function & file name), which indicate that a thread is idle. """
+
+
+def get_frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def is_idle(frame: FrameType) -> bool:
+    return (frame.f_code.co_name, os.path.basename(frame.f_code.co_filename)) in IDLE_FRAMES
+
+
+def get_stack(frame: FrameType | None) -> list[str]:
+    """ Returns labels of `frame` & its callers, starting from the outermost one. """
+    stack = []
+    while frame is not None:
+        stack.append(get_frame_label(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def format_collapsed_stacks(stacks: Counter[str]) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class SamplingProfiler:
+    def __init__(self):
+        self.active = False
+        """ Whether a profile is running (requests are tracked only in this case). """
+        self._requests: dict[asyncio.Task, Scope] = {}
+
+    @contextmanager
+    def track_request(self, scope: Scope) -> Iterator[None]:
+        """ Attributes samples of the current task to the request with ASGI `scope`. """
+        task = asyncio.current_task()
+        if task is None:
+            yield
+            return
+
+        self._requests[task] = scope
+        try:
+            yield
+        finally:
+            self._requests.pop(task, None)
+
+    async def profile(self, duration: float, interval: float, include_idle: bool = False) -> Counter[str]:
+        """
+        Samples stacks of all threads every `interval` seconds during `duration` seconds
+        & returns the number of samples of each collapsed stack.
+        Stacks of idle threads are skipped, unless `include_idle` is true.
+        """
+        if self.active:
+            raise InvalidOperationException("Profiler is already running.")
+
+        self.active = True
+        try:
+            return await asyncio.to_thread(self._sample, threading.get_ident(), duration, interval, include_idle)
+        finally:
+            self.active = False
+            self._requests.clear()
+
+    def _sample(
+        self,
+        loop_thread_id: int,
+        duration: float,
+        interval: float,
+        include_idle: bool
+    ) -> Counter[str]:
+        stacks: Counter[str] = Counter()
+        sampler_thread_id = threading.get_ident()
+        end = perf_counter() + duration
+
+        while perf_counter() < end:
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == sampler_thread_id or (not include_idle and is_idle(frame)):
+                    continue
+
+                prefix = [thread_names.get(thread_id, str(thread_id))]
+                if thread_id == loop_thread_id:
+                    scope = self._get_running_request(frame)
+                    if scope is not None:
+                        route = getattr(scope.get("route"), "path", "<unmatched>")
+                        prefix.append(f"{scope['method']} {route}")
+
+                stacks[";".join(prefix + get_stack(frame))] += 1
+
+            sleep(interval)
+
+        return stacks
+
+    def _get_running_request(self, frame: FrameType) -> Scope | None:
+        """
+        Returns the scope of a tracked request, which task's coroutine frame is in the stack of `frame`
+        (i.e. the task is running in the event loop thread).
+        """
+        stack_frames = set()
+        while frame is not None:
+            stack_frames.add(frame)
+            frame = frame.f_back    # type: ignore[assignment]
+
+        # Copy of tracked requests is created under GIL, while the loop thread may add or remove them
+        for task, scope in list(self._requests.items()):
+            if getattr(task.get_coro(), "cr_frame", None) in stack_frames:
+                return scope
+        return None
+
+
+PROFILER = SamplingProfiler()
+""" Profiler of the current process. """
@@ -0,0 +1,42 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+
+@dataclass
+class RequestTimings:
+    """
+    Time in seconds, spent in Redis & Keycloak calls during a request.
+    (Durations of concurrent calls are summed, so they may exceed request duration.)
+    """
+    redis: float = 0.0
+    redis_round_trips: int = 0
+    keycloak: float = 0.0
+    keycloak_calls: int = 0
+
+    def get_server_timing(self, total: float) -> str:
+        """ Returns a `Server-Timing` header value with durations in milliseconds. """
+        return ", ".join((
+            f'redis;dur={self.redis * 1000:.2f};desc="{self.redis_round_trips} round trips"',
+            f'keycloak;dur={self.keycloak * 1000:.2f};desc="{self.keycloak_calls} calls"',
+            f"total;dur={total * 1000:.2f}"
+        ))
+
+
+request_timings: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+""" Timings of the current request (set only if request timing is enabled). """
+
+
+def add_redis_time(duration: float) -> None:
+    """ Adds a Redis round trip with `duration` to the current request timings. """
+    timings = request_timings.get()
+    if timings is not None:
+        timings.redis += duration
+        timings.redis_round_trips += 1
+
+
+def add_keycloak_time(duration: float) -> None:
+    """ Adds a Keycloak call with `duration` to the current request timings. """
+    timings = request_timings.get()
+    if timings is not None:
+        timings.keycloak += duration
+        timings.keycloak_calls += 1
@@ -0,0 +1,231 @@
+"""
+Lightweight request tracing.
+
+Requests are sampled by `Tracer` (or follow the sampling decision of an incoming W3C `traceparent` header);
+spans of sampled requests are buffered by `JSONLSpanExporter` and appended to a local JSONL file in batches.
+Spans are created only within sampled requests, so that unsampled requests don't allocate them.
+"""
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field, asdict
+from functools import wraps
+import inspect
+import json
+from pathlib import Path
+import random
+import re
+from time import perf_counter, time
+from typing import Any, Callable, Iterator
+
+from fastapi.routing import APIRoute
+
+from src.util.logging import log, LogLevel
+
+
+TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start: float
+    """ Start time as a Unix timestamp. """
+    duration: float = 0.0
+    """ Duration in seconds. """
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+
+@dataclass
+class SpanContext:
+    """ Current span & the exporter of its trace. """
+    span: Span
+    exporter: "JSONLSpanExporter"
+
+
+current_span: ContextVar[SpanContext | None] = ContextVar("current_span", default=None)
+""" Current span of a sampled request (not set in unsampled requests). """
+
+
+def generate_id(bits: int) -> str:
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+def parse_traceparent(header: str | None) -> tuple[str, str, bool] | None:
+    """ Returns trace ID, parent span ID & sampled flag of a W3C `traceparent` header or None, if it's invalid. """
+    match = TRACEPARENT_PATTERN.match(header.strip().lower()) if header else None
+    if match is None:
+        return None
+    trace_id, parent_id, flags = match.groups()
+    if trace_id == "0" * 32 or parent_id == "0" * 16:
+        return None
+    return trace_id, parent_id, bool(int(flags, 16) & 1)
+
+
+@contextmanager
+def start_span(name: str, **attributes: Any) -> Iterator[Span | None]:
+    """
+    Creates a child span of the current span, which is exported on exit.
+    Yields None & does nothing, if the current request is not sampled.
+    """
+    parent = current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    span = Span(name, parent.span.trace_id, generate_id(64), parent.span.span_id, time(), attributes=attributes)
+    start = perf_counter()
+    token = current_span.set(SpanContext(span, parent.exporter))
+    try:
+        yield span
+    except BaseException as e:
+        span.error = repr(e)
+        raise
+    finally:
+        current_span.reset(token)
+        span.duration = perf_counter() - start
+        parent.exporter.export(span)
+
+
+def record_span(name: str, start: float, error: BaseException | None = None, **attributes: Any) -> None:
+    """
+    Exports a child span of the current span for a finished operation, which was started at `start`
+    (`perf_counter` value). Does nothing, if the current request is not sampled.
+    """
+    parent = current_span.get()
+    if parent is None:
+        return
+
+    duration = perf_counter() - start
+    span = Span(
+        name, parent.span.trace_id, generate_id(64), parent.span.span_id, time() - duration,
+        duration=duration, attributes=attributes, error=repr(error) if error is not None else None
+    )
+    parent.exporter.export(span)
+
+
+def traced(name: str):
+    """ Decorator, which wraps calls of a sync or async function in a span with `name`. """
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @wraps(fn)
+            async def async_inner(*args, **kwargs):
+                with start_span(name):
+                    return await fn(*args, **kwargs)
+            return async_inner
+
+        @wraps(fn)
+        def inner(*args, **kwargs):
+            with start_span(name):
+                return fn(*args, **kwargs)
+        return inner
+
+    return decorator
+
+
+class TracedRoute(APIRoute):
+    """
+    API route, which wraps its endpoint in a span
+    (dependencies are resolved before the endpoint is called & are not included in it).
+    """
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        # Routes are recreated with wrapped endpoints, when routers are included into the app
+        if not getattr(endpoint, "_traced_route", False):
+            endpoint = traced(f"handler {path}")(endpoint)
+            endpoint._traced_route = True
+        super().__init__(path, endpoint, **kwargs)
+
+
+class JSONLSpanExporter:
+    """
+    Buffers finished spans in memory & periodically appends them to a JSONL file at `path`
+    (file is written in a separate thread). Spans are dropped, if the buffer is full.
+    """
+    def __init__(self, path: str, interval: float = 1, max_buffer_size: int = 10000):
+        self.path = Path(path)
+        self.interval = interval
+        self.max_buffer_size = max_buffer_size
+        self.dropped = 0
+        """ Number of spans, which were dropped due to a full buffer. """
+        self._buffer: list[Span] = []
+        self._task: asyncio.Task | None = None
+
+    def export(self, span: Span) -> None:
+        if len(self._buffer) >= self.max_buffer_size:
+            self.dropped += 1
+            return
+        self._buffer.append(span)
+
+    def start(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._task = asyncio.ensure_future(self._run())
+
+    async def close(self) -> None:
+        """ Stops periodic writes & writes remaining spans. """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+
+    async def flush(self) -> None:
+        if not self._buffer:
+            return
+        spans, self._buffer = self._buffer, []
+        data = "".join(json.dumps(asdict(span)) + "\n" for span in spans)
+        await asyncio.to_thread(self._write_file, data)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except OSError as e:
+                log(f"Failed to export spans: {e}", LogLevel.WARNING)
+
+    def _write_file(self, data: str) -> None:
+        with open(self.path, "a") as f:
+            f.write(data)
+
+
+class Tracer:
+    """ Starts root spans of requests, which are sampled with `sample_rate` probability. """
+    def __init__(self, exporter: JSONLSpanExporter, sample_rate: float):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    @contextmanager
+    def start_trace(self, name: str, traceparent: str | None = None, **attributes: Any) -> Iterator[Span | None]:
+        """
+        Starts a root span of a request, which continues a trace from `traceparent` header, if it's valid.
+        Incoming sampling decision is respected; otherwise, a new trace is sampled with `sample_rate` probability.
+        Yields None, if the trace is not sampled.
+        """
+        parent = parse_traceparent(traceparent)
+        if parent is not None:
+            trace_id, parent_id, sampled = parent
+        else:
+            trace_id, parent_id, sampled = None, None, random.random() < self.sample_rate
+
+        if not sampled:
+            yield None
+            return
+
+        span = Span(name, trace_id or generate_id(128), generate_id(64), parent_id, time(), attributes=attributes)
+        start = perf_counter()
+        token = current_span.set(SpanContext(span, self.exporter))
+        try:
+            yield span
+        except BaseException as e:
+            span.error = repr(e)
+            raise
+        finally:
+            current_span.reset(token)
+            span.duration = perf_counter() - start
+            self.exporter.export(span)
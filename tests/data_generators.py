@@ -1,4 +1,5 @@
 from datetime import datetime, timezone
+from httpx import AsyncClient
 
 from src.app.models import UserWithID, PostWithID, NewPost
 
@@ -33,6 +34,12 @@ class AuthGenerator:
     def get_bearer_header(self, token: str) -> dict[str, str]:
         return {"Authorization": f"Bearer {token}"}
     
+    async def login(self, cli: AsyncClient, username: str = "username", password: str = "password") -> dict[str, str]:
+        """ Logs in via /auth/login route & returns an authorization header with the access token. """
+        login_resp = await cli.post("/auth/login", json=self.get_auth_login_request_body(username, password))
+        assert login_resp.status_code == 200
+        return self.get_bearer_header(login_resp.json()["access_token"])
+    
     def get_bearer_header_with_invalid_token(self) -> dict:
         return {"Authorization": f"Bearer {_INVALID_ACCESS_TOKEN}"}
 
@@ -0,0 +1,256 @@
+"""
+Asyncio TCP proxy with latency & fault injection for tests & benchmarks.
+
+The proxy is placed between the app and an upstream (Redis or Keycloak) and forwards data in both directions,
+adding a delay from a latency distribution to each chunk (without reordering or serializing chunks),
+limiting bandwidth and randomly stalling or resetting connections.
+Faults can be changed at any time and are applied to the data, which is received after the change.
+"""
+import asyncio
+from dataclasses import dataclass, field
+import random
+import socket
+import struct
+from time import monotonic
+from typing import Literal
+
+
+LatencyDistribution = Literal["constant", "uniform", "normal", "exponential", "pareto"]
+
+PARETO_SHAPE = 1.5
+""" Shape of Pareto latency distribution (lower values result in heavier tails). """
+
+CHUNK_SIZE = 65536
+
+MAX_QUEUED_CHUNKS = 64
+"""
+Maximum number of chunks, which are queued for delivery in each direction of a connection
+(when the queue is full, data is not read from the sender, so that delays & bandwidth limits result in backpressure).
+"""
+
+
+@dataclass
+class Faults:
+    """ Faults, which are injected by a proxy in each direction of each connection. """
+    latency: float = 0
+    """ Base one-way delay of each chunk of data in seconds. """
+    jitter: float = 0
+    """
+    Scale of random delay in seconds, which is added to `latency` depending on `distribution`:
+    - constant: no jitter;
+    - uniform: uniform in [0, jitter];
+    - normal: normal with standard deviation of `jitter` (total delay is not negative);
+    - exponential: exponential with mean of `jitter`;
+    - pareto: `jitter` * (Pareto(shape=1.5) - 1), a heavy-tailed distribution.
+    """
+    distribution: LatencyDistribution = "constant"
+    bandwidth: int | None = None
+    """ Maximum number of bytes per second in each direction of a connection (unlimited, if not set). """
+    reset_probability: float = 0
+    """ Probability of resetting a connection (with a TCP RST) instead of forwarding a chunk. """
+    stall_probability: float = 0
+    """ Probability of stalling a direction of a connection for `stall_duration` seconds before forwarding a chunk. """
+    stall_duration: float = 1
+
+    def get_delay(self, rng: random.Random) -> float:
+        """ Returns a random one-way delay in seconds. """
+        if self.jitter <= 0 or self.distribution == "constant":
+            return self.latency
+        if self.distribution == "uniform":
+            return self.latency + rng.uniform(0, self.jitter)
+        if self.distribution == "normal":
+            return max(0.0, rng.gauss(self.latency, self.jitter))
+        if self.distribution == "exponential":
+            return self.latency + rng.expovariate(1 / self.jitter)
+        if self.distribution == "pareto":
+            return self.latency + self.jitter * (rng.paretovariate(PARETO_SHAPE) - 1)
+        raise ValueError(f"Unknown latency distribution: {self.distribution}")
+
+
+@dataclass
+class ProxyStats:
+    connections: int = 0
+    """ Number of accepted connections. """
+    bytes_forwarded: int = 0
+    resets: int = 0
+    """ Number of injected connection resets. """
+    stalls: int = 0
+
+
+@dataclass(eq=False)
+class _Connection:
+    client_writer: asyncio.StreamWriter
+    upstream_writer: asyncio.StreamWriter
+    tasks: list[asyncio.Task] = field(default_factory=list)
+
+
+class FaultProxy:
+    """
+    TCP proxy, which listens on `host`:`port` (a free port, if 0) & forwards connections
+    to `upstream_host`:`upstream_port`, injecting `faults`.
+    Random values are generated with `seed` for reproducible runs.
+    """
+    def __init__(
+        self,
+        upstream_host: str,
+        upstream_port: int,
+        faults: Faults | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: int | None = None
+    ):
+        self.upstream_host = upstream_host
+        self.upstream_port = upstream_port
+        self.faults = faults or Faults()
+        """ Current faults (can be replaced at any time). """
+        self.host = host
+        self.port = port
+        self.stats = ProxyStats()
+        self._rng = random.Random(seed)
+        self._server: asyncio.Server | None = None
+        self._connections: set[_Connection] = set()
+        self._handlers: set[asyncio.Task] = set()
+
+    async def __aenter__(self) -> "FaultProxy":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        """ Stops accepting connections, closes existing ones & waits for their sockets to be closed. """
+        server, self._server = self._server, None
+        if server is not None:
+            server.close()
+        self.reset_connections()
+        if self._handlers:
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+        if server is not None:
+            await server.wait_closed()
+
+    def reset_connections(self) -> None:
+        """ Resets all current connections. """
+        for connection in list(self._connections):
+            self._reset(connection)
+
+    async def _handle_connection(self, client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter) -> None:
+        handler = asyncio.current_task()
+        if handler is not None:
+            self._handlers.add(handler)
+        self.stats.connections += 1
+
+        try:
+            upstream_reader, upstream_writer = await asyncio.open_connection(self.upstream_host, self.upstream_port)
+        except OSError:
+            _abort(client_writer)
+            await _wait_closed(client_writer)
+            self._handlers.discard(handler)   # type: ignore[arg-type]
+            return
+
+        connection = _Connection(client_writer, upstream_writer)
+        self._connections.add(connection)
+        connection.tasks = [
+            asyncio.create_task(self._forward(connection, client_reader, upstream_writer)),
+            asyncio.create_task(self._forward(connection, upstream_reader, client_writer))
+        ]
+        try:
+            await asyncio.gather(*connection.tasks, return_exceptions=True)
+        finally:
+            self._connections.discard(connection)
+            for writer in (client_writer, upstream_writer):
+                if not writer.is_closing():
+                    writer.close()
+                await _wait_closed(writer)
+            self._handlers.discard(handler)   # type: ignore[arg-type]
+
+    async def _forward(self, connection: _Connection, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Forwards data from `reader` to `writer`. Chunks are read as soon as they arrive & queued with their
+        delivery time, so that a delay is not accumulated over consecutive chunks & their order is preserved
+        (up to `MAX_QUEUED_CHUNKS` chunks are queued).
+        """
+        queue: asyncio.Queue[tuple[float, bytes]] = asyncio.Queue(MAX_QUEUED_CHUNKS)
+
+        async def deliver() -> None:
+            next_send_time = 0.0    # time, when the previous chunk is transmitted with bandwidth limit
+            try:
+                while True:
+                    deliver_at, data = await queue.get()
+                    if not data:
+                        writer.write_eof() if writer.can_write_eof() else writer.close()
+                        return
+
+                    faults = self.faults
+                    if faults.stall_probability > 0 and self._rng.random() < faults.stall_probability:
+                        self.stats.stalls += 1
+                        deliver_at += faults.stall_duration
+                    if faults.bandwidth:
+                        # Chunk is sent, when the previous one & the chunk itself are transmitted
+                        deliver_at = max(deliver_at, next_send_time) + len(data) / faults.bandwidth
+                        next_send_time = deliver_at
+
+                    delay = deliver_at - monotonic()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    writer.write(data)
+                    await writer.drain()
+                    self.stats.bytes_forwarded += len(data)
+            except (ConnectionError, OSError):
+                self._reset(connection)
+
+        delivery = asyncio.create_task(deliver())
+        try:
+            last_deliver_at = 0.0
+            while True:
+                data = await reader.read(CHUNK_SIZE)
+                faults = self.faults
+                if data and faults.reset_probability > 0 and self._rng.random() < faults.reset_probability:
+                    self.stats.resets += 1
+                    self._reset(connection)
+                    return
+
+                # Chunks can't overtake the previous ones
+                last_deliver_at = max(monotonic() + faults.get_delay(self._rng), last_deliver_at)
+                await queue.put((last_deliver_at, data))
+                if not data:
+                    await delivery
+                    return
+        except (ConnectionError, OSError):
+            self._reset(connection)
+        finally:
+            if not delivery.done():
+                delivery.cancel()
+
+    def _reset(self, connection: _Connection) -> None:
+        if connection not in self._connections:
+            return
+        self._connections.discard(connection)
+        for writer in (connection.client_writer, connection.upstream_writer):
+            _abort(writer)
+        for task in connection.tasks:
+            if task is not asyncio.current_task():
+                task.cancel()
+
+
+def _abort(writer: asyncio.StreamWriter) -> None:
+    """ Closes a connection with a TCP RST. """
+    sock = writer.get_extra_info("socket")
+    if sock is not None:
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        except OSError:
+            pass
+    writer.transport.abort()
+
+
+async def _wait_closed(writer: asyncio.StreamWriter) -> None:
+    """ Waits for the socket of a closed or aborted connection to be closed. """
+    try:
+        await writer.wait_closed()
+    except (ConnectionError, OSError):
+        pass
@@ -0,0 +1,182 @@
+"""
+Test-side instrumentation, which counts Redis commands, round trips & pipelines and Keycloak HTTP calls per request.
+"""
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any
+
+from fastapi import FastAPI
+from keycloak.connection import ConnectionManager
+from redis.asyncio import Redis
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+@dataclass
+class RequestRoundTrips:
+    """ Redis & Keycloak calls, made while handling a request. """
+    method: str
+    path: str
+    route: str | None = None
+    """ Path template of the matched route. """
+    status: int | None = None
+    redis_commands: int = 0
+    """ Number of Redis commands (including commands in pipelines). """
+    redis_round_trips: int = 0
+    """ Number of sent Redis commands & pipelines. """
+    redis_pipelines: int = 0
+    keycloak_calls: int = 0
+    """ Number of HTTP requests to Keycloak. """
+
+    @property
+    def name(self) -> str:
+        return f"{self.method} {self.route or self.path}"
+
+
+_current_request: ContextVar[RequestRoundTrips | None] = ContextVar("round_trips_current_request", default=None)
+
+
+KEYCLOAK_HTTP_METHODS = ("a_raw_get", "a_raw_post", "a_raw_put", "a_raw_delete")
+
+
+class RoundTripCounter:
+    """
+    Counts Redis & Keycloak calls of each request, which is sent to the app wrapped with `wrap_app`.
+    Redis calls are counted on the app's Redis client (see `instrument_redis`), Keycloak calls -
+    on python-keycloak's async HTTP methods (see `instrument_keycloak`).
+    """
+    def __init__(self):
+        self.requests: list[RequestRoundTrips] = []
+
+    @property
+    def last(self) -> RequestRoundTrips:
+        """ Returns the last handled request. """
+        if not self.requests:
+            raise AssertionError("No requests were handled.")
+        return self.requests[-1]
+
+    def wrap_app(self, app: ASGIApp) -> ASGIApp:
+        """ Returns an ASGI app, which attributes Redis & Keycloak calls of HTTP requests to them. """
+        async def wrapper(scope: Scope, receive: Receive, send: Send) -> None:
+            if scope["type"] != "http":
+                await app(scope, receive, send)
+                return
+
+            request = RequestRoundTrips(scope["method"], scope["path"])
+            self.requests.append(request)
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    request.status = message["status"]
+                await send(message)
+
+            token = _current_request.set(request)
+            try:
+                await app(scope, receive, send_wrapper)
+            finally:
+                _current_request.reset(token)
+                route = scope.get("route")
+                request.route = getattr(route, "path", None)
+
+        return wrapper
+
+    def instrument_app(self, app: FastAPI, monkeypatch) -> None:
+        """ Counts calls of the Redis clients of a started `app` (including shards & replicas) & Keycloak calls. """
+        self.instrument_redis(app.state.redis)
+        if app.state.replicas is not None:
+            for target in app.state.replicas.targets:
+                self.instrument_redis(target.client)
+        self.instrument_keycloak(monkeypatch)
+
+    def instrument_redis(self, client: Redis | Any) -> None:
+        """ Counts commands & pipelines, sent via a `client` or its shards (methods are replaced on the instances). """
+        if (shards := getattr(client, "shards", None)) is not None:
+            for shard in shards.values():
+                self.instrument_redis(shard)
+            return
+
+        execute_command = client.execute_command
+        pipeline = client.pipeline
+
+        @wraps(execute_command)
+        async def counted_execute_command(*args: Any, **options: Any) -> Any:
+            if (request := _current_request.get()) is not None:
+                request.redis_commands += 1
+                request.redis_round_trips += 1
+            return await execute_command(*args, **options)
+
+        @wraps(pipeline)
+        def counted_pipeline(*args: Any, **kwargs: Any):
+            pipe = pipeline(*args, **kwargs)
+            execute = pipe.execute
+
+            @wraps(execute)
+            async def counted_execute(*args: Any, **kwargs: Any) -> list[Any]:
+                if (request := _current_request.get()) is not None and pipe.command_stack:
+                    request.redis_commands += len(pipe.command_stack)
+                    request.redis_round_trips += 1
+                    request.redis_pipelines += 1
+                return await execute(*args, **kwargs)
+
+            pipe.execute = counted_execute   # type: ignore[method-assign]
+            return pipe
+
+        client.execute_command = counted_execute_command   # type: ignore[method-assign]
+        client.pipeline = counted_pipeline   # type: ignore[method-assign]
+
+    def instrument_keycloak(self, monkeypatch) -> None:
+        """ Counts async HTTP requests of python-keycloak clients via pytest's `monkeypatch` fixture. """
+        for name in KEYCLOAK_HTTP_METHODS:
+            method = getattr(ConnectionManager, name)
+
+            def get_counted_method(method):
+                @wraps(method)
+                async def counted_method(*args: Any, **kwargs: Any) -> Any:
+                    if (request := _current_request.get()) is not None:
+                        request.keycloak_calls += 1
+                    return await method(*args, **kwargs)
+                return counted_method
+
+            monkeypatch.setattr(ConnectionManager, name, get_counted_method(method))
+
+    def assert_budget(
+        self,
+        redis_round_trips: int | None = None,
+        redis_commands: int | None = None,
+        redis_pipelines: int | None = None,
+        keycloak_calls: int | None = None,
+        request: RequestRoundTrips | None = None
+    ) -> None:
+        """
+        Asserts, that a `request` (the last one by default) didn't exceed provided numbers
+        of Redis round trips, commands & pipelines and Keycloak calls.
+        """
+        request = request or self.last
+        for name, budget in (
+            ("redis_round_trips", redis_round_trips),
+            ("redis_commands", redis_commands),
+            ("redis_pipelines", redis_pipelines),
+            ("keycloak_calls", keycloak_calls)
+        ):
+            if budget is not None:
+                value = getattr(request, name)
+                assert value <= budget, f"{request.name} ({request.status}): {name} = {value} exceeds the budget of {budget}"
+
+
+def format_round_trips_report(requests: list[RequestRoundTrips]) -> list[str]:
+    """ Returns lines of a table with maximum numbers of Redis & Keycloak calls by route & response status. """
+    groups: dict[tuple[str, int | None], list[RequestRoundTrips]] = defaultdict(list)
+    for request in requests:
+        groups[(request.name, request.status)].append(request)
+
+    lines = [f"{'route':<48}{'status':>8}{'requests':>10}{'redis RTT':>11}{'commands':>10}{'pipelines':>11}{'keycloak':>10}"]
+    for (name, status), group in sorted(groups.items(), key=lambda item: (item[0][0], item[0][1] or 0)):
+        lines.append(
+            f"{name:<48}{status or '-':>8}{len(group):>10}"
+            f"{max(request.redis_round_trips for request in group):>11}"
+            f"{max(request.redis_commands for request in group):>10}"
+            f"{max(request.redis_pipelines for request in group):>11}"
+            f"{max(request.keycloak_calls for request in group):>10}"
+        )
+    return lines
@@ -16,14 +16,36 @@ from config import load_config, Config
 from src.app.main import create_app
 
 from src.keycloak.container import get_keycloak_container_manager
-from src.keycloak.admin import KeycloakAdminClient, ALL_ROLES
+from src.keycloak.admin import KeycloakAdminClient, ALL_ROLES, ADMIN_ROLE
 from src.redis.container import get_redis_container_manager
 from src.redis.admin import RedisAdminClient
+from tests.fault_proxy import FaultProxy
 
 from tests.data_generators import DataGenerator
+from tests.round_trips import RoundTripCounter, RequestRoundTrips, format_round_trips_report
 from tests.shared_test_state import SharedTestStateManager
 
 
+# Requests of all tests, collected for the round trips report
+_round_trips_report_requests: list[RequestRoundTrips] = []
+
+
+############ Pytest hooks ############
+def pytest_addoption(parser):
+    parser.addoption(
+        "--round-trips-report", action="store_true",
+        help="Print the numbers of Redis & Keycloak calls of each route, sent via instrumented test clients "
+             "(run in a single process, e.g. with `-n 0`, to get a report of all tests)."
+    )
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    if config.getoption("--round-trips-report") and _round_trips_report_requests:
+        terminalreporter.section("Redis & Keycloak calls per request (max)")
+        for line in format_round_trips_report(_round_trips_report_requests):
+            terminalreporter.write_line(line)
+
+
 # File locks for container fixtures
 _lock_dir = Path(__file__).parent
 _redis_container_lock_path = _lock_dir / "redis_container.lock"
@@ -97,11 +119,13 @@ def test_config(config: Config) -> Config:
 
 @pytest.fixture(scope="module")
 def config_with_unavailable_keycloak_and_redis(test_config: Config) -> Config:
-    """ Test config with its Keycloak and Redis container ports changed to incorrect values. """
+    """ Test config with its Keycloak and Redis container ports (and Redis socket path) changed to incorrect values. """
     updated_config = Config.model_validate(test_config.model_dump())
     updated_config.keycloak.container_main_port += 1000
     updated_config.keycloak.container_healthcheck_port += 1000
     updated_config.redis.container_port += 1000
+    if updated_config.redis.unix_socket_path:
+        updated_config.redis.unix_socket_path += ".missing"
     return updated_config
 
 
@@ -116,9 +140,11 @@ def config_with_unavailable_keycloak(test_config: Config) -> Config:
 
 @pytest.fixture(scope="module")
 def config_with_unavailable_redis(test_config: Config) -> Config:
-    """ Test config with its Redis container ports changed to incorrect values. """
+    """ Test config with its Redis container ports (and socket path) changed to incorrect values. """
     updated_config = Config.model_validate(test_config.model_dump())
     updated_config.redis.container_port += 1000
+    if updated_config.redis.unix_socket_path:
+        updated_config.redis.unix_socket_path += ".missing"
     return updated_config
 
 
@@ -140,7 +166,7 @@ def test_keycloak_realm(
 
     keycloak_admin_client.create_app_realm()
     keycloak_admin_client.create_app_client()
-    for role in ALL_ROLES:
+    for role in ALL_ROLES + [ADMIN_ROLE]:
         keycloak_admin_client.add_client_role(role)
 
     client_representtation = keycloak_admin_client.get_app_client()
@@ -189,6 +215,19 @@ def restore_keycloak_configuration(
     keycloak_admin_client.update_app_client(test_keycloak_realm[0])
 
 
+@pytest.fixture
+def round_trips(request):
+    """
+    Counts Redis & Keycloak calls of each request, sent via `cli`, `cli_no_redis`, `cli_with_batched_reads`
+    or `cli_with_proxies` fixtures (e.g. `round_trips.assert_budget(redis_round_trips=2, keycloak_calls=0)` after a request).
+    """
+    counter = RoundTripCounter()
+    yield counter
+
+    if request.config.getoption("--round-trips-report"):
+        _round_trips_report_requests.extend(counter.requests)
+
+
 @pytest.fixture
 def reset_redis_database(redis_admin_client: RedisAdminClient):
     """ Clears current Redis database after a test. """
@@ -248,14 +287,20 @@ def app_no_redis(anyio_backend, config_with_unavailable_redis):
 @pytest.fixture
 async def cli_no_redis(
         app_no_redis,
-        restore_keycloak_configuration
+        restore_keycloak_configuration,
+        round_trips: RoundTripCounter,
+        monkeypatch
     ):
-    """ Yields a test client for the application without cache enabled. """
+    """
+    Yields a test client for the application without cache enabled.
+    Redis & Keycloak calls of each request are counted by `round_trips` fixture.
+    """
     # Enable app's lifespan events in test environment
     # https://fastapi.tiangolo.com/advanced/async-tests
     async with LifespanManager(app_no_redis) as manager:
+        round_trips.instrument_app(app_no_redis, monkeypatch)
         async with AsyncClient(
-            transport=ASGITransport(app=manager.app), base_url="http://test"
+            transport=ASGITransport(app=round_trips.wrap_app(manager.app)), base_url="http://test"
         ) as async_client:
             yield async_client
 
@@ -270,13 +315,97 @@ def app(anyio_backend, test_config):
 async def cli(
         app,
         restore_keycloak_configuration,
-        reset_redis_database
+        reset_redis_database,
+        round_trips: RoundTripCounter,
+        monkeypatch
     ):
-    """ Yields a test client for the application without cache enabled. """
+    """
+    Yields a test client for the application without cache enabled.
+    Redis & Keycloak calls of each request are counted by `round_trips` fixture.
+    """
     # Enable app's lifespan events in test environment
     # https://fastapi.tiangolo.com/advanced/async-tests
     async with LifespanManager(app) as manager:
+        round_trips.instrument_app(app, monkeypatch)
         async with AsyncClient(
-            transport=ASGITransport(app=manager.app), base_url="http://test"
+            transport=ASGITransport(app=round_trips.wrap_app(manager.app)), base_url="http://test"
+        ) as async_client:
+            yield async_client
+
+
+############ Test-scoped fixtures (with Keycloak & Redis, batched reads) ############
+@pytest.fixture
+def app_with_batched_reads(anyio_backend, test_config):
+    updated_config = Config.model_validate(test_config.model_dump())
+    updated_config.redis.batch_reads = True
+    return create_app(updated_config)
+
+
+@pytest.fixture
+async def cli_with_batched_reads(
+        app_with_batched_reads,
+        restore_keycloak_configuration,
+        reset_redis_database,
+        round_trips: RoundTripCounter,
+        monkeypatch
+    ):
+    """
+    Yields a test client for the application, which batches concurrent Redis reads.
+    Redis & Keycloak calls of each request are counted by `round_trips` fixture.
+    """
+    async with LifespanManager(app_with_batched_reads) as manager:
+        round_trips.instrument_app(app_with_batched_reads, monkeypatch)
+        async with AsyncClient(
+            transport=ASGITransport(app=round_trips.wrap_app(manager.app)), base_url="http://test"
+        ) as async_client:
+            yield async_client
+
+
+############ Test-scoped fixtures (with fault injection proxies) ############
+@pytest.fixture
+async def redis_proxy(anyio_backend, test_config, redis_container):
+    """ Yields a fault injection proxy to the Redis container (faults are set via `redis_proxy.faults`). """
+    async with FaultProxy("localhost", test_config.redis.container_port) as proxy:
+        yield proxy
+
+
+@pytest.fixture
+async def keycloak_proxy(anyio_backend, test_config, keycloak_container):
+    """ Yields a fault injection proxy to the Keycloak container (faults are set via `keycloak_proxy.faults`). """
+    async with FaultProxy("localhost", test_config.keycloak.container_main_port) as proxy:
+        yield proxy
+
+
+@pytest.fixture
+def config_with_proxies(test_config: Config, redis_proxy: FaultProxy, keycloak_proxy: FaultProxy) -> Config:
+    """ Test config, which routes app connections to Redis & Keycloak via fault injection proxies. """
+    updated_config = Config.model_validate(test_config.model_dump())
+    updated_config.redis.container_port = redis_proxy.port
+    updated_config.redis.unix_socket_path = None
+    updated_config.keycloak.container_main_port = keycloak_proxy.port
+    return updated_config
+
+
+@pytest.fixture
+def app_with_proxies(anyio_backend, config_with_proxies):
+    return create_app(config_with_proxies)
+
+
+@pytest.fixture
+async def cli_with_proxies(
+        app_with_proxies,
+        restore_keycloak_configuration,
+        reset_redis_database,
+        round_trips: RoundTripCounter,
+        monkeypatch
+    ):
+    """
+    Yields a test client for the application, which connects to Redis & Keycloak via fault injection proxies.
+    Redis & Keycloak calls of each request are counted by `round_trips` fixture.
+    """
+    async with LifespanManager(app_with_proxies) as manager:
+        round_trips.instrument_app(app_with_proxies, monkeypatch)
+        async with AsyncClient(
+            transport=ASGITransport(app=round_trips.wrap_app(manager.app)), base_url="http://test"
         ) as async_client:
             yield async_client
@@ -0,0 +1,90 @@
+"""
+/admin/memory/* route tests.
+"""
+if __name__ == "__main__":
+    import os, sys
+    sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../" * 4)))
+    from tests.util import run_pytest_tests
+
+from httpx import AsyncClient
+
+from src.keycloak.admin import KeycloakAdminClient, ADMIN_ROLE
+from tests.data_generators import DataGenerator
+
+
+async def test_missing_authorization_header(
+    cli_no_kc_and_redis: AsyncClient
+):
+    resp = await cli_no_kc_and_redis.post("/admin/memory/start")
+    assert resp.status_code == 401
+
+
+async def test_token_without_required_role(
+    cli_no_redis: AsyncClient,
+    data_generator: DataGenerator,
+    keycloak_admin_client: KeycloakAdminClient
+):
+    keycloak_admin_client.add_user("username", "password", ["can-post"])
+    headers = await data_generator.auth.login(cli_no_redis)
+
+    resp = await cli_no_redis.post("/admin/memory/start", headers=headers)
+    assert resp.status_code == 403
+
+
+async def test_snapshots(
+    cli_no_redis: AsyncClient,
+    data_generator: DataGenerator,
+    keycloak_admin_client: KeycloakAdminClient
+):
+    keycloak_admin_client.add_user("username", "password", [ADMIN_ROLE])
+    headers = await data_generator.auth.login(cli_no_redis)
+
+    # Snapshots can't be taken, before tracing is started
+    resp = await cli_no_redis.post("/admin/memory/snapshots", headers=headers)
+    assert resp.status_code == 400
+
+    resp = await cli_no_redis.post("/admin/memory/start", headers=headers, params={"frames": 3})
+    assert resp.status_code == 200
+    try:
+        resp = await cli_no_redis.post("/admin/memory/start", headers=headers)
+        assert resp.status_code == 400
+
+        # Take snapshots
+        old_snapshot_id = (await cli_no_redis.post("/admin/memory/snapshots", headers=headers)).json()["snapshot_id"]
+        new_snapshot_id = (await cli_no_redis.post("/admin/memory/snapshots", headers=headers)).json()["snapshot_id"]
+
+        resp = await cli_no_redis.get("/admin/memory/snapshots", headers=headers)
+        assert resp.json() == {"tracing": True, "snapshot_ids": [old_snapshot_id, new_snapshot_id]}
+
+        # Get snapshot statistics
+        resp = await cli_no_redis.get(f"/admin/memory/snapshots/{new_snapshot_id}", headers=headers, params={"limit": 5})
+        assert resp.status_code == 200
+        assert resp.json()["total_size"] > 0
+        assert 0 < len(resp.json()["top"]) <= 5
+
+        # Get snapshot diff
+        resp = await cli_no_redis.get(
+            f"/admin/memory/snapshots/{old_snapshot_id}/diff/{new_snapshot_id}", headers=headers, params={"limit": 5}
+        )
+        assert resp.status_code == 200
+        assert len(resp.json()["top"]) <= 5
+        assert all("size_diff" in site for site in resp.json()["top"])
+
+        # Missing snapshots
+        resp = await cli_no_redis.get(f"/admin/memory/snapshots/{new_snapshot_id + 1}", headers=headers)
+        assert resp.status_code == 404
+        resp = await cli_no_redis.get(
+            f"/admin/memory/snapshots/{old_snapshot_id}/diff/{new_snapshot_id + 1}", headers=headers
+        )
+        assert resp.status_code == 404
+
+    finally:
+        resp = await cli_no_redis.post("/admin/memory/stop", headers=headers)
+        assert resp.status_code == 200
+
+    resp = await cli_no_redis.get("/admin/memory/snapshots", headers=headers)
+    assert resp.json() == {"tracing": False, "snapshot_ids": []}
+
+
+if __name__ == "__main__":
+    run_pytest_tests(__file__) # type: ignore[reportPossiblyUnboundVariable]
@@ -0,0 +1,81 @@
+"""
+/admin/profile route tests.
+"""
+if __name__ == "__main__":
+    import os, sys
+    sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../" * 4)))
+    from tests.util import run_pytest_tests
+
+from httpx import AsyncClient
+
+from src.keycloak.admin import KeycloakAdminClient, ADMIN_ROLE
+from tests.data_generators import DataGenerator
+
+
+async def test_missing_authorization_header(
+    cli_no_kc_and_redis: AsyncClient
+):
+    resp = await cli_no_kc_and_redis.get("/admin/profile")
+    assert resp.status_code == 401
+
+
+async def test_token_without_required_role(
+    cli_no_redis: AsyncClient,
+    data_generator: DataGenerator,
+    keycloak_admin_client: KeycloakAdminClient
+):
+    keycloak_admin_client.add_user("username", "password", ["can-post"])
+    headers = await data_generator.auth.login(cli_no_redis)
+
+    resp = await cli_no_redis.get("/admin/profile", headers=headers, params={"seconds": 0.1})
+    assert resp.status_code == 403
+
+
+async def test_user_with_default_roles(
+    cli_no_redis: AsyncClient,
+    data_generator: DataGenerator,
+    keycloak_admin_client: KeycloakAdminClient
+):
+    # Admin role is not granted by default
+    keycloak_admin_client.add_user("username", "password")
+    headers = await data_generator.auth.login(cli_no_redis)
+
+    resp = await cli_no_redis.get("/admin/profile", headers=headers, params={"seconds": 0.1})
+    assert resp.status_code == 403
+
+
+async def test_invalid_parameters(
+    cli_no_redis: AsyncClient,
+    data_generator: DataGenerator,
+    keycloak_admin_client: KeycloakAdminClient
+):
+    keycloak_admin_client.add_user("username", "password", [ADMIN_ROLE])
+    headers = await data_generator.auth.login(cli_no_redis)
+
+    for params in ({"seconds": 0}, {"seconds": 61}, {"interval": 0}, {"interval": 2}):
+        resp = await cli_no_redis.get("/admin/profile", headers=headers, params=params)
+        assert resp.status_code == 422
+
+
+async def test_profile(
+    cli_no_redis: AsyncClient,
+    data_generator: DataGenerator,
+    keycloak_admin_client: KeycloakAdminClient
+):
+    keycloak_admin_client.add_user("username", "password", [ADMIN_ROLE])
+    headers = await data_generator.auth.login(cli_no_redis)
+
+    resp = await cli_no_redis.get("/admin/profile", headers=headers, params={"seconds": 0.2, "interval": 0.01, "idle": True})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+
+    # Each line is a collapsed stack with a sample count
+    lines = resp.text.splitlines()
+    assert len(lines) > 0
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        assert len(stack) > 0 and int(count) > 0
+
+
+if __name__ == "__main__":
+    run_pytest_tests(__file__) # type: ignore[reportPossiblyUnboundVariable]
@@ -11,6 +11,7 @@ from httpx import AsyncClient
 
 from src.keycloak.admin import KeycloakAdminClient
 from tests.data_generators import DataGenerator
+from tests.round_trips import RoundTripCounter
 
 
 async def test_keycloak_network_error(
@@ -27,7 +28,8 @@ async def test_keycloak_network_error(
 async def test_redis_network_error(
     cli_no_redis: AsyncClient,
     data_generator: DataGenerator,
-    keycloak_admin_client: KeycloakAdminClient
+    keycloak_admin_client: KeycloakAdminClient,
+    round_trips: RoundTripCounter
 ):
     # Add a user to Keycloak
     user_id = keycloak_admin_client.add_user()
@@ -36,6 +38,7 @@ async def test_redis_network_error(
     body = data_generator.auth.get_auth_login_request_body()
     resp = await cli_no_redis.post("/auth/login", json=body)
     assert resp.status_code == 200
+    round_trips.assert_budget(keycloak_calls=1)
 
     # Check if a session was created
     assert len(keycloak_admin_client.get_user_sessions(user_id)) == 1
@@ -109,7 +112,8 @@ async def test_successful_login(
     cli: AsyncClient,
     app: FastAPI,
     data_generator: DataGenerator,
-    keycloak_admin_client: KeycloakAdminClient
+    keycloak_admin_client: KeycloakAdminClient,
+    round_trips: RoundTripCounter
 ):
     # Add a user to Keycloak
     user_id = keycloak_admin_client.add_user("username", "password", [])
@@ -118,6 +122,7 @@ async def test_successful_login(
     body = data_generator.auth.get_auth_login_request_body()
     resp = await cli.post("/auth/login", json=body)
     assert resp.status_code == 200
+    round_trips.assert_budget(redis_round_trips=1, keycloak_calls=1)
     data = resp.json()
     access_token = data["access_token"]
 
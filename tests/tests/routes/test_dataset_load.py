@@ -0,0 +1,72 @@
+"""
+Synthetic dataset bulk loading tests.
+"""
+if __name__ == "__main__":
+    import os, sys
+    sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../" * 4)))
+    from tests.util import run_pytest_tests
+
+from httpx import AsyncClient
+
+from config import Config
+from src.dataset.format import DatasetReader, get_post, get_user, get_username
+from src.dataset.generator import GraphParameters, generate_dataset
+from src.dataset.loader import DatasetLoader
+from src.redis.admin import RedisAdminClient
+from src.redis.util import RedisKeys
+
+
+def get_database_snapshot(redis_admin_client: RedisAdminClient) -> dict:
+    """ Returns a mapping between all keys of the database & their values. """
+    client = redis_admin_client.client
+    snapshot = {}
+    for key in client.scan_iter(count=1000):
+        key_type = client.type(key)
+        if key_type == "string":
+            snapshot[key] = client.get(key)
+        elif key_type == "hash":
+            snapshot[key] = client.hgetall(key)
+        elif key_type == "zset":
+            snapshot[key] = client.zrange(key, 0, -1, withscores=True)
+        else:
+            raise AssertionError(f"Unexpected type of key {key}: {key_type}")
+    return snapshot
+
+
+async def test_dataset_load(
+    tmp_path,
+    test_config: Config,
+    redis_admin_client: RedisAdminClient,
+    cli: AsyncClient
+):
+    generate_dataset(tmp_path, GraphParameters(users=200, avg_followers=5, posts_per_day=1, days=5, seed=1))
+    reader = DatasetReader(tmp_path)
+
+    # Load a dataset (with small batches to split large sorted sets into multiple commands)
+    stats = DatasetLoader(test_config.redis, tmp_path, workers=3, batch_size=4).load()
+    assert stats.total_keys is not None and 0 < stats.total_keys <= stats.keys
+    loaded = get_database_snapshot(redis_admin_client)
+
+    # Add the same data one by one, following follows before posts
+    redis_admin_client.flush_db()
+    for user in range(reader.metadata.users):
+        redis_admin_client.set_user(get_user(user))
+    for user, followers in reader.iter_followers():
+        for follower in followers:
+            redis_admin_client.add_user_follower(get_username(user), get_username(follower))
+    for post in reader.iter_posts():
+        redis_admin_client.add_post(get_post(post))
+    redis_admin_client.client.set(RedisKeys.next_post_id, reader.metadata.posts)
+
+    # Key layout is the same
+    assert loaded == get_database_snapshot(redis_admin_client)
+
+    # Loaded data is served by the app (the latest posts first)
+    last_post = list(reader.iter_posts())[-1]
+    resp = await cli.get(f"/users/{get_username(last_post.author)}/posts")
+    assert resp.status_code == 200
+    assert resp.json()["posts"][0] == get_post(last_post).model_dump()
+
+
+if __name__ == "__main__":
+    run_pytest_tests(__file__) # type: ignore[reportPossiblyUnboundVariable]
@@ -0,0 +1,125 @@
+"""
+Route tests with network faults between the app and Redis or Keycloak.
+"""
+if __name__ == "__main__":
+    import os, sys
+    sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../" * 4)))
+    from tests.util import run_pytest_tests
+
+from httpx import AsyncClient
+
+from config import Config
+from src.keycloak.admin import KeycloakAdminClient
+from src.redis.admin import RedisAdminClient
+from tests.fault_proxy import FaultProxy, Faults
+from tests.data_generators import DataGenerator
+from tests.round_trips import RoundTripCounter
+
+
+async def test_redis_latency_below_socket_timeout(
+    data_generator: DataGenerator,
+    redis_admin_client: RedisAdminClient,
+    redis_proxy: FaultProxy,
+    config_with_proxies: Config,
+    cli_with_proxies: AsyncClient,
+    round_trips: RoundTripCounter
+):
+    redis_admin_client.set_user(data_generator.users.redis_user_data())
+
+    # Jitter is capped, so that the total round trip is below socket timeout
+    redis_proxy.faults = Faults(
+        latency=config_with_proxies.redis.socket_timeout / 10,
+        jitter=config_with_proxies.redis.socket_timeout / 10,
+        distribution="uniform"
+    )
+    for _ in range(5):
+        resp = await cli_with_proxies.get("/users/username")
+        assert resp.status_code == 200
+        round_trips.assert_budget(redis_round_trips=1, keycloak_calls=0)
+
+
+async def test_redis_latency_above_socket_timeout(
+    data_generator: DataGenerator,
+    redis_admin_client: RedisAdminClient,
+    redis_proxy: FaultProxy,
+    config_with_proxies: Config,
+    cli_with_proxies: AsyncClient
+):
+    redis_admin_client.set_user(data_generator.users.redis_user_data())
+
+    # Responses are delayed longer than socket timeout
+    redis_proxy.faults = Faults(latency=config_with_proxies.redis.socket_timeout)
+    resp = await cli_with_proxies.get("/users/username")
+    assert resp.status_code == 503
+
+    # App recovers, when latency is back to normal
+    redis_proxy.faults = Faults()
+    resp = await cli_with_proxies.get("/users/username")
+    assert resp.status_code == 200
+
+
+async def test_redis_stall(
+    data_generator: DataGenerator,
+    redis_admin_client: RedisAdminClient,
+    redis_proxy: FaultProxy,
+    config_with_proxies: Config,
+    cli_with_proxies: AsyncClient
+):
+    redis_admin_client.set_user(data_generator.users.redis_user_data())
+
+    redis_proxy.faults = Faults(stall_probability=1, stall_duration=config_with_proxies.redis.socket_timeout * 2)
+    resp = await cli_with_proxies.get("/users/username")
+    assert resp.status_code == 503
+    assert redis_proxy.stats.stalls > 0
+
+    redis_proxy.faults = Faults()
+    resp = await cli_with_proxies.get("/users/username")
+    assert resp.status_code == 200
+
+
+async def test_redis_connection_reset(
+    data_generator: DataGenerator,
+    redis_admin_client: RedisAdminClient,
+    redis_proxy: FaultProxy,
+    cli_with_proxies: AsyncClient
+):
+    redis_admin_client.set_user(data_generator.users.redis_user_data())
+
+    # Open a pooled connection
+    resp = await cli_with_proxies.get("/users/username")
+    assert resp.status_code == 200
+
+    # Reset open connections & all new ones (test config disables retries)
+    redis_proxy.faults = Faults(reset_probability=1)
+    redis_proxy.reset_connections()
+    resp = await cli_with_proxies.get("/users/username")
+    assert resp.status_code == 503
+
+    # Broken connections are replaced by the pool
+    redis_proxy.faults = Faults()
+    resp = await cli_with_proxies.get("/users/username")
+    assert resp.status_code == 200
+
+
+async def test_keycloak_connection_reset(
+    data_generator: DataGenerator,
+    keycloak_admin_client: KeycloakAdminClient,
+    keycloak_proxy: FaultProxy,
+    cli_with_proxies: AsyncClient,
+    round_trips: RoundTripCounter
+):
+    keycloak_admin_client.add_user()
+    body = data_generator.auth.get_auth_login_request_body()
+
+    keycloak_proxy.faults = Faults(reset_probability=1)
+    resp = await cli_with_proxies.post("/auth/login", json=body)
+    assert resp.status_code == 503
+
+    keycloak_proxy.faults = Faults(latency=0.01)
+    resp = await cli_with_proxies.post("/auth/login", json=body)
+    assert resp.status_code == 200
+    round_trips.assert_budget(redis_round_trips=1, keycloak_calls=1)
+
+
+if __name__ == "__main__":
+    run_pytest_tests(__file__) # type: ignore[reportPossiblyUnboundVariable]
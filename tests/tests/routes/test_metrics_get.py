@@ -0,0 +1,41 @@
+"""
+GET /metrics route tests.
+"""
+if __name__ == "__main__":
+    import os, sys
+    sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../" * 4)))
+    from tests.util import run_pytest_tests
+
+from httpx import AsyncClient
+
+from src.app.middleware import HTTP_REQUESTS_IN_FLIGHT
+
+
+async def test_request_and_redis_metrics(
+    cli_no_redis: AsyncClient
+):
+    # Make a request, which fails with a Redis connection error
+    resp = await cli_no_redis.get("/posts/1")
+    assert resp.status_code == 503
+
+    # In-flight gauge is process-global & may be changed by other tests
+    in_flight = HTTP_REQUESTS_IN_FLIGHT.labels().value
+
+    resp = await cli_no_redis.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+
+    # Request latency is recorded by route template & status
+    assert 'http_request_duration_seconds_count{route="/posts/{post_id}",method="GET",status="503"}' in resp.text
+    assert f"http_requests_in_flight {int(in_flight) + 1}" in resp.text.splitlines()    # current request
+    assert HTTP_REQUESTS_IN_FLIGHT.labels().value == in_flight
+
+    # Redis command latency is recorded by key family
+    assert 'redis_command_duration_seconds_count{command="GET",family="post"}' in resp.text
+
+    # Pool metrics are exported
+    assert 'redis_pool_connections{pool="' in resp.text
+
+
+if __name__ == "__main__":
+    run_pytest_tests(__file__) # type: ignore[reportPossiblyUnboundVariable]
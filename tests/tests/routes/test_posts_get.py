@@ -9,8 +9,10 @@ if __name__ == "__main__":
 from datetime import datetime
 from httpx import AsyncClient
 
+from src.app.etags import get_post_etag
 from src.redis.admin import RedisAdminClient
 from tests.data_generators import DataGenerator
+from tests.round_trips import RoundTripCounter
 
 
 async def test_redis_network_error(
@@ -39,7 +41,8 @@ async def test_non_existing_post(
 async def test_existing_post(
     data_generator: DataGenerator,
     redis_admin_client: RedisAdminClient,
-    cli: AsyncClient
+    cli: AsyncClient,
+    round_trips: RoundTripCounter
 ):
     # Add a post to Redis
     post = data_generator.posts.post()
@@ -48,6 +51,7 @@ async def test_existing_post(
     # Get an existing post
     resp = await cli.get(f"/posts/{post.post_id}")
     assert resp.status_code == 200
+    round_trips.assert_budget(redis_round_trips=1, keycloak_calls=0)
 
     # Check post data
     response_post = resp.json()["post"]
@@ -57,5 +61,37 @@ async def test_existing_post(
     assert datetime.fromisoformat(response_post["created_at"]) == post.created_at
 
 
+async def test_conditional_get(
+    data_generator: DataGenerator,
+    redis_admin_client: RedisAdminClient,
+    cli: AsyncClient
+):
+    # Add a post to Redis
+    post = data_generator.posts.post()
+    redis_admin_client.add_post(post)
+
+    # Get an existing post & check cache headers
+    resp = await cli.get(f"/posts/{post.post_id}")
+    assert resp.status_code == 200
+    etag = resp.headers["etag"]
+    assert etag.startswith("W/")
+    assert "immutable" in resp.headers["cache-control"]
+
+    # Get a post with a matching ETag
+    resp = await cli.get(f"/posts/{post.post_id}", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.headers["etag"] == etag
+    assert resp.content == b""
+
+    # Get a post with a non-matching ETag
+    resp = await cli.get(f"/posts/{post.post_id}", headers={"If-None-Match": '"another-etag"'})
+    assert resp.status_code == 200
+    assert resp.json()["post"]["post_id"] == post.post_id
+
+    # Get a non-existing post with a matching ETag
+    resp = await cli.get(f"/posts/{post.post_id + 1}", headers={"If-None-Match": get_post_etag(post.post_id + 1)})
+    assert resp.status_code == 404
+
+
 if __name__ == "__main__":
     run_pytest_tests(__file__) # type: ignore[reportPossiblyUnboundVariable]
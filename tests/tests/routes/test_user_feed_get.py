@@ -11,6 +11,7 @@ from httpx import AsyncClient
 
 from src.redis.admin import RedisAdminClient
 from tests.data_generators import DataGenerator
+from tests.round_trips import RoundTripCounter
 
 
 async def test_redis_network_error(
@@ -65,7 +66,8 @@ async def test_user_feed_without_posts(
 async def test_user_feed_with_posts(
     data_generator: DataGenerator,
     redis_admin_client: RedisAdminClient,
-    cli: AsyncClient
+    cli: AsyncClient,
+    round_trips: RoundTripCounter
 ):
     # Add users
     username, followed = "username", "followed"
@@ -84,6 +86,10 @@ async def test_user_feed_with_posts(
     resp = await cli.get(f"/users/{username}/feed")
     assert resp.status_code == 200
 
+    # User & feed version are read concurrently, then post IDs & posts
+    # (post IDs are read after ETag is checked, so the route can't fit in 2 round trips)
+    round_trips.assert_budget(redis_round_trips=4, keycloak_calls=0)
+
     response_posts = resp.json()["posts"]
     assert [post["post_id"] for post in response_posts] == [10, 9, 8, 7, 6]
 
@@ -105,5 +111,109 @@ async def test_user_feed_with_posts(
     assert resp.status_code == 404
 
 
+async def test_user_feed_with_batched_reads(
+    data_generator: DataGenerator,
+    redis_admin_client: RedisAdminClient,
+    cli_with_batched_reads: AsyncClient,
+    round_trips: RoundTripCounter
+):
+    # Add users, follow user & add a post
+    username, followed = "username", "followed"
+    for username_ in (username, followed):
+        redis_admin_client.set_user(data_generator.users.redis_user_data(username=username_))
+    redis_admin_client.add_user_follower(followed, username)
+    redis_admin_client.add_post(data_generator.posts.post(post_id=1, author=followed))
+
+    # User & feed version are read in a single batch, then post IDs & posts
+    resp = await cli_with_batched_reads.get(f"/users/{username}/feed")
+    assert resp.status_code == 200
+    assert [post["post_id"] for post in resp.json()["posts"]] == [1]
+    round_trips.assert_budget(redis_round_trips=3, keycloak_calls=0)
+
+
+async def test_user_feed_conditional_get(
+    data_generator: DataGenerator,
+    redis_admin_client: RedisAdminClient,
+    cli: AsyncClient
+):
+    # Add users
+    username, followed = "username", "followed"
+    for username_ in (username, followed):
+        redis_admin_client.set_user(data_generator.users.redis_user_data(username=username_))
+    
+    # Follow user & add a post
+    redis_admin_client.add_user_follower(followed, username)
+    redis_admin_client.add_post(data_generator.posts.post(post_id=1, author=followed))
+
+    # Get feed & check cache headers
+    resp = await cli.get(f"/users/{username}/feed")
+    assert resp.status_code == 200
+    etag = resp.headers["etag"]
+    assert etag.startswith("W/")
+    assert "no-cache" in resp.headers["cache-control"]
+
+    # Get feed with a matching ETag
+    resp = await cli.get(f"/users/{username}/feed", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.headers["etag"] == etag
+
+    # Add a new post to the feed & check if ETag no longer matches
+    redis_admin_client.add_post(data_generator.posts.post(post_id=2, author=followed))
+    resp = await cli.get(f"/users/{username}/feed", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["etag"] != etag
+    assert [post["post_id"] for post in resp.json()["posts"]] == [2, 1]
+
+
+async def test_user_feed_compression(
+    data_generator: DataGenerator,
+    redis_admin_client: RedisAdminClient,
+    cli: AsyncClient
+):
+    # Add users
+    username, followed = "username", "followed"
+    for username_ in (username, followed):
+        redis_admin_client.set_user(data_generator.users.redis_user_data(username=username_))
+    
+    # Follow user
+    redis_admin_client.add_user_follower(followed, username)
+
+    # Add followed user's posts of max length
+    for i in range(1, 6):
+        redis_admin_client.add_post(data_generator.posts.post(post_id=i, author=followed, content="a" * 1000))
+    
+    # Get feed without accepted encodings
+    resp = await cli.get(f"/users/{username}/feed", headers={"Accept-Encoding": "identity"})
+    assert resp.status_code == 200
+    assert "content-encoding" not in resp.headers
+    uncompressed_posts = resp.json()["posts"]
+
+    # Get compressed feed
+    resp = await cli.get(f"/users/{username}/feed", headers={"Accept-Encoding": "gzip"})
+    assert resp.status_code == 200
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.json()["posts"] == uncompressed_posts
+
+
+async def test_small_response_is_not_compressed(
+    data_generator: DataGenerator,
+    redis_admin_client: RedisAdminClient,
+    cli: AsyncClient
+):
+    # Add users
+    username, followed = "username", "followed"
+    for username_ in (username, followed):
+        redis_admin_client.set_user(data_generator.users.redis_user_data(username=username_))
+    
+    # Follow user & add a short post
+    redis_admin_client.add_user_follower(followed, username)
+    redis_admin_client.add_post(data_generator.posts.post(post_id=1, author=followed, content="a"))
+
+    # Get feed
+    resp = await cli.get(f"/users/{username}/feed", headers={"Accept-Encoding": "gzip"})
+    assert resp.status_code == 200
+    assert "content-encoding" not in resp.headers
+
+
 if __name__ == "__main__":
     run_pytest_tests(__file__) # type: ignore[reportPossiblyUnboundVariable]
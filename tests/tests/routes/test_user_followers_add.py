@@ -11,6 +11,7 @@ from httpx import AsyncClient
 from src.keycloak.admin import KeycloakAdminClient
 from src.redis.admin import RedisAdminClient
 from tests.data_generators import DataGenerator
+from tests.round_trips import RoundTripCounter
 
 
 async def test_keycloak_network_error(
@@ -184,7 +185,8 @@ async def test_add_followers_follower_feed(
         data_generator: DataGenerator,
         keycloak_admin_client: KeycloakAdminClient,
         redis_admin_client: RedisAdminClient,
-        cli: AsyncClient
+        cli: AsyncClient,
+        round_trips: RoundTripCounter
 ):
     # Add users
     follower, first_followed, second_followed, not_followed = "follower", "first_followed", "second_followed", "not_followed"
@@ -213,6 +215,10 @@ async def test_add_followers_follower_feed(
         resp = await cli.put(f"/users/{followed}/followers/{follower}", headers=headers)
 
         assert resp.status_code == 200
+
+        # Follower & followed user are read concurrently, then the follower is added,
+        # followed user's post IDs are read & added to the feed in a transaction
+        round_trips.assert_budget(redis_round_trips=5, redis_pipelines=1, keycloak_calls=1)
     
     # Check if posts of followed users were added to the feed of the follower
     # and are ordered by their IDs
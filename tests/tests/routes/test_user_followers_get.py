@@ -11,6 +11,7 @@ from httpx import AsyncClient
 from src.keycloak.admin import KeycloakAdminClient
 from src.redis.admin import RedisAdminClient
 from tests.data_generators import DataGenerator
+from tests.round_trips import RoundTripCounter
 
 
 async def test_redis_network_error(
@@ -60,7 +61,8 @@ async def test_user_without_followers(
 async def test_user_with_followers(
     data_generator: DataGenerator,
     redis_admin_client: RedisAdminClient,
-    cli: AsyncClient
+    cli: AsyncClient,
+    round_trips: RoundTripCounter
 ):
     follower_name = lambda i: f"follower_{i:02d}"
     # Add users & followers to Redis
@@ -73,6 +75,7 @@ async def test_user_with_followers(
     # Fetch user followers without offset
     resp = await cli.get("/users/username/followers")
     assert resp.status_code == 200
+    round_trips.assert_budget(redis_round_trips=2, keycloak_calls=0)
     assert resp.json()["followers"] == [follower_name(i) for i in range(5)]
     
     # Fetch user followers with offset
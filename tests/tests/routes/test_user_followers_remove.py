@@ -11,6 +11,7 @@ from httpx import AsyncClient
 from src.keycloak.admin import KeycloakAdminClient
 from src.redis.admin import RedisAdminClient
 from tests.data_generators import DataGenerator
+from tests.round_trips import RoundTripCounter
 
 
 async def test_keycloak_network_error(
@@ -220,7 +221,8 @@ async def test_remove_followers_follower_feed(
         data_generator: DataGenerator,
         keycloak_admin_client: KeycloakAdminClient,
         redis_admin_client: RedisAdminClient,
-        cli: AsyncClient
+        cli: AsyncClient,
+        round_trips: RoundTripCounter
 ):
     # Add users
     follower, first_followed, second_followed, third_followed = "follower", "first_followed", "second_followed", "third_followed"
@@ -253,6 +255,7 @@ async def test_remove_followers_follower_feed(
         resp = await cli.delete(f"/users/{followed}/followers/{follower}", headers=headers)
 
         assert resp.status_code == 200
+        round_trips.assert_budget(redis_round_trips=5, redis_pipelines=1, keycloak_calls=1)
     
     # Check if posts of unfollowed users were correctly removed from the follower's feed
     assert redis_admin_client.get_user_feed(follower) == [6, 3]
@@ -10,6 +10,7 @@ from httpx import AsyncClient
 
 from src.redis.admin import RedisAdminClient
 from tests.data_generators import DataGenerator
+from tests.round_trips import RoundTripCounter
 
 
 async def test_network_error(
@@ -40,7 +41,8 @@ async def test_non_existing_username(
 async def test_existing_username(
     cli: AsyncClient,
     data_generator: DataGenerator,
-    redis_admin_client: RedisAdminClient
+    redis_admin_client: RedisAdminClient,
+    round_trips: RoundTripCounter
 ):
     # Add existing users
     existing_user = data_generator.users.redis_user_data(username="existing")
@@ -50,6 +52,7 @@ async def test_existing_username(
     # Query a non-existing user
     resp = await cli.get(f"/users/{existing_user.username}")
     assert resp.status_code == 200
+    round_trips.assert_budget(redis_round_trips=1, keycloak_calls=0)
     data = resp.json()
     assert data.get("username", None) == existing_user.username
     assert data.get("first_name", None) == existing_user.first_name
@@ -12,6 +12,7 @@ from httpx import AsyncClient
 from src.keycloak.admin import KeycloakAdminClient
 from src.redis.admin import RedisAdminClient
 from tests.data_generators import DataGenerator
+from tests.round_trips import RoundTripCounter
 
 
 async def test_keycloak_network_error(
@@ -208,7 +209,8 @@ async def test_add_posts_followers_feeds(
     data_generator: DataGenerator,
     keycloak_admin_client: KeycloakAdminClient,
     redis_admin_client: RedisAdminClient,
-    cli: AsyncClient
+    cli: AsyncClient,
+    round_trips: RoundTripCounter
 ):
     # Add users
     first_followed, second_followed = "first_followed", "second_followed"
@@ -239,6 +241,9 @@ async def test_add_posts_followers_feeds(
             resp = await cli.post(f"/users/{username}/posts", json=body, headers=headers)
             
             assert resp.status_code == 201
+
+            # Post ID, post, author's post list (pipeline), followers & their feeds (pipeline)
+            round_trips.assert_budget(redis_round_trips=5, redis_pipelines=2, keycloak_calls=1)
     
     # Check if posts were added to the followers' feeds correctly
     assert redis_admin_client.get_user_feed(first_follower) == [4, 3, 2, 1]
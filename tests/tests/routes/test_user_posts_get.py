@@ -11,6 +11,7 @@ from httpx import AsyncClient
 
 from src.redis.admin import RedisAdminClient
 from tests.data_generators import DataGenerator
+from tests.round_trips import RoundTripCounter
 
 
 async def test_redis_network_error(
@@ -65,7 +66,8 @@ async def test_user_without_posts(
 async def test_user_with_posts(
     data_generator: DataGenerator,
     redis_admin_client: RedisAdminClient,
-    cli: AsyncClient
+    cli: AsyncClient,
+    round_trips: RoundTripCounter
 ):
     # Add a user
     redis_admin_client.set_user(data_generator.users.redis_user_data())
@@ -79,6 +81,10 @@ async def test_user_with_posts(
     resp = await cli.get("/users/username/posts")
     assert resp.status_code == 200
 
+    # User & posts version are read concurrently, then post IDs & posts
+    # (post IDs are read after ETag is checked, so the route can't fit in 2 round trips)
+    round_trips.assert_budget(redis_round_trips=4, keycloak_calls=0)
+
     response_posts = resp.json()["posts"]
     assert [post["post_id"] for post in response_posts] == [10, 9, 8, 7, 6]
 
@@ -100,5 +106,48 @@ async def test_user_with_posts(
     assert resp.status_code == 404
 
 
+async def test_user_with_posts_and_batched_reads(
+    data_generator: DataGenerator,
+    redis_admin_client: RedisAdminClient,
+    cli_with_batched_reads: AsyncClient,
+    round_trips: RoundTripCounter
+):
+    # Add a user & a post
+    redis_admin_client.set_user(data_generator.users.redis_user_data())
+    redis_admin_client.add_post(data_generator.posts.post(post_id=1))
+
+    # User & posts version are read in a single batch, then post IDs & posts
+    resp = await cli_with_batched_reads.get("/users/username/posts")
+    assert resp.status_code == 200
+    assert [post["post_id"] for post in resp.json()["posts"]] == [1]
+    round_trips.assert_budget(redis_round_trips=3, keycloak_calls=0)
+
+
+async def test_user_posts_conditional_get(
+    data_generator: DataGenerator,
+    redis_admin_client: RedisAdminClient,
+    cli: AsyncClient
+):
+    # Add a user & a post
+    redis_admin_client.set_user(data_generator.users.redis_user_data())
+    redis_admin_client.add_post(data_generator.posts.post(post_id=1))
+
+    # Get posts & check cache headers
+    resp = await cli.get("/users/username/posts")
+    assert resp.status_code == 200
+    etag = resp.headers["etag"]
+    assert etag.startswith("W/")
+
+    # Get posts with a matching ETag
+    resp = await cli.get("/users/username/posts", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+
+    # Add a new post & check if ETag no longer matches
+    redis_admin_client.add_post(data_generator.posts.post(post_id=2))
+    resp = await cli.get("/users/username/posts", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["etag"] != etag
+
+
 if __name__ == "__main__":
     run_pytest_tests(__file__) # type: ignore[reportPossiblyUnboundVariable]
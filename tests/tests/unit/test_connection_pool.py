@@ -0,0 +1,111 @@
+"""
+Instrumented connection pool tests.
+"""
+if __name__ == "__main__":
+    import os, sys
+    sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../" * 4)))
+    from tests.util import run_pytest_tests
+
+import asyncio
+import pytest
+from redis.exceptions import ConnectionError
+
+from src.redis.pool import InstrumentedConnectionPool, InstrumentedBlockingConnectionPool
+
+
+class StubConnection:
+    """ Connection replacement, which does not open sockets. """
+    def __init__(self, fail: bool = False, **kwargs):
+        self.fail = fail
+        self.connects = 0
+
+    async def connect(self):
+        if self.connects > 0:
+            return
+        await asyncio.sleep(0)
+        if self.fail:
+            raise ConnectionError("Failed to connect")
+        self.connects += 1
+
+    async def can_read_destructive(self):
+        return False
+
+    async def disconnect(self):
+        pass
+
+    async def re_auth(self):
+        pass
+
+
+async def test_pool_stats(anyio_backend):
+    pool = InstrumentedConnectionPool(connection_class=StubConnection, max_connections=2)   # type: ignore
+
+    connections = [await pool.get_connection(), await pool.get_connection()]
+    assert (pool.in_use_connections, pool.idle_connections) == (2, 0)
+    assert pool.stats.created == 2
+    assert pool.stats.wait_time.count == 2
+    assert pool.stats.get_creation_rate() > 0
+
+    # Non-blocking pool fails immediately, when exhausted
+    with pytest.raises(ConnectionError):
+        await pool.get_connection()
+
+    for connection in connections:
+        await pool.release(connection)
+    assert (pool.in_use_connections, pool.idle_connections) == (0, 2)
+
+    # Idle connections are reused
+    await pool.get_connection()
+    assert pool.stats.created == 2
+
+
+async def test_blocking_pool_waits_for_connection(anyio_backend):
+    pool = InstrumentedBlockingConnectionPool(
+        connection_class=StubConnection, max_connections=1, timeout=1   # type: ignore
+    )
+    connection = await pool.get_connection()
+
+    async def release_later():
+        await asyncio.sleep(0.05)
+        await pool.release(connection)
+
+    asyncio.ensure_future(release_later())
+    assert await pool.get_connection() is connection
+
+    # Wait time is recorded in the histogram
+    assert pool.stats.wait_time.count == 2
+    assert pool.stats.wait_time.sum >= 0.05
+
+
+async def test_blocking_pool_timeout(anyio_backend):
+    pool = InstrumentedBlockingConnectionPool(
+        connection_class=StubConnection, max_connections=1, timeout=0.01    # type: ignore
+    )
+    await pool.get_connection()
+
+    with pytest.raises(ConnectionError):
+        await pool.get_connection()
+
+
+async def test_warm_up(anyio_backend):
+    pool = InstrumentedConnectionPool(connection_class=StubConnection, max_connections=3)   # type: ignore
+    await pool.warm_up(5)
+
+    # Number of connections is limited by pool size
+    assert pool.idle_connections == 3
+    assert all(connection.connects == 1 for connection in pool._available_connections)
+
+    # Pre-warmed connections are used without connecting
+    connection = await pool.get_connection()
+    assert connection.connects == 1     # type: ignore[attr-defined]
+    assert pool.stats.created == 3
+
+
+async def test_warm_up_connection_errors(anyio_backend):
+    pool = InstrumentedConnectionPool(connection_class=StubConnection, max_connections=3, fail=True)  # type: ignore
+    await pool.warm_up(2)
+    assert pool.idle_connections == 0
+
+
+if __name__ == "__main__":
+    run_pytest_tests(__file__) # type: ignore[reportPossiblyUnboundVariable]
@@ -0,0 +1,81 @@
+"""
+Synthetic dataset format & generator tests.
+"""
+if __name__ == "__main__":
+    import os, sys
+    sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../" * 4)))
+    from tests.util import run_pytest_tests
+
+from io import BytesIO
+
+import pytest
+
+from src.dataset.format import DatasetReader, VarintReader, encode_varint, get_post, get_user
+from src.dataset.generator import GraphParameters, generate_dataset
+
+
+def test_varints():
+    values = [0, 1, 127, 128, 300, 2 ** 32, 2 ** 63]
+    buffer = bytearray()
+    for value in values:
+        encode_varint(value, buffer)
+
+    reader = VarintReader(BytesIO(bytes(buffer)))
+    assert [reader.read() for _ in values] == values
+    assert reader.read() is None
+
+    # Truncated varint
+    with pytest.raises(ValueError):
+        VarintReader(BytesIO(b"\x80")).read()
+
+
+def test_generated_dataset(tmp_path):
+    parameters = GraphParameters(users=2000, avg_followers=20, posts_per_day=2, days=3, seed=1)
+    metadata = generate_dataset(tmp_path / "a", parameters)
+    reader = DatasetReader(tmp_path / "a")
+    assert reader.metadata == metadata
+
+    # Followers are unique, ascending & don't include the user
+    follower_counts = []
+    users = set()
+    for user, followers in reader.iter_followers():
+        assert user not in users
+        users.add(user)
+        assert followers == sorted(set(followers))
+        assert user not in followers
+        assert 0 <= followers[0] and followers[-1] < parameters.users
+        follower_counts.append(len(followers))
+    assert sum(follower_counts) == metadata.follows
+    assert max(follower_counts) == metadata.max_followers
+
+    # Follower counts have a heavy tail
+    assert metadata.follows / parameters.users == pytest.approx(parameters.avg_followers, rel=0.5)
+    assert metadata.max_followers > 10 * parameters.avg_followers
+
+    # Posts are ordered by IDs & creation time
+    posts = list(reader.iter_posts())
+    assert len(posts) == metadata.posts
+    assert len(posts) == pytest.approx(parameters.users * parameters.posts_per_day * parameters.days, rel=0.2)
+    assert [post.post_id for post in posts] == list(range(1, len(posts) + 1))
+    assert all(a.created_at <= b.created_at for a, b in zip(posts, posts[1:]))
+
+    # Dataset is converted to app models
+    user = get_user(posts[0].author)
+    assert user == get_user(posts[0].author)
+    post = get_post(posts[0])
+    assert post.author == user.username
+    assert len(post.content) == posts[0].content_length
+
+    # Generation is deterministic
+    generate_dataset(tmp_path / "b", parameters)
+    for name in ("follows.bin", "posts.bin", "metadata.json"):
+        assert (tmp_path / "a" / name).read_bytes() == (tmp_path / "b" / name).read_bytes()
+
+
+def test_invalid_parameters(tmp_path):
+    with pytest.raises(ValueError):
+        generate_dataset(tmp_path, GraphParameters(users=100, exponent=2))
+
+
+if __name__ == "__main__":
+    run_pytest_tests(__file__) # type: ignore[reportPossiblyUnboundVariable]
@@ -0,0 +1,134 @@
+"""
+Fault injection proxy tests.
+"""
+if __name__ == "__main__":
+    import os, sys
+    sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../" * 4)))
+    from tests.util import run_pytest_tests
+
+import asyncio
+from contextlib import asynccontextmanager
+import random
+from time import perf_counter
+from typing import AsyncIterator
+
+import pytest
+
+from tests.fault_proxy import FaultProxy, Faults
+
+
+async def echo(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while data := await reader.read(65536):
+            writer.write(data)
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+@asynccontextmanager
+async def get_proxy(faults: Faults) -> AsyncIterator[FaultProxy]:
+    """ Yields a proxy to an echo server. """
+    server = await asyncio.start_server(echo, "127.0.0.1", 0)
+    try:
+        async with FaultProxy("127.0.0.1", server.sockets[0].getsockname()[1], faults, seed=0) as proxy:
+            yield proxy
+    finally:
+        server.close()
+
+
+async def request(port: int, data: bytes) -> bytes:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(data)
+        await writer.drain()
+        return await reader.readexactly(len(data))
+    finally:
+        writer.close()
+
+
+def test_latency_distributions():
+    rng = random.Random(0)
+    assert Faults(latency=0.01).get_delay(rng) == 0.01
+    for distribution in ("uniform", "normal", "exponential", "pareto"):
+        delays = [Faults(latency=0.01, jitter=0.005, distribution=distribution).get_delay(rng) for _ in range(1000)]
+        assert min(delays) >= 0
+        assert len(set(delays)) > 1
+
+    # Pareto distribution has a heavier tail
+    pareto = sorted(Faults(jitter=0.005, distribution="pareto").get_delay(rng) for _ in range(1000))
+    exponential = sorted(Faults(jitter=0.005, distribution="exponential").get_delay(rng) for _ in range(1000))
+    assert pareto[-1] > exponential[-1]
+
+
+async def test_forwarding(anyio_backend):
+    async with get_proxy(Faults()) as proxy:
+        data = bytes(range(256)) * 1000
+        assert await request(proxy.port, data) == data
+        assert proxy.stats.connections == 1
+
+
+async def test_latency(anyio_backend):
+    async with get_proxy(Faults(latency=0.05)) as proxy:
+        start = perf_counter()
+        assert await request(proxy.port, b"ping") == b"ping"
+        # Delay is added in both directions
+        assert perf_counter() - start >= 0.1
+
+        # Delay is not accumulated over pipelined messages & their order is preserved
+        reader, writer = await asyncio.open_connection("127.0.0.1", proxy.port)
+        start = perf_counter()
+        for i in range(10):
+            writer.write(f"{i}".encode())
+            await writer.drain()
+        assert await reader.readexactly(10) == b"0123456789"
+        assert perf_counter() - start < 0.3
+        writer.close()
+
+
+async def test_bandwidth(anyio_backend):
+    async with get_proxy(Faults(bandwidth=100_000)) as proxy:
+        start = perf_counter()
+        data = b"a" * 20_000
+        assert await request(proxy.port, data) == data
+        # Data is limited in both directions
+        assert perf_counter() - start >= 0.3
+
+
+async def test_stall(anyio_backend):
+    async with get_proxy(Faults(stall_probability=1, stall_duration=0.1)) as proxy:
+        start = perf_counter()
+        assert await request(proxy.port, b"ping") == b"ping"
+        assert perf_counter() - start >= 0.2
+        assert proxy.stats.stalls == 2
+
+
+async def test_reset(anyio_backend):
+    async with get_proxy(Faults(reset_probability=1)) as proxy:
+        with pytest.raises((ConnectionError, asyncio.IncompleteReadError)):
+            await request(proxy.port, b"ping")
+        assert proxy.stats.resets == 1
+
+        # Faults can be changed on the fly
+        proxy.faults = Faults()
+        assert await request(proxy.port, b"ping") == b"ping"
+
+
+async def test_reset_connections(anyio_backend):
+    async with get_proxy(Faults()) as proxy:
+        reader, writer = await asyncio.open_connection("127.0.0.1", proxy.port)
+        writer.write(b"ping")
+        assert await reader.readexactly(4) == b"ping"
+
+        proxy.reset_connections()
+        with pytest.raises((ConnectionError, asyncio.IncompleteReadError)):
+            writer.write(b"ping")
+            await writer.drain()
+            await reader.readexactly(4)
+        writer.close()
+
+
+if __name__ == "__main__":
+    run_pytest_tests(__file__) # type: ignore[reportPossiblyUnboundVariable]
@@ -0,0 +1,98 @@
+"""
+Logger tests.
+"""
+if __name__ == "__main__":
+    import os, sys
+    sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../" * 4)))
+    from tests.util import run_pytest_tests
+
+import io
+import json
+import threading
+from time import sleep
+
+from src.util.logging import Logger, LogLevel
+
+
+def get_records(stream: io.StringIO) -> list[dict]:
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_structured_records():
+    stream = io.StringIO()
+    logger = Logger(level=LogLevel.INFO, stream=stream)
+    try:
+        logger.log("debug", LogLevel.DEBUG)
+        logger.log("message", route="/posts/{post_id}", status=200)
+        try:
+            raise ValueError("error")
+        except ValueError as e:
+            logger.log(e, LogLevel.ERROR, exc_info=True)
+        logger.flush()
+    finally:
+        logger.close()
+
+    records = get_records(stream)
+    assert [record["message"] for record in records] == ["message", "error"]
+    assert records[0]["level"] == "INFO" and records[0]["route"] == "/posts/{post_id}" and records[0]["status"] == 200
+    assert records[1]["level"] == "ERROR" and "ValueError: error" in records[1]["traceback"]
+
+
+def test_rate_limiting():
+    stream = io.StringIO()
+    logger = Logger(rate_limit=2, rate_limit_interval=0.1, stream=stream)
+    try:
+        for _ in range(5):
+            logger.log("Connection refused", LogLevel.WARNING, key="ConnectionError")
+        logger.log("other")
+        logger.log("timings", rate_limit=False)
+        logger.log("timings", rate_limit=False)
+        logger.log("timings", rate_limit=False)
+
+        # Suppressed records are reported after the interval ends
+        sleep(0.1)
+        logger.log("other")
+        logger.flush()
+    finally:
+        logger.close()
+
+    messages = [record["message"] for record in get_records(stream)]
+    assert messages == [
+        "Connection refused", "Connection refused", "other", "timings", "timings", "timings",
+        "Suppressed 3 repeated log records", "other"
+    ]
+    assert get_records(stream)[-2]["key"] == "ConnectionError"
+
+
+def test_full_queue():
+    class BlockingStream(io.StringIO):
+        def __init__(self):
+            super().__init__()
+            self.unblocked = threading.Event()
+
+        def write(self, s: str) -> int:
+            self.unblocked.wait()
+            return super().write(s)
+
+    stream = BlockingStream()
+    logger = Logger(max_queue_size=2, batch_size=1, rate_limit=0, stream=stream)
+    try:
+        # The first record is taken by the writer thread, which is blocked;
+        # the next 2 fill the queue & the rest are dropped
+        logger.log("0")
+        sleep(0.05)
+        for i in range(1, 6):
+            logger.log(str(i))
+        assert logger.dropped == 3
+
+        stream.unblocked.set()
+        logger.flush()
+    finally:
+        logger.close()
+
+    messages = [record["message"] for record in get_records(stream)]
+    assert messages == ["0", "1", "Dropped 3 log records (queue is full)", "2"]
+
+
+if __name__ == "__main__":
+    run_pytest_tests(__file__) # type: ignore[reportPossiblyUnboundVariable]
@@ -0,0 +1,58 @@
+"""
+Event loop monitor tests.
+"""
+if __name__ == "__main__":
+    import os, sys
+    sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../" * 4)))
+    from tests.util import run_pytest_tests
+
+import asyncio
+import io
+import json
+import time
+
+from src.util import loop_monitor as loop_monitor_module
+from src.util.logging import Logger
+from src.util.loop_monitor import LoopMonitor, EVENT_LOOP_LAG, EVENT_LOOP_LAG_HISTOGRAM, EVENT_LOOP_BLOCKED
+
+
+SLOW_CALLBACK_THRESHOLD = 0.2
+
+
+def blocking_callback():
+    # Block for much longer than the threshold, so that the test is not affected by scheduling delays
+    time.sleep(3 * SLOW_CALLBACK_THRESHOLD)
+
+
+async def test_blocked_loop(anyio_backend, monkeypatch):
+    stream = io.StringIO()
+    logger = Logger(stream=stream)
+    monkeypatch.setattr(loop_monitor_module, "log", logger.log)
+
+    blocked = EVENT_LOOP_BLOCKED.labels().value
+    monitor = LoopMonitor(interval=0.01, slow_callback_threshold=SLOW_CALLBACK_THRESHOLD)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        assert EVENT_LOOP_LAG.labels().value >= 0
+
+        blocking_callback()
+
+        # Wait for the monitor task to measure the lag
+        deadline = time.monotonic() + 5
+        while EVENT_LOOP_BLOCKED.labels().value == blocked and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        assert EVENT_LOOP_BLOCKED.labels().value > blocked
+        assert EVENT_LOOP_LAG_HISTOGRAM.labels().count > 0
+    finally:
+        await monitor.close()
+        logger.close()
+
+    # Blocking is logged once with the stack of the loop thread
+    # (other records may be logged, if the loop is delayed by a loaded machine)
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert len([record for record in records if "in blocking_callback" in record["stack"]]) == 1
+
+
+if __name__ == "__main__":
+    run_pytest_tests(__file__) # type: ignore[reportPossiblyUnboundVariable]
@@ -0,0 +1,83 @@
+"""
+Redis memory analysis tests.
+"""
+if __name__ == "__main__":
+    import os, sys
+    sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../" * 4)))
+    from tests.util import run_pytest_tests
+
+import pytest
+
+from src.redis.memory import KeySample, MemoryReport, PrefixStats, fit_memory_model, get_prefix, project_memory
+
+
+def zset_sample(length: int) -> KeySample:
+    """ Returns a sorted set sample, which is converted to a skiplist after 128 members. """
+    if length <= 128:
+        return KeySample("key", "zset", "listpack", 100 + 10 * length, length)
+    return KeySample("key", "zset", "skiplist", 200 + 50 * length, length)
+
+
+def get_report() -> MemoryReport:
+    return MemoryReport(
+        prefixes={
+            "user": PrefixStats("user", 1000, [KeySample("user:{a}", "hash", "listpack", 200, 4)]),
+            "user_followers": PrefixStats(
+                "user_followers", 500, [zset_sample(length) for length in (10, 20, 30, 200, 300)]
+            ),
+            "post": PrefixStats("post", 5000, [KeySample("post:1", "string", "raw", 300, 250)]),
+            "next_post_id": PrefixStats("next_post_id", 1, [KeySample("next_post_id", "string", "int", 50, 4)])
+        },
+        scanned=6501,
+        total_keys=6501,
+        used_memory=10_000_000,
+        compact_limits={"zset": 128, "hash": 128}
+    )
+
+
+def test_get_prefix():
+    assert get_prefix("user_feed:{username}") == "user_feed"
+    assert get_prefix("next_post_id") == "next_post_id"
+    assert get_prefix("unknown:key") == "other"
+
+
+def test_fit_memory_model():
+    assert fit_memory_model([zset_sample(length) for length in (10, 50, 100)]) == pytest.approx((100, 10))
+
+    # Base memory can't be estimated from keys of the same length
+    assert fit_memory_model([zset_sample(10), zset_sample(10)]) == pytest.approx((0, 20))
+
+
+def test_report():
+    report = get_report()
+    assert report.users == 1000
+    assert report.avg_followers == pytest.approx(500 * 112 / 1000)
+    assert report.families["user"] == pytest.approx(1000 * 200 + 500 * (200 + 300 + 400 + 10200 + 15200) / 5)
+    assert [sample.length for sample in report.prefixes["user_followers"].non_compact_samples] == [200, 300]
+
+
+def test_project_memory():
+    report = get_report()
+
+    # Same users & followers
+    projection = project_memory(report, report.users, report.avg_followers)
+    for prefix, stats in report.prefixes.items():
+        assert projection[prefix].keys == stats.keys
+        assert projection[prefix].avg_memory == pytest.approx(stats.avg_memory)
+
+    # Numbers of keys scale with users (except fixed keys)
+    projection = project_memory(report, 10 * report.users, report.avg_followers)
+    assert projection["post"].keys == 50_000
+    assert projection["next_post_id"].keys == 1
+    assert projection["post"].avg_memory == pytest.approx(300)
+
+    # Follower sets grow & are converted to skiplists
+    projection = project_memory(report, report.users, 5 * report.avg_followers)
+    followers = projection["user_followers"]
+    assert followers.non_compact_ratio == 0.6
+    expected = (100 + 10 * 50) + (100 + 10 * 100) + (200 + 50 * 150) + (200 + 50 * 1000) + (200 + 50 * 1500)
+    assert followers.avg_memory == pytest.approx(expected / 5)
+
+
+if __name__ == "__main__":
+    run_pytest_tests(__file__) # type: ignore[reportPossiblyUnboundVariable]
@@ -0,0 +1,61 @@
+"""
+Memory tracer tests.
+"""
+if __name__ == "__main__":
+    import os, sys
+    sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../" * 4)))
+    from tests.util import run_pytest_tests
+
+import json
+import pytest
+
+from src.exceptions import InvalidOperationException
+from src.util.memory import MemoryTracer, PROJECT_ROOT, STDLIB_PATH, get_module_group
+
+
+def test_module_groups():
+    assert get_module_group(str(PROJECT_ROOT / "src/app/dependencies.py")) == "src/app"
+    assert get_module_group(str(PROJECT_ROOT / "src/redis/client.py")) == "src/redis"
+    assert get_module_group("/usr/lib/python3/site-packages/keycloak/keycloak_openid.py") == "keycloak"
+    assert get_module_group("/venv/lib/python3.11/site-packages/pydantic/main.py") == "pydantic"
+    assert get_module_group(str(STDLIB_PATH / "json/decoder.py")) == "stdlib"
+    assert get_module_group("/tmp/script.py") == "other"
+
+
+async def test_snapshots(anyio_backend):
+    tracer = MemoryTracer(max_snapshots=2)
+    with pytest.raises(InvalidOperationException):
+        await tracer.take_snapshot()
+
+    tracer.start(frames=5)
+    try:
+        with pytest.raises(InvalidOperationException):
+            tracer.start(frames=1)
+
+        old_snapshot_id = await tracer.take_snapshot()
+        allocated = [bytearray(1000) for _ in range(1000)]
+        new_snapshot_id = await tracer.take_snapshot()
+
+        # Allocations of this test file are reported
+        statistics = await tracer.get_statistics(new_snapshot_id, limit=5)
+        assert statistics["total_size"] >= 1_000_000
+        assert any(site["site"].startswith(__file__) for site in statistics["top"])
+
+        diff = await tracer.get_diff(old_snapshot_id, new_snapshot_id, limit=5)
+        assert diff["total_size_diff"] >= 1_000_000
+        assert diff["top"][0]["site"].startswith(__file__)
+        assert diff["top"][0]["count_diff"] >= 1000
+        json.dumps(diff)
+
+        # Only the most recent snapshots are kept
+        await tracer.take_snapshot()
+        assert tracer.get_snapshot_ids() == [new_snapshot_id, new_snapshot_id + 1]
+        del allocated
+    finally:
+        tracer.stop()
+
+    assert tracer.get_snapshot_ids() == []
+
+
+if __name__ == "__main__":
+    run_pytest_tests(__file__) # type: ignore[reportPossiblyUnboundVariable]
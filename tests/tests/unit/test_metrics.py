@@ -0,0 +1,115 @@
+"""
+Metrics registry tests.
+"""
+if __name__ == "__main__":
+    import os, sys
+    sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../" * 4)))
+    from tests.util import run_pytest_tests
+
+import json
+import pytest
+
+from src.util.metrics import Metric, MetricsRegistry, CounterMetric, GaugeMetric, HistogramMetric, \
+    MultiprocessMetrics, merge_snapshots, render_snapshot
+
+
+def test_render_snapshot():
+    registry = MetricsRegistry()
+    counter = CounterMetric("requests_total", "Requests.", ("route",), registry=registry)
+    gauge = GaugeMetric("in_flight", "In-flight requests.", registry=registry)
+    histogram = HistogramMetric("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1), registry=registry)
+
+    counter.labels('/a"b').inc()
+    counter.labels('/a"b').inc(2)
+    gauge.labels().set(3)
+    for value in (0.05, 0.1, 0.5, 5):
+        histogram.labels("/a").observe(value)
+
+    lines = render_snapshot(registry.snapshot()).splitlines()
+    assert "# TYPE requests_total counter" in lines
+    assert 'requests_total{route="/a\\"b"} 3' in lines
+    assert "in_flight 3" in lines
+
+    # Histogram buckets are cumulative
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1"} 3' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+    assert 'latency_seconds_sum{route="/a"} 5.65' in lines
+    assert 'latency_seconds_count{route="/a"} 4' in lines
+
+
+def test_labels_validation():
+    registry = MetricsRegistry()
+    counter = CounterMetric("requests_total", "Requests.", ("route", "status"), registry=registry)
+    with pytest.raises(ValueError):
+        counter.labels("/a")
+
+    # Metric names are unique
+    with pytest.raises(ValueError):
+        CounterMetric("requests_total", "Requests.", registry=registry)
+
+    # Metric types must create their values
+    class IncompleteMetric(Metric):
+        type = "counter"
+
+    with pytest.raises(TypeError):
+        IncompleteMetric("incomplete_total", "Incomplete.", registry=registry)  # type: ignore[abstract]
+
+
+def test_collectors():
+    registry = MetricsRegistry()
+    gauge = GaugeMetric("connections", "Connections.", registry=registry)
+    collector = lambda: gauge.labels().set(5)
+
+    registry.add_collector(collector)
+    assert "connections 5" in render_snapshot(registry.snapshot())
+
+    registry.remove_collector(collector)
+    gauge.labels().set(0)
+    assert "connections 0" in render_snapshot(registry.snapshot())
+
+
+def test_merge_snapshots():
+    snapshots = []
+    for i in range(1, 3):
+        registry = MetricsRegistry()
+        CounterMetric("requests_total", "Requests.", registry=registry).labels().inc(i)
+        GaugeMetric("in_flight", "In-flight.", registry=registry).labels().set(i)
+        GaugeMetric("lag_seconds", "Lag.", aggregation="max", registry=registry).labels().set(i)
+        HistogramMetric("latency_seconds", "Latency.", buckets=(1,), registry=registry).labels().observe(i)
+        snapshots.append(json.loads(json.dumps(registry.snapshot())))
+
+    lines = render_snapshot(merge_snapshots(snapshots)).splitlines()
+    assert "requests_total 3" in lines
+    assert "in_flight 3" in lines
+    assert "lag_seconds 2" in lines
+    assert 'latency_seconds_bucket{le="1"} 1' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 2' in lines
+    assert "latency_seconds_count 2" in lines
+
+
+async def test_multiprocess_metrics(anyio_backend, tmp_path):
+    registry = MetricsRegistry()
+    CounterMetric("requests_total", "Requests.", registry=registry).labels().inc(2)
+
+    # Add snapshots of another live & a terminated worker
+    other_registry = MetricsRegistry()
+    CounterMetric("requests_total", "Requests.", registry=other_registry).labels().inc(3)
+    (tmp_path / "1.json").write_text(json.dumps(other_registry.snapshot()))     # pid 1 is always alive
+    (tmp_path / "999999999.json").write_text(json.dumps(other_registry.snapshot()))
+    (tmp_path / ".1.json.swp.json").write_text("")    # unrelated file
+
+    metrics = MultiprocessMetrics(str(tmp_path), interval=60, registry=registry)
+    metrics.start()
+    try:
+        assert "requests_total 5" in render_snapshot(await metrics.collect()).splitlines()
+        assert not (tmp_path / "999999999.json").exists()
+        assert (tmp_path / ".1.json.swp.json").exists()
+    finally:
+        await metrics.close()
+
+    assert not metrics.path.exists()
+
+
+if __name__ == "__main__":
+    run_pytest_tests(__file__) # type: ignore[reportPossiblyUnboundVariable]
@@ -0,0 +1,65 @@
+"""
+Sampling profiler tests.
+"""
+if __name__ == "__main__":
+    import os, sys
+    sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../" * 4)))
+    from tests.util import run_pytest_tests
+
+import asyncio
+from time import perf_counter
+from types import SimpleNamespace
+
+import pytest
+
+from src.exceptions import InvalidOperationException
+from src.util.profiler import SamplingProfiler, format_collapsed_stacks
+
+
+def busy_function(duration: float):
+    end = perf_counter() + duration
+    while perf_counter() < end:
+        pass
+
+
+async def test_profile(anyio_backend):
+    profiler = SamplingProfiler()
+
+    async def request():
+        # Wait for the profiler to start
+        while not profiler.active:
+            await asyncio.sleep(0.001)
+
+        scope = {"type": "http", "method": "GET", "route": SimpleNamespace(path="/posts/{post_id}")}
+        with profiler.track_request(scope):
+            for _ in range(10):
+                busy_function(0.01)
+                await asyncio.sleep(0)
+
+    stacks, _ = await asyncio.gather(profiler.profile(duration=0.2, interval=0.001), request())
+    assert not profiler.active
+
+    # Samples of the busy function are attributed to the request route
+    busy_stacks = [stack for stack in stacks if "busy_function" in stack]
+    assert len(busy_stacks) > 0
+    assert all(stack.split(";")[1] == "GET /posts/{post_id}" for stack in busy_stacks)
+
+    # Idle threads are skipped
+    assert not any("select (selectors.py" in stack for stack in stacks)
+
+    lines = format_collapsed_stacks(stacks).splitlines()
+    assert [int(line.rsplit(" ", 1)[1]) for line in lines] == sorted(stacks.values(), reverse=True)
+
+
+async def test_concurrent_profiles(anyio_backend):
+    profiler = SamplingProfiler()
+    task = asyncio.ensure_future(profiler.profile(duration=0.05, interval=0.01))
+    await asyncio.sleep(0)
+
+    with pytest.raises(InvalidOperationException):
+        await profiler.profile(duration=0.05, interval=0.01)
+    await task
+
+
+if __name__ == "__main__":
+    run_pytest_tests(__file__) # type: ignore[reportPossiblyUnboundVariable]
@@ -0,0 +1,124 @@
+"""
+ReadBatcher tests.
+"""
+if __name__ == "__main__":
+    import os, sys
+    sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../" * 4)))
+    from tests.util import run_pytest_tests
+
+import asyncio
+import pytest
+
+from src.redis.batching import ReadBatcher
+
+
+class StubPipeline:
+    def __init__(self, client: "StubRedis"):
+        self.client = client
+        self.commands: list[tuple[str, tuple]] = []
+    
+    def get(self, key): self.commands.append(("get", (key,)))
+    def hgetall(self, key): self.commands.append(("hgetall", (key,)))
+    def zrange(self, key, start, end): self.commands.append(("zrange", (key, start, end)))
+
+    async def execute(self, raise_on_error: bool = True):
+        self.client.pipelines.append(self.commands)
+        if self.client.error is not None:
+            raise self.client.error
+        await asyncio.sleep(0)
+        return [self.client.data.get(args[0], ValueError("Missing key")) for _, args in self.commands]
+
+
+class StubRedis:
+    """ Minimal in-memory replacement of Redis client, which records executed commands. """
+    def __init__(self, data: dict):
+        self.data = data
+        self.pipelines: list[list] = []
+        self.single_commands: list[tuple[str, tuple]] = []
+        self.error: Exception | None = None
+    
+    def pipeline(self, transaction: bool = True):
+        return StubPipeline(self)
+    
+    async def get(self, key):
+        self.single_commands.append(("get", (key,)))
+        return self.data[key]
+
+
+async def test_reads_in_the_same_tick_are_batched(anyio_backend):
+    client = StubRedis({"a": "1", "b": {"field": "value"}, "c": ["x", "y"]})
+    batcher = ReadBatcher(client, max_batch_size=10, max_wait=0)    # type: ignore
+
+    results = await asyncio.gather(
+        batcher.get("a"),
+        batcher.hgetall("b"),
+        batcher.zrange("c", 0, -1)
+    )
+    assert results == ["1", {"field": "value"}, ["x", "y"]]
+    assert client.pipelines == [[("get", ("a",)), ("hgetall", ("b",)), ("zrange", ("c", 0, -1))]]
+    assert batcher.batches == 1
+    assert batcher.commands == 3
+
+
+async def test_single_read_is_sent_without_pipeline(anyio_backend):
+    client = StubRedis({"a": "1"})
+    batcher = ReadBatcher(client, max_batch_size=10, max_wait=0)    # type: ignore
+
+    assert await batcher.get("a") == "1"
+    assert client.pipelines == []
+    assert client.single_commands == [("get", ("a",))]
+
+
+async def test_max_batch_size(anyio_backend):
+    client = StubRedis({str(i): str(i) for i in range(5)})
+    batcher = ReadBatcher(client, max_batch_size=2, max_wait=0)     # type: ignore
+
+    results = await asyncio.gather(*(batcher.get(str(i)) for i in range(5)))
+    assert results == [str(i) for i in range(5)]
+    assert batcher.batches == 3
+    assert [len(pipeline) for pipeline in client.pipelines] == [2, 2]
+
+
+async def test_max_wait(anyio_backend):
+    client = StubRedis({"a": "1", "b": "2"})
+    batcher = ReadBatcher(client, max_batch_size=10, max_wait=0.05)     # type: ignore
+
+    async def delayed_get(key: str):
+        await asyncio.sleep(0.01)
+        return await batcher.get(key)
+
+    # Reads from different ticks are sent in the same batch
+    assert await asyncio.gather(batcher.get("a"), delayed_get("b")) == ["1", "2"]
+    assert batcher.batches == 1
+
+
+async def test_batch_error(anyio_backend):
+    client = StubRedis({"a": "1", "b": "2"})
+    client.error = ConnectionError()
+    batcher = ReadBatcher(client, max_batch_size=10, max_wait=0)    # type: ignore
+
+    results = await asyncio.gather(batcher.get("a"), batcher.get("b"), return_exceptions=True)
+    assert all(isinstance(result, ConnectionError) for result in results)
+
+
+async def test_command_error(anyio_backend):
+    client = StubRedis({"a": "1"})
+    batcher = ReadBatcher(client, max_batch_size=10, max_wait=0)    # type: ignore
+
+    # Command error is raised only for its caller
+    results = await asyncio.gather(batcher.get("a"), batcher.get("missing"), return_exceptions=True)
+    assert results[0] == "1"
+    assert isinstance(results[1], ValueError)
+
+
+async def test_close(anyio_backend):
+    client = StubRedis({"a": "1", "b": "2"})
+    batcher = ReadBatcher(client, max_batch_size=10, max_wait=10)   # type: ignore
+
+    futures = [batcher.get("a"), batcher.get("b")]
+    await batcher.close()
+    assert [future.result() for future in futures] == ["1", "2"]
+
+
+if __name__ == "__main__":
+    run_pytest_tests(__file__) # type: ignore[reportPossiblyUnboundVariable]
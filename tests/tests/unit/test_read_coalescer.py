@@ -0,0 +1,107 @@
+"""
+ReadCoalescer tests.
+"""
+if __name__ == "__main__":
+    import os, sys
+    sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../" * 4)))
+    from tests.util import run_pytest_tests
+
+import asyncio
+import pytest
+
+from src.redis.coalescing import ReadCoalescer
+
+
+async def test_concurrent_reads_are_coalesced(anyio_backend):
+    coalescer = ReadCoalescer()
+    event = asyncio.Event()
+    calls = 0
+
+    async def read():
+        nonlocal calls
+        calls += 1
+        await event.wait()
+        return "value"
+    
+    # Run concurrent reads with the same key
+    tasks = [asyncio.create_task(coalescer.run("key", read)) for _ in range(5)]
+    await asyncio.sleep(0)
+    event.set()
+    assert await asyncio.gather(*tasks) == ["value"] * 5
+
+    # Check if a single read was performed
+    assert calls == 1
+    assert coalescer.reads == 1
+    assert coalescer.saved_round_trips == 4
+    assert not coalescer._in_flight
+
+
+async def test_different_keys_are_not_coalesced(anyio_backend):
+    coalescer = ReadCoalescer()
+
+    async def read(value):
+        await asyncio.sleep(0)
+        return value
+    
+    results = await asyncio.gather(
+        coalescer.run("first", lambda: read(1)),
+        coalescer.run("second", lambda: read(2))
+    )
+    assert results == [1, 2]
+    assert coalescer.reads == 2
+    assert coalescer.saved_round_trips == 0
+
+
+async def test_sequential_reads_are_not_coalesced(anyio_backend):
+    coalescer = ReadCoalescer()
+
+    async def read():
+        return "value"
+    
+    for _ in range(3):
+        assert await coalescer.run("key", read) == "value"
+    assert coalescer.reads == 3
+
+
+async def test_errors_are_propagated_to_all_callers(anyio_backend):
+    coalescer = ReadCoalescer()
+    event = asyncio.Event()
+
+    async def read():
+        await event.wait()
+        raise ConnectionError()
+    
+    tasks = [asyncio.create_task(coalescer.run("key", read)) for _ in range(3)]
+    await asyncio.sleep(0)
+    event.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    assert all(isinstance(result, ConnectionError) for result in results)
+
+    # Check if in-flight read was cleared
+    await asyncio.sleep(0)
+    assert not coalescer._in_flight
+
+
+async def test_caller_cancellation_does_not_affect_other_callers(anyio_backend):
+    coalescer = ReadCoalescer()
+    event = asyncio.Event()
+
+    async def read():
+        await event.wait()
+        return "value"
+    
+    first = asyncio.create_task(coalescer.run("key", read))
+    second = asyncio.create_task(coalescer.run("key", read))
+    await asyncio.sleep(0)
+
+    # Cancel the caller, which started the read
+    first.cancel()
+    event.set()
+    
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert await second == "value"
+
+
+if __name__ == "__main__":
+    run_pytest_tests(__file__) # type: ignore[reportPossiblyUnboundVariable]
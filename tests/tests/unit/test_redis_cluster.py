@@ -0,0 +1,130 @@
+"""
+RedisClient cluster mode tests.
+"""
+if __name__ == "__main__":
+    import os, sys
+    sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../" * 4)))
+    from tests.util import run_pytest_tests
+
+from datetime import datetime, timezone
+
+from redis.asyncio.cluster import ClusterNode, RedisCluster
+from redis.cluster import REDIS_CLUSTER_HASH_SLOTS
+
+from src.app.models import PostWithID
+from src.redis.client import RedisClient
+from src.redis.instrumentation import InstrumentedRedisCluster, REDIS_COMMAND_DURATION
+from src.redis.util import RedisKeys
+from src.util.timing import RequestTimings, request_timings
+from src.util.tracing import JSONLSpanExporter, Tracer
+
+
+NODES = 3
+
+
+class FakeReads:
+    """ Returns predefined members of sorted sets (e.g. followers). """
+    def __init__(self, members: list[str]):
+        self.members = members
+
+    async def zrange(self, key: str, start: int, end: int) -> list[str]:
+        return self.members
+
+
+class FakeNode(ClusterNode):
+    """ Records commands of each pipeline, which is sent to the node (a list of commands for each round trip). """
+    def __init__(self, host: str, port: int):
+        super().__init__(host, port)
+        self.round_trips: list[list[tuple]] = []
+
+    async def execute_pipeline(self, commands) -> bool:
+        self.round_trips.append([command.args for command in commands])
+        for command in commands:
+            command.result = [None] * (len(command.args) - 1) if command.args[0] == "MGET" else 1
+        return False
+
+
+def get_cluster() -> tuple[RedisCluster, list[FakeNode]]:
+    """ Returns an instrumented cluster client with `NODES` primaries, which evenly split hash slots. """
+    cluster = InstrumentedRedisCluster(startup_nodes=[ClusterNode("localhost", 7000)])
+    nodes = [FakeNode("localhost", 7000 + i) for i in range(NODES)]
+    slots_per_node = REDIS_CLUSTER_HASH_SLOTS // NODES + 1
+    cluster.nodes_manager.nodes_cache = {node.name: node for node in nodes}
+    cluster.nodes_manager.slots_cache = {
+        slot: [nodes[slot // slots_per_node]] for slot in range(REDIS_CLUSTER_HASH_SLOTS)
+    }
+    cluster.nodes_manager.default_node = nodes[0]
+
+    # Key positions of commands, which are returned by COMMAND
+    cluster.commands_parser.commands = {
+        name: {"name": name, "flags": [], "first_key_pos": 1, "last_key_pos": 1, "step_count": 1}
+        for name in ("zadd", "incrby")
+    }
+    cluster._initialize = False
+    return cluster, nodes
+
+
+async def test_feed_fan_out_round_trips(anyio_backend):
+    cluster, nodes = get_cluster()
+    followers = [f"follower_{i}" for i in range(100)]
+    client = RedisClient(cluster, batcher=FakeReads(followers))  # type: ignore[arg-type]
+
+    post = PostWithID(post_id=1, author="post_author", content="content", created_at=datetime.now(tz=timezone.utc))
+    await client.add_post_to_followers_feeds(post)
+
+    # A single pipeline is sent to each node
+    assert all(len(node.round_trips) <= 1 for node in nodes)
+    assert sum(len(node.round_trips) for node in nodes) <= NODES
+    commands = [command for node in nodes for round_trip in node.round_trips for command in round_trip]
+    assert sorted(command[1] for command in commands if command[0] == "ZADD") == \
+        sorted(RedisKeys.user_feed(follower) for follower in followers)
+
+
+async def test_mget_round_trips(anyio_backend):
+    cluster, nodes = get_cluster()
+    client = RedisClient(cluster)
+
+    keys = [RedisKeys.post(post_id) for post_id in range(1, 101)]
+    assert await client._mget(keys) == [None] * len(keys)
+
+    # Per-slot MGET commands are sent in a single pipeline to each node
+    assert all(len(node.round_trips) <= 1 for node in nodes)
+    assert sum(len(round_trip) for node in nodes for round_trip in node.round_trips) > NODES
+
+
+async def test_pipeline_metrics(anyio_backend):
+    cluster, _ = get_cluster()
+    followers = [f"follower_{i}" for i in range(100)]
+    client = RedisClient(cluster, batcher=FakeReads(followers))  # type: ignore[arg-type]
+    post = PostWithID(post_id=1, author="post_author", content="content", created_at=datetime.now(tz=timezone.utc))
+
+    # Fan-out & per-slot MGETs are measured as whole pipelines
+    fan_out, mget = REDIS_COMMAND_DURATION.labels("PIPELINE", "feed"), REDIS_COMMAND_DURATION.labels("PIPELINE", "post")
+    fan_out_count, mget_count = fan_out.count, mget.count
+    await client.add_post_to_followers_feeds(post)
+    await client._mget([RedisKeys.post(post_id) for post_id in range(1, 101)])
+    assert fan_out.count == fan_out_count + 1
+    assert mget.count == mget_count + 1
+
+
+async def test_pipeline_span_and_timings(anyio_backend, tmp_path):
+    cluster, _ = get_cluster()
+    client = RedisClient(cluster)
+    exporter = JSONLSpanExporter(str(tmp_path / "spans.jsonl"))
+    timings = RequestTimings()
+    token = request_timings.set(timings)
+    try:
+        with Tracer(exporter, sample_rate=1).start_trace("request"):
+            await client._mget([RedisKeys.post(post_id) for post_id in range(1, 101)])
+    finally:
+        request_timings.reset(token)
+
+    # Per-slot MGETs are traced & timed as a single pipeline
+    spans = {span.name: span for span in exporter._buffer}
+    assert spans["redis PIPELINE"].attributes["family"] == "post"
+    assert spans["redis PIPELINE"].attributes["commands"] > NODES
+    assert timings.redis > 0 and timings.redis_round_trips == 1
+
+
+if __name__ == "__main__":
+    run_pytest_tests(__file__) # type: ignore[reportPossiblyUnboundVariable]
@@ -0,0 +1,40 @@
+"""
+Redis key schema tests.
+"""
+if __name__ == "__main__":
+    import os, sys
+    sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../" * 4)))
+    from tests.util import run_pytest_tests
+
+from redis.crc import key_slot
+
+from src.redis.util import RedisKeys, group_by_slot
+
+
+def test_user_keys_share_a_slot():
+    for username in ["username", "another_username"]:
+        keys = [
+            RedisKeys.user(username),
+            RedisKeys.user_followers(username),
+            RedisKeys.user_posts(username),
+            RedisKeys.user_feed(username),
+            RedisKeys.user_posts_version(username),
+            RedisKeys.user_feed_version(username)
+        ]
+        assert len({key_slot(key.encode()) for key in keys}) == 1
+
+
+def test_group_by_slot():
+    keys = [RedisKeys.user_feed(f"user_{i}") for i in range(100)]
+    groups = group_by_slot(keys)
+
+    # Each key index is present in exactly one group
+    assert sorted(i for indexes in groups.values() for i in indexes) == list(range(100))
+
+    # Keys of each group belong to the group's slot
+    for slot, indexes in groups.items():
+        assert all(key_slot(keys[i].encode()) == slot for i in indexes)
+
+
+if __name__ == "__main__":
+    run_pytest_tests(__file__) # type: ignore[reportPossiblyUnboundVariable]
@@ -0,0 +1,53 @@
+"""
+Redis transport settings tests.
+"""
+if __name__ == "__main__":
+    import os, sys
+    sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../" * 4)))
+    from tests.util import run_pytest_tests
+
+from pydantic import ValidationError
+import pytest
+import socket
+
+from config import load_config, Config
+from src.redis.transport import TCPConnection, SyncTCPConnection, get_transport_kwargs
+
+
+def test_tcp_transport():
+    redis_config = load_config().redis.model_copy(update={
+        "unix_socket_path": None,
+        "socket_keepalive": True,
+        "socket_keepalive_options": {"TCP_KEEPINTVL": 10},
+        "tcp_nodelay": False
+    })
+
+    kwargs = get_transport_kwargs(redis_config)
+    assert kwargs["connection_class"] is TCPConnection
+    assert (kwargs["host"], kwargs["port"]) == ("localhost", redis_config.container_port)
+    assert kwargs["socket_keepalive_options"] == {socket.TCP_KEEPINTVL: 10}
+    assert kwargs["tcp_nodelay"] is False
+
+    kwargs = get_transport_kwargs(redis_config, ("replica", 6380), sync=True)
+    assert kwargs["connection_class"] is SyncTCPConnection
+    assert (kwargs["host"], kwargs["port"]) == ("replica", 6380)
+
+
+def test_unix_socket_transport():
+    redis_config = load_config().redis.model_copy(update={"unix_socket_path": "/tmp/redis.sock"})
+    assert get_transport_kwargs(redis_config)["path"] == "/tmp/redis.sock"
+    assert "host" not in get_transport_kwargs(redis_config, sync=True)
+
+    # Unix socket is only used for the primary instance
+    assert get_transport_kwargs(redis_config, ("replica", 6380))["host"] == "replica"
+
+
+def test_invalid_keepalive_options():
+    data = load_config().model_dump()
+    data["redis"]["socket_keepalive_options"] = {"SO_REUSEADDR": 1}
+    with pytest.raises(ValidationError):
+        Config.model_validate(data)
+
+
+if __name__ == "__main__":
+    run_pytest_tests(__file__) # type: ignore[reportPossiblyUnboundVariable]
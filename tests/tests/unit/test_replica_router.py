@@ -0,0 +1,107 @@
+"""
+ReplicaRouter & ReadYourWritesTracker tests.
+"""
+if __name__ == "__main__":
+    import os, sys
+    sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../" * 4)))
+    from tests.util import run_pytest_tests
+
+import asyncio
+from time import sleep
+import pytest
+from redis.exceptions import ConnectionError, ResponseError
+
+from src.redis.replicas import ReplicaRouter, ReplicaTarget, ReadYourWritesTracker
+from src.redis.util import RedisKeys
+
+
+class StubRedis:
+    """ Redis client replacement with configurable delay & errors. """
+    def __init__(self, name: str, delay: float = 0, error: Exception | None = None):
+        self.name = name
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+    
+    async def get(self, key: str):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.name
+
+
+def get_router(*clients: StubRedis, primary: StubRedis | None = None, hedge_delay: float = 0):
+    targets = [ReplicaTarget(client.name, client) for client in clients]    # type: ignore
+    primary = primary or StubRedis("primary")
+    return ReplicaRouter(targets, primary, hedge_delay=hedge_delay, failure_cooldown=60)
+
+
+async def test_least_latency_replica_is_used(anyio_backend):
+    router = get_router(StubRedis("first"), StubRedis("second"))
+    router.targets[0].add_latency(0.1)
+    router.targets[1].add_latency(0.01)
+    assert await router.get("key") == "second"
+
+
+async def test_failed_replica_is_skipped(anyio_backend):
+    failing = StubRedis("failing", error=ConnectionError())
+    router = get_router(failing, StubRedis("healthy"))
+
+    # Failed command is sent to the next replica
+    assert await router.get("key") == "healthy"
+    assert router.targets[0].errors == 1
+
+    # Failed replica is not used during cooldown
+    assert await router.get("key") == "healthy"
+    assert failing.calls == 1
+
+
+async def test_primary_fallback(anyio_backend):
+    router = get_router(StubRedis("failing", error=ConnectionError()))
+    assert await router.get("key") == "primary"
+    assert router.primary_fallbacks == 1
+
+    # Primary is used, if there are no healthy replicas
+    assert await router.get("key") == "primary"
+    assert router.primary_fallbacks == 2
+
+
+async def test_hedged_command(anyio_backend):
+    slow, fast = StubRedis("slow", delay=1), StubRedis("fast")
+    router = get_router(slow, fast, hedge_delay=0.01)
+    slow_target = router.targets[0]
+
+    assert await router.get("key") == "fast"
+    assert router.hedged_commands == 1
+    assert slow.calls == 1 and fast.calls == 1
+
+    # Cancelled command of a slow replica is not counted as error
+    await asyncio.sleep(0)
+    assert slow_target.errors == 0
+    assert slow_target.in_flight == 0
+
+
+async def test_command_errors_are_raised(anyio_backend):
+    router = get_router(StubRedis("replica", error=ResponseError("WRONGTYPE")))
+    with pytest.raises(ResponseError):
+        await router.get("key")
+    assert router.primary_fallbacks == 0
+
+
+def test_read_your_writes_tracker():
+    tracker = ReadYourWritesTracker(window=0.05)
+    tracker.mark(RedisKeys.user_followers("username"))
+
+    # Keys of the same user are recent
+    assert tracker.is_recent(RedisKeys.user("username"))
+    assert tracker.is_recent(RedisKeys.user_feed("another_user"), RedisKeys.user_feed("username"))
+    assert not tracker.is_recent(RedisKeys.user("another_user"))
+
+    # Keys are not recent after the window
+    sleep(0.06)
+    assert not tracker.is_recent(RedisKeys.user("username"))
+
+
+if __name__ == "__main__":
+    run_pytest_tests(__file__) # type: ignore[reportPossiblyUnboundVariable]
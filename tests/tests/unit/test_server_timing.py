@@ -0,0 +1,59 @@
+"""
+Server-Timing middleware tests.
+"""
+if __name__ == "__main__":
+    import os, sys
+    sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../" * 4)))
+    from tests.util import run_pytest_tests
+
+import asyncio
+import re
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from src.app.middleware import ServerTimingMiddleware
+from src.util.timing import add_keycloak_time, add_redis_time
+
+
+def get_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/{round_trips}")
+    async def endpoint(round_trips: int):
+        add_keycloak_time(0.01)
+
+        # Round trips of concurrent tasks are attributed to the request
+        async def round_trip():
+            await asyncio.sleep(0.01)
+            add_redis_time(0.002)
+
+        await asyncio.gather(*(round_trip() for _ in range(round_trips)))
+        return {}
+
+    app.add_middleware(ServerTimingMiddleware)
+    return app
+
+
+async def test_server_timing_header(anyio_backend):
+    async with AsyncClient(transport=ASGITransport(app=get_app()), base_url="http://test") as client:
+        responses = await asyncio.gather(*(client.get(f"/{i}") for i in range(1, 6)))
+
+    # Timings of concurrent requests are not mixed
+    for i, resp in enumerate(responses, start=1):
+        server_timing = resp.headers["server-timing"]
+        assert f'redis;dur={i * 2:.2f};desc="{i} round trips"' in server_timing
+        assert 'keycloak;dur=10.00;desc="1 calls"' in server_timing
+
+        total = re.search(r"total;dur=([\d.]+)", server_timing)
+        assert total is not None and float(total.group(1)) >= 10
+
+
+def test_timings_outside_of_requests():
+    # Timings are ignored outside of requests
+    add_redis_time(0.1)
+    add_keycloak_time(0.1)
+
+
+if __name__ == "__main__":
+    run_pytest_tests(__file__) # type: ignore[reportPossiblyUnboundVariable]
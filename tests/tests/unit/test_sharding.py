@@ -0,0 +1,150 @@
+"""
+HashRing & ShardedRedis tests.
+"""
+if __name__ == "__main__":
+    import os, sys
+    sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../" * 4)))
+    from tests.util import run_pytest_tests
+
+import asyncio
+import pytest
+
+from config import RedisConfig
+from src.redis.admin import close_admin_clients, create_admin_clients
+from src.redis.connection import create_redis_client
+from src.redis.sharding import HashRing, ShardedRedis
+from src.redis.util import RedisKeys
+
+
+class StubPipeline:
+    def __init__(self, client: "StubRedis"):
+        self.client = client
+        self.commands: list[tuple[str, tuple]] = []
+
+    def get(self, key): self.commands.append(("get", (key,)))
+    def incr(self, key): self.commands.append(("incr", (key,)))
+    def mget(self, keys): self.commands.append(("mget", (keys,)))
+
+    async def execute(self, raise_on_error: bool = True):
+        self.client.pipelines.append(self.commands)
+        await asyncio.sleep(0)
+        return [await getattr(self.client, name)(*args) for name, args in self.commands]
+
+
+class StubRedis:
+    """ Minimal in-memory replacement of Redis client, which records executed pipelines. """
+    def __init__(self):
+        self.data: dict[str, int] = {}
+        self.pipelines: list[list] = []
+
+    def pipeline(self, transaction: bool = True):
+        return StubPipeline(self)
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def incr(self, key):
+        self.data[key] = self.data.get(key, 0) + 1
+        return self.data[key]
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+
+def get_sharded_client(number_of_shards: int) -> ShardedRedis:
+    return ShardedRedis({f"shard-{i}:6379": StubRedis() for i in range(number_of_shards)})  # type: ignore
+
+
+def test_hash_ring_routes_keys_by_hash_tag():
+    ring = HashRing(["a:1", "b:1", "c:1"])
+    assert len({ring.get_node(key) for key in (
+        RedisKeys.user("username"),
+        RedisKeys.user_feed("username"),
+        RedisKeys.user_followers("username")
+    )}) == 1
+
+
+def test_hash_ring_distribution_and_movement():
+    keys = [RedisKeys.post(i) for i in range(10000)]
+    old_ring = HashRing([f"shard-{i}:6379" for i in range(4)])
+    new_ring = HashRing([f"shard-{i}:6379" for i in range(5)])
+
+    # Keys are evenly distributed between shards
+    counts: dict[str, int] = {}
+    for key in keys:
+        node = old_ring.get_node(key)
+        counts[node] = counts.get(node, 0) + 1
+    assert all(1500 < count < 3500 for count in counts.values())
+
+    # Only keys of the new shard are moved
+    moved = [key for key in keys if old_ring.get_node(key) != new_ring.get_node(key)]
+    assert all(new_ring.get_node(key) == "shard-4:6379" for key in moved)
+    assert 1000 < len(moved) < 3000
+
+
+def test_hash_ring_without_nodes():
+    with pytest.raises(ValueError):
+        HashRing([])
+
+
+async def test_single_key_commands(anyio_backend):
+    client = get_sharded_client(3)
+    for i in range(20):
+        await client.incr(RedisKeys.user_feed_version(f"user {i}"))
+
+    for i in range(20):
+        key = RedisKeys.user_feed_version(f"user {i}")
+        assert client.get_shard(key).data[key] == 1     # type: ignore
+        assert await client.get(key) == 1
+    assert sum(len(shard.data) for shard in client.shards.values()) == 20     # type: ignore
+
+
+async def test_mget_preserves_key_order(anyio_backend):
+    client = get_sharded_client(3)
+    keys = [RedisKeys.post(i) for i in range(50)]
+    for i, key in enumerate(keys):
+        if i % 2 == 0:
+            client.get_shard(key).data[key] = i     # type: ignore
+
+    assert await client.mget(keys) == [i if i % 2 == 0 else None for i in range(50)]
+
+
+async def test_pipeline_is_split_per_shard(anyio_backend):
+    client = get_sharded_client(3)
+    keys = [RedisKeys.user_feed_version(f"user {i}") for i in range(30)]
+
+    pipe = client.pipeline(transaction=False)
+    for key in keys:
+        pipe.incr(key)
+    pipe.mget(keys)
+    results = await pipe.execute()
+
+    assert results == [1] * 30 + [[1] * 30]
+
+    # Each shard receives a single pipeline with its own keys only
+    for node, shard in client.shards.items():
+        assert len(shard.pipelines) == 1    # type: ignore
+        for name, args in shard.pipelines[0]:   # type: ignore
+            shard_keys = args[0] if name == "mget" else [args[0]]
+            assert all(client.ring.get_node(key) == node for key in shard_keys)
+
+
+async def test_admin_clients_use_shard_addresses(anyio_backend):
+    redis_config = RedisConfig.model_validate({
+        "container_name": "redis", "container_port": 6379, "password": "password", "max_databases": 2,
+        "database": 0, "max_connections": 1, "socket_timeout": 1, "number_of_retries": 0,
+        "retry_base_time": 0, "retry_cap_time": 0, "shards": ["localhost:06380", "localhost:6381"]
+    })
+    client = create_redis_client(redis_config)
+    admin_clients = create_admin_clients(redis_config)
+    try:
+        # Keys are mapped to the same shards by the app & admin clients (e.g. dataset loader)
+        assert isinstance(client, ShardedRedis) and isinstance(admin_clients, dict)
+        assert list(admin_clients) == list(client.shards) == redis_config.shards
+    finally:
+        close_admin_clients(admin_clients)
+        await client.aclose()
+
+
+if __name__ == "__main__":
+    run_pytest_tests(__file__) # type: ignore[reportPossiblyUnboundVariable]
@@ -0,0 +1,154 @@
+"""
+Redis SLOWLOG collector & command tagging tests.
+"""
+if __name__ == "__main__":
+    import os, sys
+    sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../" * 4)))
+    from tests.util import run_pytest_tests
+
+import os
+
+from pydantic import ValidationError
+import pytest
+
+from config import Config, RedisConfig
+from src.redis.client import RedisClient
+from src.redis.connection import get_client_kwargs
+from src.redis.slowlog import (
+    CommandTagger, REDIS_LATENCY_EVENT, REDIS_SLOW_COMMANDS, SlowlogCollector, current_redis_method, get_client_name
+)
+
+
+CLIENT_NAME = "app:host:1"
+
+
+class FakeRedis:
+    """ Returns predefined SLOWLOG & LATENCY responses & records the current RedisClient method of GET calls. """
+    def __init__(self):
+        self.slowlog: list = []
+        self.latency: list = []
+        self.methods: list[str | None] = []
+
+    async def execute_command(self, *args):
+        if args[:2] == ("SLOWLOG", "GET"):
+            return self.slowlog[:args[2]]
+        if args == ("LATENCY", "LATEST"):
+            return self.latency
+        raise ValueError(f"Unexpected command: {args}")
+
+    async def get(self, key: str):
+        self.methods.append(current_redis_method.get())
+        return None
+
+    def add_entry(self, command: list[str], duration: int, client_name: str = CLIENT_NAME) -> None:
+        entry_id = self.slowlog[0][0] + 1 if self.slowlog else 0
+        self.slowlog.insert(0, [entry_id, 1700000000, duration, command, "127.0.0.1:50000", client_name])
+
+
+REDIS_CONFIG = {
+    "container_name": "redis", "container_port": 6379, "password": "password", "max_databases": 2,
+    "database": 0, "max_connections": 1, "socket_timeout": 1, "number_of_retries": 0,
+    "retry_base_time": 0, "retry_cap_time": 0
+}
+
+
+def test_get_client_name():
+    config = RedisConfig.model_validate({**REDIS_CONFIG, "client_name": "app"})
+    name = get_client_name(config)
+    assert name is not None and name.startswith("app:") and name.endswith(f":{os.getpid()}")
+    assert " " not in name
+
+    # Connections are not named by default
+    config = RedisConfig.model_validate(REDIS_CONFIG)
+    assert get_client_name(config) is None
+    assert get_client_kwargs(config)["client_name"] is None
+
+
+def test_slowlog_requires_client_name():
+    keycloak_config = {
+        "container_name": "keycloak", "container_main_port": 8080, "container_healthcheck_port": 9000,
+        "max_healthcheck_retries": 0, "healthcheck_retry_timeout": 0, "admin_username": "admin",
+        "admin_password": "password", "app_realm_name": "realm", "app_client_id": "client",
+        "app_client_secret": "secret"
+    }
+    with pytest.raises(ValidationError):
+        Config.model_validate({"keycloak": keycloak_config, "redis": REDIS_CONFIG, "app": {"slowlog_enabled": True}})
+
+    Config.model_validate({
+        "keycloak": keycloak_config, "redis": {**REDIS_CONFIG, "client_name": "app"}, "app": {"slowlog_enabled": True}
+    })
+
+
+def test_command_tagger():
+    tagger = CommandTagger(max_size=2)
+
+    # Commands are not tagged, when tagger is disabled or outside of RedisClient methods
+    tagger.tag(("GET", "key"))
+    tagger.enabled = True
+    tagger.tag(("GET", "key"))
+    assert tagger.get_method(["GET", "key"]) == "unknown"
+
+    token = current_redis_method.set("RedisClient.method")
+    try:
+        tagger.tag(("zrange", "user_followers:{username}", 0, -1))
+        assert tagger.get_method(["ZRANGE", "user_followers:{username}", "0", "-1"]) == "RedisClient.method"
+
+        # The oldest commands are evicted
+        tagger.tag(("GET", "a"))
+        tagger.tag(("GET", "b"))
+        assert tagger.get_method(["ZRANGE", "user_followers:{username}"]) == "unknown"
+        assert tagger.get_method(["GET", "b"]) == "RedisClient.method"
+    finally:
+        current_redis_method.reset(token)
+
+
+async def test_redis_client_method_is_set(anyio_backend):
+    redis = FakeRedis()
+    await RedisClient(redis).get_user_posts_version("username")   # type: ignore[arg-type]
+    assert redis.methods == ["RedisClient.get_user_posts_version"]
+    assert current_redis_method.get() is None
+
+
+async def test_slowlog_collector(anyio_backend):
+    redis = FakeRedis()
+    tagger = CommandTagger()
+    tagger.enabled = True
+    collector = SlowlogCollector(redis, {}, CLIENT_NAME, interval=1, tagger=tagger)   # type: ignore[arg-type]
+
+    # Existing entries are skipped
+    redis.add_entry(["ZRANGE", "user_followers:{old}", "0", "-1"], 50_000)
+    await collector.collect()
+
+    token = current_redis_method.set("RedisClient.test_slowlog_collector")
+    tagger.tag(("PIPELINE_ZADD", "user_feed:{follower}"))
+    current_redis_method.reset(token)
+
+    def get_count(method: str) -> float:
+        return REDIS_SLOW_COMMANDS.labels("PIPELINE_ZADD", "feed", method).value
+
+    redis.add_entry(["PIPELINE_ZADD", "user_feed:{follower}", "-1", "1"], 20_000)
+    redis.add_entry(["PIPELINE_ZADD", "user_feed:{another}", "-1", "1"], 20_000)
+    redis.add_entry(["PIPELINE_ZADD", "user_feed:{follower}", "-1", "1"], 20_000, client_name="app:host:2")
+    redis.latency = [["command", 1700000000, 120, 250]]
+    tagged, untagged = get_count("RedisClient.test_slowlog_collector"), get_count("unknown")
+    await collector.collect()
+
+    # Only new entries of the worker are exported & tagged with methods, which sent the commands
+    assert get_count("RedisClient.test_slowlog_collector") == tagged + 1
+    assert get_count("unknown") == untagged + 1
+    assert REDIS_LATENCY_EVENT.labels("primary", "command").value == 0.12
+
+    # Entries are processed once
+    await collector.collect()
+    assert get_count("RedisClient.test_slowlog_collector") == tagged + 1
+
+    # Slowlog reset
+    redis.slowlog = []
+    await collector.collect()
+    redis.add_entry(["PIPELINE_ZADD", "user_feed:{another}", "-1", "1"], 20_000)
+    await collector.collect()
+    assert get_count("unknown") == untagged + 2
+
+
+if __name__ == "__main__":
+    run_pytest_tests(__file__) # type: ignore[reportPossiblyUnboundVariable]
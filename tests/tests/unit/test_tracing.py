@@ -0,0 +1,97 @@
+"""
+Request tracing tests.
+"""
+if __name__ == "__main__":
+    import os, sys
+    sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../" * 4)))
+    from tests.util import run_pytest_tests
+
+import json
+
+from redis.asyncio import ConnectionPool
+from redis.asyncio.client import Pipeline
+
+from src.redis.instrumentation import InstrumentedRedis
+from src.util.tracing import JSONLSpanExporter, Tracer, parse_traceparent, start_span, traced
+
+
+TRACE_ID = "0af7651916cd43dd8448eb211c80319c"
+PARENT_ID = "b7ad6b7169203331"
+
+
+def test_parse_traceparent():
+    assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01") == (TRACE_ID, PARENT_ID, True)
+    assert parse_traceparent(f"00-{TRACE_ID.upper()}-{PARENT_ID}-00") == (TRACE_ID, PARENT_ID, False)
+
+    for header in (None, "", "invalid", f"01-{TRACE_ID}-{PARENT_ID}-01", f"00-{'0' * 32}-{PARENT_ID}-01"):
+        assert parse_traceparent(header) is None
+
+
+async def test_sampling(anyio_backend, tmp_path):
+    exporter = JSONLSpanExporter(str(tmp_path / "spans.jsonl"))
+
+    # Incoming sampling decision is respected
+    tracer = Tracer(exporter, sample_rate=0)
+    with tracer.start_trace("request", f"00-{TRACE_ID}-{PARENT_ID}-00") as span:
+        assert span is None
+    with tracer.start_trace("request", f"00-{TRACE_ID}-{PARENT_ID}-01") as span:
+        assert span is not None and span.trace_id == TRACE_ID and span.parent_id == PARENT_ID
+
+    # Requests without a valid header are sampled with the sample rate
+    with tracer.start_trace("request", "invalid") as span:
+        assert span is None
+    with Tracer(exporter, sample_rate=1).start_trace("request") as span:
+        assert span is not None and span.parent_id is None
+
+    # Child spans are not created in unsampled requests
+    with start_span("child") as span:
+        assert span is None
+
+    assert len(exporter._buffer) == 2
+
+
+async def test_span_export(anyio_backend, tmp_path, monkeypatch):
+    async def execute(self, raise_on_error=True):
+        return [True, b"1"]
+    monkeypatch.setattr(Pipeline, "execute", execute)
+
+    path = tmp_path / "spans.jsonl"
+    exporter = JSONLSpanExporter(str(path), interval=60)
+    exporter.start()
+
+    @traced("dependency")
+    async def dependency():
+        pipe = InstrumentedRedis(connection_pool=ConnectionPool()).pipeline()
+        pipe.set("user:a", 1)
+        pipe.get("user:a")
+        await pipe.execute()
+
+    with Tracer(exporter, sample_rate=1).start_trace("request") as root:
+        await dependency()
+
+    # Spans are written on close
+    assert not path.exists()
+    await exporter.close()
+    spans = {span["name"]: span for span in map(json.loads, path.read_text().splitlines())}
+
+    assert root is not None
+    assert spans["request"]["span_id"] == root.span_id
+    assert spans["dependency"]["parent_id"] == root.span_id
+    assert spans["redis MULTI"]["parent_id"] == spans["dependency"]["span_id"]
+    assert spans["redis MULTI"]["attributes"] == {"commands": 2, "family": "user"}
+    assert {span["trace_id"] for span in spans.values()} == {root.trace_id}
+
+
+async def test_full_buffer(anyio_backend, tmp_path):
+    exporter = JSONLSpanExporter(str(tmp_path / "spans.jsonl"), max_buffer_size=2)
+    tracer = Tracer(exporter, sample_rate=1)
+    for _ in range(3):
+        with tracer.start_trace("request"):
+            pass
+
+    assert len(exporter._buffer) == 2
+    assert exporter.dropped == 1
+
+
+if __name__ == "__main__":
+    run_pytest_tests(__file__) # type: ignore[reportPossiblyUnboundVariable]